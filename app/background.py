@@ -0,0 +1,48 @@
+"""Run slow work (disk, parsing) off the Tk main thread.
+
+Tk widgets must only be touched from the main thread, so results are not
+pushed back from the worker; instead the main loop polls with `root.after`
+until the task is done and then calls the completion callback there.
+"""
+import threading
+from typing import Any, Callable, Optional
+
+POLL_MS = 50
+
+
+class BackgroundTask:
+    def __init__(self, fn: Callable[..., Any], *args, **kwargs):
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+        self._done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+    def start(self) -> "BackgroundTask":
+        threading.Thread(target=self._run, name=f"bg-{getattr(self._fn, '__name__', 'task')}",
+                         daemon=True).start()
+        return self
+
+    def _run(self):
+        try:
+            self.result = self._fn(*self._args, **self._kwargs)
+        except BaseException as e:  # reported to the UI, never raised on the worker
+            self.error = e
+        finally:
+            self._done.set()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def poll(self, root, on_done: Callable[["BackgroundTask"], None], interval_ms: int = POLL_MS):
+        """Call `on_done(self)` on the Tk main thread once the task has finished."""
+        def _check():
+            if self.done():
+                on_done(self)
+            else:
+                root.after(interval_ms, _check)
+        root.after(0, _check)
@@ -0,0 +1,307 @@
+"""Headless command-line entry point. Never imports tkinter.
+
+Build NPCs from spec lines and write them with io_.writer, streaming one
+result line per NPC as it is written:
+
+    python main.py build specs.txt --out ./WFRP_NPC_output
+    cat specs.txt | python -m app.cli build -
+
+A spec line is 'Name; Race; Careers', where Careers uses the same syntax as
+the builder's career box ('Engineer:2, Watchman 3'). Blank lines and lines
+starting with '#' are ignored.
+
+Quick NPCs (random race, career, level and talents) are rolled in parallel;
+the same --seed always gives the same NPCs, whatever --workers is:
+
+    python main.py quick 1000 --seed 42 --workers 8
+
+With --storage sqlite (or "storage": "sqlite" in app_config.json) NPCs are
+appended to one SQLite store instead, and `export` writes them out later:
+
+    python main.py export --career Watchman --out ./guards
+
+`import` reads exported .txt files back in and adds them to the store:
+
+    python main.py import ./WFRP_NPC_output --store campaign.sqlite
+
+--format picks the file formats (txt, md, html, json, vtt; repeatable):
+
+    python main.py quick 50 --format txt --format md --format vtt
+
+--archive streams the files into one .zip or .tar.gz (with a manifest.json)
+instead of the output folder:
+
+    python main.py export --career Watchman --archive guards.zip
+
+`serve` keeps the catalog loaded and answers HTTP/JSON requests (app.server):
+
+    python main.py serve --port 8765
+"""
+import argparse
+import random
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+import settings
+from data.schema import parse_career_specs
+from npc.models import CareerLevel
+
+TALENT_MODES = ("all", "first", "none")
+
+
+def parse_spec_line(line: str) -> Optional[Tuple[str, str, str]]:
+    """Split 'Name; Race; Careers' into its parts; None for blank/comment lines."""
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    parts = [p.strip() for p in line.split(";")]
+    if not parts[0]:
+        raise ValueError("missing name")
+    parts += [""] * (3 - len(parts))
+    return parts[0], parts[1], ";".join(parts[2:]).strip(";").strip()
+
+
+def iter_specs(stream: TextIO) -> Iterator[Tuple[int, str]]:
+    """Yield (line number, raw line) for every non-empty spec line, lazily."""
+    for lineno, line in enumerate(stream, 1):
+        if line.strip() and not line.lstrip().startswith("#"):
+            yield lineno, line
+
+
+def career_levels_for(careers: str, catalog, talents: str = "all") -> List[CareerLevel]:
+    """Expand a careers string like the ViewModel does, then pick talents per `talents` mode."""
+    levels: List[CareerLevel] = []
+    for career, lvl in parse_career_specs(careers):
+        expanded = catalog.get_levels(career, lvl)
+        if not expanded:
+            expanded = [CareerLevel(career=career, level=lvl, status="")]
+        levels.extend(expanded)
+    if talents == "first":
+        for cl in levels:
+            cl.talents = list(cl.talents[:1])
+    elif talents == "none":
+        for cl in levels:
+            cl.talents = []
+    return levels
+
+
+def output_filename(name: str) -> str:
+    from io_.writer import npc_filename
+    return npc_filename(name)
+
+
+def default_output_dir() -> Path:
+    return Path(settings.load_app_config().get("output_dir") or settings.OUTPUT_DIR)
+
+
+def _formats(args) -> List[str]:
+    # argparse appends to the default list, so the default is applied here
+    return list(dict.fromkeys(args.format or ["txt"]))
+
+
+def _save(npcs, args, out_dir: Path) -> Iterator[str]:
+    """Save NPCs with the selected backend, yielding one result line per NPC (per file for --archive)."""
+    from io_.store import STORE_FILENAME, open_store, storage_backend
+    if args.archive:
+        from io_.writer import write_archive
+        yield from write_archive(npcs, args.archive, formats=_formats(args))
+        return
+    if (args.storage or storage_backend()) == "sqlite":
+        # an explicit --out also holds the store, unless --store says otherwise
+        with open_store(args.store or (out_dir / STORE_FILENAME if args.out else None)) as store:
+            for npc_id in store.add_many(npcs):
+                yield f"{store.path}#{npc_id}"
+        return
+    from io_.writer import write_npcs
+    # equal names get _2, _3, ...; --overwrite replaces files from earlier runs instead
+    for path in write_npcs(npcs, out_dir, overwrite=args.overwrite, workers=args.io_threads,
+                           formats=_formats(args)):
+        yield str(path)
+
+
+def cmd_build(args) -> int:
+    from data.catalog import get_catalog
+    from data.races import get_race_table
+    from npc.generator import build_npc
+
+    catalog = get_catalog()
+    races = get_race_table()
+    out_dir = Path(args.out) if args.out else default_output_dir()
+    rng = random.Random(args.seed) if args.seed is not None else None
+    stream = None
+    failures = 0
+
+    def built():
+        nonlocal failures
+        for lineno, line in iter_specs(stream):
+            try:
+                name, race, careers = parse_spec_line(line)
+                levels = career_levels_for(careers, catalog, args.talents)
+                yield build_npc(name, race, levels, races=races, rng=rng)
+            except Exception as e:
+                failures += 1
+                print(f"line {lineno}: error: {e}", file=sys.stderr, flush=True)
+
+    try:
+        stream = sys.stdin if args.specs == "-" else open(args.specs, "r", encoding="utf-8")
+        for line in _save(built(), args, out_dir):
+            print(line, flush=True)
+    except (OSError, sqlite3.Error) as e:
+        print(f"error: {e}", file=sys.stderr, flush=True)
+        return 1
+    finally:
+        if stream is not None and stream is not sys.stdin:
+            stream.close()
+    return 1 if failures else 0
+
+
+def cmd_quick(args) -> int:
+    from npc.quick import iter_quick_populations
+
+    out_dir = Path(args.out) if args.out else default_output_dir()
+    # batched stats; each chunk is written as soon as it is built
+    npcs = (npc for pop in iter_quick_populations(args.count, seed=args.seed, workers=args.workers,
+                                                  name_prefix=args.prefix, roll=args.roll) for npc in pop)
+    try:
+        for line in _save(npcs, args, out_dir):
+            print(line, flush=True)
+    except (OSError, sqlite3.Error) as e:
+        print(f"error: {e}", file=sys.stderr, flush=True)
+        return 1
+    return 0
+
+
+def cmd_export(args) -> int:
+    from io_.store import open_store
+
+    try:
+        with open_store(args.store) as store:
+            rows = store.find(name=args.name, race=args.race, career=args.career)
+            if args.archive:
+                from io_.writer import write_archive
+                paths = write_archive(store.load(rows), args.archive, formats=_formats(args))
+            else:
+                out_dir = Path(args.out) if args.out else default_output_dir()
+                paths = store.export_txt(rows, out_dir, overwrite=args.overwrite, formats=_formats(args))
+            for path in paths:
+                print(path, flush=True)
+    except (OSError, sqlite3.Error) as e:
+        print(f"error: {e}", file=sys.stderr, flush=True)
+        return 1
+    return 0
+
+
+def cmd_import(args) -> int:
+    from data.catalog import get_catalog
+    from io_.reader import iter_npc_files
+    from io_.store import open_store
+
+    failures = 0
+
+    def on_error(path, exc):
+        nonlocal failures
+        failures += 1
+        print(f"{path}: error: {exc}", file=sys.stderr, flush=True)
+
+    npcs = (npc for _, npc in iter_npc_files(args.folder, workers=args.workers, catalog=get_catalog(),
+                                            on_error=on_error))
+    try:
+        with open_store(args.store) as store:
+            for npc_id in store.add_many(npcs):
+                print(f"{store.path}#{npc_id}", flush=True)
+    except (OSError, sqlite3.Error) as e:
+        print(f"error: {e}", file=sys.stderr, flush=True)
+        return 1
+    return 1 if failures else 0
+
+
+def cmd_serve(args) -> int:
+    from app.server import serve
+    serve(args.host, args.port, workers=args.workers, quiet=args.quiet)
+    return 0
+
+
+def _add_storage_args(p: argparse.ArgumentParser):
+    p.add_argument("--storage", choices=("txt", "sqlite"),
+                   help="one .txt per NPC, or append to the SQLite store (default: app_config.json storage)")
+    p.add_argument("--store", help="SQLite store file (default: app_config.json store_path)")
+    p.add_argument("--io-threads", type=int, default=0, help="threads for writing files (default: none)")
+    p.add_argument("--overwrite", action="store_true", help="replace existing files instead of adding _2, _3, ...")
+    _add_format_arg(p)
+
+
+def _add_format_arg(p: argparse.ArgumentParser):
+    from io_.formats import available_formats
+    p.add_argument("--format", action="append", choices=available_formats(),
+                   help="file format, repeat for several (default: txt)")
+    p.add_argument("--archive", type=_archive_path, help="write into this .zip or .tar.gz instead of a folder")
+
+
+def _archive_path(value: str) -> str:
+    from io_.writer import archive_kind
+    try:
+        archive_kind(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="wfrp-npc-gen", description="WFRP NPC generator (headless)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    b = sub.add_parser("build", help="build NPCs from 'Name; Race; Careers' spec lines")
+    b.add_argument("specs", help="spec file, or '-' to read from stdin")
+    b.add_argument("--out", help="output folder (default: app_config.json output_dir)")
+    b.add_argument("--talents", choices=TALENT_MODES, default="all",
+                   help="talents taken per career level (default: all offered)")
+    b.add_argument("--seed", type=int, help="roll racial talent choices with this seed")
+    _add_storage_args(b)
+    b.set_defaults(func=cmd_build)
+
+    q = sub.add_parser("quick", help="roll N random Quick NPCs")
+    q.add_argument("count", type=int, help="number of NPCs")
+    q.add_argument("--seed", type=int, default=0, help="master seed (default 0)")
+    q.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    q.add_argument("--prefix", default="NPC", help="name prefix, NPCs are numbered after it")
+    q.add_argument("--roll", action="store_true",
+                   help="roll characteristics (race table value + 2d10) instead of the flat racial bonus")
+    q.add_argument("--out", help="output folder (default: app_config.json output_dir)")
+    _add_storage_args(q)
+    q.set_defaults(func=cmd_quick)
+
+    e = sub.add_parser("export", help="write NPCs from the SQLite store as files")
+    e.add_argument("--store", help="SQLite store file (default: app_config.json store_path)")
+    e.add_argument("--name", help="only NPCs with this name")
+    e.add_argument("--race", help="only NPCs of this race")
+    e.add_argument("--career", help="only NPCs with this career anywhere in their path")
+    e.add_argument("--out", help="output folder (default: app_config.json output_dir)")
+    e.add_argument("--overwrite", action="store_true", help="replace existing files instead of adding _2, _3, ...")
+    _add_format_arg(e)
+    e.set_defaults(func=cmd_export)
+
+    i = sub.add_parser("import", help="read exported .txt files back into the SQLite store")
+    i.add_argument("folder", help="folder of exported NPC .txt files")
+    i.add_argument("--store", help="SQLite store file (default: app_config.json store_path)")
+    i.add_argument("--workers", type=int, help="worker processes for large folders (default: CPU count)")
+    i.set_defaults(func=cmd_import)
+
+    from app.server import DEFAULT_HOST, DEFAULT_PORT
+    v = sub.add_parser("serve", help="run the local HTTP/JSON generation service")
+    v.add_argument("--host", default=DEFAULT_HOST, help=f"address to listen on (default {DEFAULT_HOST})")
+    v.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port (default {DEFAULT_PORT})")
+    v.add_argument("--workers", type=int, help="processes for large batches (default: CPU count, 0: none)")
+    v.add_argument("--quiet", action="store_true", help="do not log every request")
+    v.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""Export service: run NPC writes on a worker thread instead of the Tk main thread.
+
+Jobs go into a bounded queue that one worker drains in order. A job submitted
+with the key of a job that is still waiting replaces it (the newer NPC wins),
+so hammering Export on the same NPC writes it once. Results are not pushed to
+Tk from the worker; like app.background, the main loop polls with
+`root.after` and runs the completion callbacks there.
+
+`stats()` reports the queue depth and recent per-write latencies, which show
+whether the disk (e.g. a synced network folder) is the bottleneck.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from app.background import POLL_MS
+
+DEFAULT_MAXSIZE = 32
+# latencies kept for the stats window
+LATENCY_WINDOW = 200
+
+
+class ExportJob:
+    def __init__(self, key: Hashable, fn: Callable[..., Any], args, kwargs,
+                 on_done: Optional[Callable[["ExportJob"], None]]):
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.callbacks = [on_done] if on_done is not None else []
+        self.submitted = time.perf_counter()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.latency = 0.0   # seconds spent in fn
+        self.waited = 0.0    # seconds spent queued
+        # how many submissions were folded into this job
+        self.coalesced = 0
+
+
+class ExportService:
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._pending: "OrderedDict[Hashable, ExportJob]" = OrderedDict()
+        self._finished: deque = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._running: Optional[ExportJob] = None
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.completed = 0
+        self.failed = 0
+        self.coalesced = 0
+        self._thread = threading.Thread(target=self._work, name="export-service", daemon=True)
+        self._thread.start()
+
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args,
+               on_done: Optional[Callable[[ExportJob], None]] = None, **kwargs) -> Optional[ExportJob]:
+        """Queue fn(*args, **kwargs); returns the job, or None if the queue is full.
+
+        If a job with the same `key` is still waiting, it is updated in place
+        with the new call and `on_done` is added to its callbacks.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("export service is closed")
+            job = self._pending.get(key)
+            if job is not None:
+                job.fn, job.args, job.kwargs = fn, args, kwargs
+                if on_done is not None:
+                    job.callbacks.append(on_done)
+                job.coalesced += 1
+                self.coalesced += 1
+                return job
+            if len(self._pending) >= self.maxsize:
+                return None
+            job = self._pending[key] = ExportJob(key, fn, args, kwargs, on_done)
+            self._cond.notify()
+            return job
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                _, job = self._pending.popitem(last=False)
+                self._running = job
+            start = time.perf_counter()
+            job.waited = start - job.submitted
+            try:
+                job.result = job.fn(*job.args, **job.kwargs)
+            except BaseException as e:  # reported through the callbacks, never raised here
+                job.error = e
+            job.latency = time.perf_counter() - start
+            with self._cond:
+                self._running = None
+                self._latencies.append(job.latency)
+                if job.error is None:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                self._finished.append(job)
+                self._cond.notify_all()
+
+    def dispatch(self) -> int:
+        """Run the callbacks of finished jobs (call on the Tk main thread); returns how many."""
+        n = 0
+        while True:
+            with self._cond:
+                if not self._finished:
+                    return n
+                job = self._finished.popleft()
+            for cb in job.callbacks:
+                cb(job)
+            n += 1
+
+    def poll(self, root, interval_ms: int = POLL_MS):
+        """Keep dispatching completions on the Tk main loop while the service is open."""
+        def _tick():
+            self.dispatch()
+            if not self._closed or self.depth():
+                root.after(interval_ms, _tick)
+        root.after(interval_ms, _tick)
+
+    def depth(self) -> int:
+        """Jobs waiting or being written."""
+        with self._cond:
+            return len(self._pending) + (1 if self._running is not None else 0)
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            lat = sorted(self._latencies)
+            depth = len(self._pending) + (1 if self._running is not None else 0)
+        out = {"depth": depth, "completed": self.completed, "failed": self.failed,
+               "coalesced": self.coalesced, "last_ms": 0.0, "mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        if lat:
+            out["last_ms"] = self._latencies[-1] * 1000
+            out["mean_ms"] = sum(lat) / len(lat) * 1000
+            out["p95_ms"] = lat[min(len(lat) - 1, int(len(lat) * 0.95))] * 1000
+            out["max_ms"] = lat[-1] * 1000
+        return out
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until nothing is queued or running (not for the Tk thread)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._running is not None:
+                left = None if deadline is None else deadline - time.monotonic()
+                if left is not None and left <= 0:
+                    return False
+                self._cond.wait(left)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Stop accepting jobs and let the worker finish the queue; True if it drained in time."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
@@ -0,0 +1,190 @@
+"""Career history with undo, redo and undo-by-group.
+
+Every CareerLevel gets a stable entry id and every add a stable group id;
+groups are switched on and off but never rewritten, and the current rows are
+the active entries in id order. Undo and redo
+flip one group at a time and report exactly which rows moved, so the UI can
+patch its listbox instead of repopulating it. Row positions come from a
+Fenwick tree over the entry ids, so a flip costs O(k log n) for a group of k
+levels wherever the group sits, instead of shifting a list of every row.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from npc.models import CareerLevel
+
+
+@dataclass
+class HistoryChange:
+    """Row-level description of one history operation.
+
+    Apply `removed` (row indices, descending) first, then `inserted`
+    (index, level) pairs in ascending order; `updated` rows keep their index.
+    """
+    removed: List[int] = field(default_factory=list)
+    inserted: List[Tuple[int, CareerLevel]] = field(default_factory=list)
+    updated: List[Tuple[int, CareerLevel]] = field(default_factory=list)
+    removed_levels: List[CareerLevel] = field(default_factory=list)
+    group: Optional[int] = None
+
+    def __bool__(self):
+        return bool(self.removed or self.inserted or self.updated)
+
+
+class _RowIndex:
+    """Fenwick tree counting active entries by entry id; ids are appended in order."""
+
+    def __init__(self):
+        self._tree: List[int] = [0]
+
+    def append(self):
+        """Make room for the next entry id (inactive)."""
+        i = len(self._tree)
+        self._tree.append(self.count(i - 1) - self.count(i - (i & -i)))
+
+    def add(self, eid: int, delta: int):
+        tree, i = self._tree, eid + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def count(self, n: int) -> int:
+        """Active entries among ids 0..n-1, i.e. the row entry `n` has when active."""
+        tree, total = self._tree, 0
+        while n > 0:
+            total += tree[n]
+            n -= n & -n
+        return total
+
+
+class CareerHistory:
+    def __init__(self):
+        self._levels: Dict[int, CareerLevel] = {}       # entry id -> level, in id order
+        self._entry_of: Dict[int, int] = {}             # id(level) -> entry id
+        self._groups: Dict[int, Tuple[int, ...]] = {}   # group id -> entry ids
+        self._live = bytearray()                        # entry id -> 1 while active
+        self._rows = _RowIndex()
+        self._count = 0                                 # active entries
+        self._active: Set[int] = set()                  # active group ids
+        # active levels in row order; patched when a flip touches the tail, else rebuilt
+        self._row_levels: Optional[List[CareerLevel]] = []
+        # (group id, was_activated) of operations that can be undone / redone
+        self._undo: List[Tuple[int, bool]] = []
+        self._redo: List[Tuple[int, bool]] = []
+        self._next_entry = 0
+        self._next_group = 0
+
+    # -- state flips -------------------------------------------------------
+    def _activate(self, gid: int) -> HistoryChange:
+        change = HistoryChange(group=gid)
+        self._active.add(gid)
+        for eid in self._groups[gid]:
+            i = self._rows.count(eid)
+            self._rows.add(eid, 1)
+            self._live[eid] = 1
+            self._count += 1
+            change.inserted.append((i, self._levels[eid]))
+        rows = self._row_levels
+        if rows is not None and change.inserted[0][0] == len(rows):
+            rows.extend(cl for _, cl in change.inserted)
+        else:
+            self._row_levels = None
+        return change
+
+    def _deactivate(self, gid: int) -> HistoryChange:
+        change = HistoryChange(group=gid)
+        self._active.discard(gid)
+        for eid in reversed(self._groups[gid]):
+            self._rows.add(eid, -1)
+            self._live[eid] = 0
+            self._count -= 1
+            change.removed.append(self._rows.count(eid))
+        change.removed_levels = [self._levels[eid] for eid in self._groups[gid]]
+        rows = self._row_levels
+        if rows is not None and change.removed[-1] == self._count:
+            del rows[self._count:]
+        else:
+            self._row_levels = None
+        return change
+
+    def _is_active(self, gid: int) -> bool:
+        return gid in self._active
+
+    # -- public operations -------------------------------------------------
+    def add_group(self, levels: Sequence[CareerLevel]) -> HistoryChange:
+        """Record a new group of levels (appended after every existing row)."""
+        if not levels:
+            return HistoryChange()
+        gid = self._next_group
+        self._next_group += 1
+        ids = []
+        for cl in levels:
+            eid = self._next_entry
+            self._next_entry += 1
+            self._levels[eid] = cl
+            self._entry_of[id(cl)] = eid
+            self._live.append(0)
+            self._rows.append()
+            ids.append(eid)
+        self._groups[gid] = tuple(ids)
+        change = self._activate(gid)
+        self._undo.append((gid, True))
+        self._redo.clear()
+        return change
+
+    def remove_group(self, gid: int) -> HistoryChange:
+        """Undo one specific group (undo-by-group). Itself undoable via undo()."""
+        if gid not in self._groups or not self._is_active(gid):
+            return HistoryChange()
+        change = self._deactivate(gid)
+        self._undo.append((gid, False))
+        self._redo.clear()
+        return change
+
+    def _flip(self, gid: int, activate: bool) -> HistoryChange:
+        return self._activate(gid) if activate else self._deactivate(gid)
+
+    def undo(self, redoable: bool = True) -> HistoryChange:
+        """Invert the latest operation; `redoable=False` drops it for good (cancelled adds)."""
+        if not self._undo:
+            return HistoryChange()
+        gid, activated = self._undo.pop()
+        if redoable:
+            self._redo.append((gid, activated))
+        return self._flip(gid, not activated)
+
+    def redo(self) -> HistoryChange:
+        if not self._redo:
+            return HistoryChange()
+        gid, activated = self._redo.pop()
+        self._undo.append((gid, activated))
+        return self._flip(gid, activated)
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    # -- views ---------------------------------------------------------------
+    def row_of(self, cl: CareerLevel) -> Optional[int]:
+        """Current row index of an active level, or None."""
+        eid = self._entry_of.get(id(cl))
+        if eid is None or self._levels.get(eid) is not cl or not self._live[eid]:
+            return None
+        return self._rows.count(eid)
+
+    def levels(self) -> List[CareerLevel]:
+        if self._row_levels is None:
+            live = self._live
+            self._row_levels = [cl for eid, cl in self._levels.items() if live[eid]]
+        return list(self._row_levels)
+
+    def active_groups(self) -> List[int]:
+        return sorted(self._active)
+
+    def group_levels(self, gid: int) -> List[CareerLevel]:
+        return [self._levels[eid] for eid in self._groups.get(gid, ())]
+
+    def __len__(self):
+        return self._count
@@ -0,0 +1,309 @@
+"""Local HTTP/JSON generation service (stdlib only). Never imports tkinter.
+
+Keeps the career catalog and race table loaded, so tablets or a chat bot can
+ask for NPCs without starting a Python process per request:
+
+    python main.py serve --port 8765
+
+    GET  /health   catalog size and uptime
+    GET  /formats  export formats for "formats"
+    GET  /stats    request latency percentiles per endpoint, cache counters
+    POST /build    {"name", "race", "careers": "Engineer:2, Watchman 3",
+                    "talents": "all"|"first"|"none", "seed", "formats": [...]}
+                   or {"specs": [<that object> or "Name; Race; Careers", ...]}
+    POST /quick    {"count", "seed", "prefix", "formats": [...]}
+    POST /render   {"npc": <an NPC as /build returns it>, "formats": [...]}
+
+Every NPC comes back as {"npc": <io_.formats.npc_dict>, "rendered": {format:
+text}}. Each client gets its own thread; batches above BATCH_INLINE NPCs go
+to a process pool whose workers load the catalog once at start-up, so a big
+batch does not hold the GIL for the other clients.
+"""
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# batches up to this many NPCs are built on the request thread
+BATCH_INLINE = 50
+MAX_QUICK = 10000
+MAX_BODY = 4 << 20
+# latencies kept per endpoint for the percentiles
+LATENCY_WINDOW = 1000
+
+
+class RequestError(ValueError):
+    """A bad request; reported to the client as HTTP 400."""
+
+
+def _tables():
+    from data.catalog import get_catalog
+    from data.races import get_race_table
+    return get_catalog(), get_race_table()
+
+
+def _init_worker():
+    _tables()
+
+
+def _formats(formats) -> List[str]:
+    from io_.formats import get_renderer
+    if formats is None:
+        return []
+    if isinstance(formats, str):
+        formats = [formats]
+    if not isinstance(formats, list):
+        raise RequestError("formats must be a list of format names")
+    for f in formats:
+        get_renderer(f)
+    return formats
+
+
+def _result(npc, formats: Sequence[str]) -> dict:
+    from io_.formats import npc_dict, npc_document, render_all
+    doc = npc_document(npc)
+    out = {"npc": npc_dict(doc)}
+    if formats:
+        out["rendered"] = render_all(doc, formats)
+    return out
+
+
+def _build_one(spec, formats: Sequence[str]) -> dict:
+    from app.cli import TALENT_MODES, career_levels_for, parse_spec_line
+    from npc.generator import build_npc
+    catalog, races = _tables()
+    if isinstance(spec, str):
+        parts = parse_spec_line(spec)
+        if parts is None:
+            raise ValueError("empty spec")
+        name, race, careers = parts
+        talents, seed = "all", None
+    elif isinstance(spec, dict):
+        name = str(spec.get("name") or "").strip()
+        if not name:
+            raise ValueError("missing name")
+        race, careers = str(spec.get("race") or ""), str(spec.get("careers") or "")
+        talents, seed = spec.get("talents", "all"), spec.get("seed")
+    else:
+        raise ValueError("a spec is an object or a 'Name; Race; Careers' string")
+    if talents not in TALENT_MODES:
+        raise ValueError(f"talents must be one of {', '.join(TALENT_MODES)}")
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, (int, str))):
+        raise ValueError("seed must be an integer or a string")
+    rng = random.Random(seed) if seed is not None else None
+    levels = career_levels_for(careers, catalog, talents)
+    return _result(build_npc(name, race, levels, races=races, rng=rng), formats)
+
+
+def _build_batch(specs: list, formats: Sequence[str]) -> List[dict]:
+    """Build every spec; failed ones become {"error": ...} in their slot."""
+    out = []
+    for spec in specs:
+        try:
+            out.append(_build_one(spec, formats))
+        except ValueError as e:
+            out.append({"error": str(e)})
+    return out
+
+
+def _quick_batch(count: int, seed: int, prefix: str, formats: Sequence[str]) -> List[dict]:
+    from npc.quick import iter_quick_populations
+    return [_result(npc, formats)
+            for pop in iter_quick_populations(count, seed=seed, workers=1, name_prefix=prefix) for npc in pop]
+
+
+class LatencyStats:
+    """Per-endpoint request counts and latency percentiles over a sliding window."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+
+    def record(self, route: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(route, deque(maxlen=self._window)).append(seconds)
+            self._counts[route] = self._counts.get(route, 0) + 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            samples = {route: sorted(lat) for route, lat in self._samples.items()}
+            counts = dict(self._counts)
+        out = {}
+        for route, lat in samples.items():
+            def pct(p):
+                return round(lat[min(len(lat) - 1, int(len(lat) * p))] * 1000, 3)
+            out[route] = {"count": counts[route], "p50_ms": pct(0.50), "p90_ms": pct(0.90),
+                          "p99_ms": pct(0.99), "max_ms": round(lat[-1] * 1000, 3)}
+        return out
+
+
+# (method, path) -> NPCServer method
+ROUTES = {
+    ("GET", "/health"): "get_health",
+    ("GET", "/formats"): "get_formats",
+    ("GET", "/stats"): "get_stats",
+    ("POST", "/build"): "post_build",
+    ("POST", "/quick"): "post_quick",
+    ("POST", "/render"): "post_render",
+}
+
+
+class NPCServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=(DEFAULT_HOST, DEFAULT_PORT), workers: Optional[int] = None, quiet: bool = False):
+        """`workers` processes build large batches (default: CPU count; 0 builds them on the request thread)."""
+        super().__init__(address, _Handler)
+        self.quiet = quiet
+        catalog, _ = _tables()
+        self.careers = len(catalog.names())
+        self.started = time.monotonic()
+        self.latency = LatencyStats()
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers > 0 else None
+
+    def run_batch(self, fn, *args):
+        """fn(*args) in the worker pool (or inline without one); the calling thread waits."""
+        if self.pool is None:
+            return fn(*args)
+        return self.pool.submit(fn, *args).result()
+
+    def server_close(self):
+        super().server_close()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    # --- endpoints; each takes the parsed body and returns a JSON-able object ---
+
+    def get_health(self, _body) -> dict:
+        return {"status": "ok", "careers": self.careers, "uptime_s": round(time.monotonic() - self.started, 1)}
+
+    def get_formats(self, _body) -> dict:
+        from io_.formats import get_renderer, available_formats
+        return {"formats": {f: get_renderer(f).extension for f in available_formats()}}
+
+    def get_stats(self, _body) -> dict:
+        from io_.formats import render_cache_info
+        from npc.generator import build_cache_info
+        return {"latency": self.latency.snapshot(), "build_cache": build_cache_info(),
+                "render_cache": render_cache_info()}
+
+    def post_build(self, body: dict) -> dict:
+        formats = _formats(body.get("formats"))
+        specs = body.get("specs")
+        if specs is None:
+            try:
+                return _build_one(body, formats)
+            except ValueError as e:
+                raise RequestError(str(e)) from None
+        if not isinstance(specs, list):
+            raise RequestError("specs must be a list")
+        if len(specs) > BATCH_INLINE:
+            return {"npcs": self.run_batch(_build_batch, specs, formats)}
+        return {"npcs": _build_batch(specs, formats)}
+
+    def post_quick(self, body: dict) -> dict:
+        formats = _formats(body.get("formats"))
+        try:
+            count, seed = int(body.get("count", 1)), int(body.get("seed", 0))
+        except (TypeError, ValueError):
+            raise RequestError("count and seed must be integers") from None
+        if not 0 < count <= MAX_QUICK:
+            raise RequestError(f"count must be 1..{MAX_QUICK}")
+        prefix = str(body.get("prefix") or "NPC")
+        if count > BATCH_INLINE:
+            return {"npcs": self.run_batch(_quick_batch, count, seed, prefix, formats)}
+        return {"npcs": _quick_batch(count, seed, prefix, formats)}
+
+    def post_render(self, body: dict) -> dict:
+        from io_.formats import npc_from_dict
+        formats = _formats(body.get("formats") or ["txt"])
+        npc = npc_from_dict(body.get("npc"))
+        return _result(npc, formats)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: NPCServer
+    protocol_version = "HTTP/1.1"
+    server_version = "wfrp-npc-gen"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str):
+        start = time.perf_counter()
+        path = self.path.split("?", 1)[0].rstrip("/") or "/"
+        name = ROUTES.get((method, path))
+        route = f"{method} {path}" if name is not None else "other"
+        try:
+            if name is None:
+                self._send(404, {"error": f"no such endpoint: {method} {path}"})
+                return
+            endpoint = getattr(self.server, name)
+            try:
+                body = self._read_body() if method == "POST" else None
+                result = endpoint(body)
+            except ValueError as e:  # RequestError, bad JSON, unknown format, bad NPC
+                self._send(400, {"error": str(e)})
+                return
+            except Exception as e:
+                self._send(500, {"error": f"{type(e).__name__}: {e}"})
+                return
+            self._send(200, result)
+        finally:
+            self.server.latency.record(route, time.perf_counter() - start)
+
+    def _read_body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            raise RequestError(f"request body over {MAX_BODY} bytes")
+        raw = self.rfile.read(length) if length else b"{}"
+        try:
+            body = json.loads(raw)
+        except ValueError as e:
+            raise RequestError(f"invalid JSON: {e}") from None
+        if not isinstance(body, dict):
+            raise RequestError("the request body must be a JSON object")
+        return body
+
+    def _send(self, status: int, obj):
+        data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        if status >= 400:
+            # the request body may not have been read; do not reuse the connection
+            self.close_connection = True
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # one line per request, on stderr like the rest of the CLI's diagnostics
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: Optional[int] = None, quiet: bool = False):
+    """Run the server until interrupted."""
+    server = NPCServer((host, port), workers=workers, quiet=quiet)
+    print(f"serving on http://{server.server_address[0]}:{server.server_address[1]} "
+          f"({server.careers} careers loaded)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
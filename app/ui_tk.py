@@ -6,17 +6,78 @@ their own) and an Open Output Folder button.
 import subprocess
 from pathlib import Path
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from app.viewmodel import ViewModel
 from npc.validators import require_at_least_one_talent
 import settings
-from settings import OUTPUT_DIR, DEFAULT_THEME, ACCENT_COLOR
-from io_.writer import write_npc
+from settings import DEFAULT_THEME, ACCENT_COLOR
+from io_.writer import npc_filename, output_dir, render_npc, write_npc
+from io_.store import open_store, storage_backend
+from app.background import BackgroundTask
+from app.export_queue import ExportService
+from app.virtual_list import VirtualList
+from io_.manifest import flush_manifests, get_manifest
 import json
 
+# delay between the last keystroke and the career search
+SEARCH_DEBOUNCE_MS = 150
+# longest wait for queued exports when the window closes
+EXIT_FLUSH_S = 10
+
+
+def _store_npc(npc):
+    """Export-worker job for the SQLite backend; returns (store path, id)."""
+    with open_store() as store:
+        return store.path, store.add(npc)
+
+
+def _write_session_npc(npc, body, out_dir, target):
+    """Export-worker job for the txt backend; returns the path written.
+
+    The first export of a builder session takes a free name (Greta.txt,
+    Greta_2.txt, ...) and records it in `target`; later exports of the same
+    session replace that file. Jobs run one at a time, so `target` needs no lock.
+    """
+    path = target.get("path")
+    if path is not None and path.parent == out_dir:
+        return write_npc(npc, path.name, out_dir, body=body, overwrite=True)
+    path = target["path"] = write_npc(npc, npc_filename(npc.name), out_dir, body=body)
+    return path
+
+
+def _export_all(archive, folder):
+    """Export-worker job: stream every stored NPC (sqlite backend) or every file in `folder` into `archive`.
+
+    Files are copied as they are, in every format. Returns (archive, files
+    written, files skipped as unreadable); members are counted as they are
+    written, never collected.
+    """
+    from io_.writer import archive_folder, write_archive
+    if storage_backend() == "sqlite":
+        with open_store() as store:
+            return archive, sum(1 for _ in write_archive(store.load(store.find()), archive)), 0
+    skipped = []
+    written = sum(1 for _ in archive_folder(folder, archive, on_error=lambda path, e: skipped.append(path)))
+    return archive, written, len(skipped)
+
+
+def _load_catalog_data():
+    """Worker-thread job: load careers, their search index and the race table."""
+    from data.catalog import get_catalog
+    from data.races import get_race_table
+    catalog = get_catalog()
+    catalog.search_index()
+    get_race_table()
+    return catalog
+
 
 def run_app():
     vm = ViewModel()
+    # start reading the data files right away; the window does not wait for it
+    data_task = BackgroundTask(_load_catalog_data).start()
+    export_service = ExportService()
+    # where the current builder session was exported to, shared by its export jobs
+    export_target = {"session": None, "target": {}}
     root = tk.Tk()
     root.title("WFRP NPC Gen (minimal)")
     # sensible minimum size to keep layout usable
@@ -28,7 +89,7 @@ def run_app():
     # apply theme and basic styling
     style = ttk.Style(root)
     # load persisted config if present
-    cfg_path = settings.ROOT / 'app_config.json'
+    cfg_path = settings.APP_CONFIG_PATH
     if cfg_path.exists():
         try:
             with open(cfg_path, 'r', encoding='utf-8') as fh:
@@ -79,6 +140,88 @@ def run_app():
     def show_front():
         builder_frame.grid_remove()
         front.grid()
+        refresh_npc_list()
+
+    # loading indicator, removed once the career data is in memory
+    loading_frame = ttk.Frame(front)
+    loading_frame.grid(column=0, row=5, pady=(12, 0))
+    lbl_loading = ttk.Label(loading_frame, text="Loading career data...")
+    lbl_loading.pack(side='left', padx=(0, 6))
+    progress = ttk.Progressbar(loading_frame, mode='indeterminate', length=120)
+    progress.pack(side='left')
+    progress.start(10)
+
+    # exported NPCs, listed from the output folder's manifest (never by parsing every file)
+    npc_list_frame = ttk.LabelFrame(front, text="Exported NPCs", padding=6)
+    npc_list_frame.grid(column=0, row=6, pady=(12, 0), sticky='nsew')
+    front.rowconfigure(6, weight=1)
+    front.columnconfigure(0, weight=1)
+    npc_filter = tk.StringVar()
+    ttk.Entry(npc_list_frame, textvariable=npc_filter, width=40).grid(column=0, row=0, sticky='ew')
+    lbl_npc_count = ttk.Label(npc_list_frame, text="")
+    lbl_npc_count.grid(column=1, row=0, padx=(6, 0), sticky='e')
+
+    def format_npc_row(e):
+        career = f"{e.latest_career} ({e.latest_status})" if e.latest_status else e.latest_career
+        return f"{e.name} - {e.race} - {career}"
+
+    def on_npc_selected(e):
+        lbl_npc_count.config(text=e.filename)
+
+    npc_list = VirtualList(npc_list_frame, height=10, width=70, format_row=format_npc_row,
+                           on_select=on_npc_selected)
+    npc_list.grid(column=0, row=1, columnspan=2, sticky='nsew', pady=(6, 0))
+    npc_list_frame.columnconfigure(0, weight=1)
+    npc_list_frame.rowconfigure(1, weight=1)
+    list_state = {'pending': None, 'task': None}
+
+    def apply_npc_filter():
+        list_state['pending'] = None
+        manifest = get_manifest(output_dir())
+        rows = manifest.filter(npc_filter.get())
+        npc_list.set_rows(rows)
+        lbl_npc_count.config(text=f"{len(rows)} of {len(manifest)}")
+
+    def schedule_npc_filter(*_):
+        if list_state['pending'] is not None:
+            root.after_cancel(list_state['pending'])
+        list_state['pending'] = root.after(SEARCH_DEBOUNCE_MS, apply_npc_filter)
+
+    npc_filter.trace_add('write', schedule_npc_filter)
+
+    def on_export_all():
+        path = filedialog.asksaveasfilename(parent=root, title="Export all NPCs", initialfile="npcs.zip",
+                                            defaultextension=".zip",
+                                            filetypes=[("Zip archive", "*.zip"), ("Gzipped tar", "*.tar.gz")])
+        if not path:
+            return
+        job = export_service.submit(("archive", path), _export_all, path, output_dir(),
+                                    on_done=on_export_all_done)
+        if job is None:
+            messagebox.showinfo("Export all", "Export queue is full, try again in a moment")
+        else:
+            lbl_npc_count.config(text=f"Exporting all to {Path(path).name}...")
+
+    def on_export_all_done(job):
+        apply_npc_filter()
+        if job.error is not None:
+            messagebox.showerror("Export all", f"Export failed: {job.error}")
+            return
+        archive, count, skipped = job.result
+        note = f"\n{skipped} unreadable file(s) skipped." if skipped else ""
+        messagebox.showinfo("Export all", f"Wrote {count} files to {archive}{note}")
+
+    ttk.Button(npc_list_frame, text="Export all...", command=on_export_all).grid(column=0, row=2, sticky='w',
+                                                                               pady=(6, 0))
+
+    def refresh_npc_list():
+        # reconcile (stat each file, parse only changed ones) off the Tk thread
+        if list_state['task'] is not None and not list_state['task'].done():
+            return
+        task = list_state['task'] = BackgroundTask(lambda: get_manifest(output_dir()).reconcile()).start()
+        task.poll(root, lambda t: apply_npc_filter())
+
+    front.grid()
 
     def show_builder():
         front.grid_remove()
@@ -89,7 +232,7 @@ def run_app():
     ttk.Button(front, text="Create NPC", command=show_builder, width=30).grid(column=0, row=1, pady=6)
     
     def open_output():
-        out = Path(OUTPUT_DIR)
+        out = output_dir()
         out.mkdir(parents=True, exist_ok=True)
         try:
             subprocess.run(["open", str(out)])
@@ -102,7 +245,7 @@ def run_app():
         dlg.title('Config')
         dlg.transient(root)
         ttk.Label(dlg, text='Output folder:').grid(column=0, row=0, sticky='w')
-        outvar = tk.StringVar(value=str(Path(OUTPUT_DIR)))
+        outvar = tk.StringVar(value=str(output_dir()))
         ttk.Entry(dlg, textvariable=outvar, width=60).grid(column=0, row=1, sticky='w')
 
         # Theme selection
@@ -119,8 +262,8 @@ def run_app():
 
         def save():
             try:
-                import settings as _s
-                _s.OUTPUT_DIR = outvar.get()
+                settings.OUTPUT_DIR = outvar.get()
+                refresh_npc_list()
                 # apply theme immediately
                 try:
                     style.theme_use(theme_var.get())
@@ -135,13 +278,12 @@ def run_app():
                     pass
                 # persist configuration to disk
                 try:
-                    cfg = {
+                    # merge, so keys set outside this dialog (storage, store_path) survive
+                    settings.save_app_config({
                         'output_dir': outvar.get(),
                         'theme': theme_var.get(),
                         'accent': accent_var.get(),
-                    }
-                    with open(cfg_path, 'w', encoding='utf-8') as fh:
-                        json.dump(cfg, fh, indent=2)
+                    })
                 except Exception:
                     # non-fatal; continue
                     pass
@@ -151,7 +293,13 @@ def run_app():
 
         ttk.Button(dlg, text='Save', command=save).grid(column=0, row=6, pady=6)
     ttk.Button(front, text="Config", command=open_config, width=30).grid(column=0, row=3, pady=6)
-    ttk.Button(front, text="Exit", command=root.destroy, width=30).grid(column=0, row=4, pady=6)
+    def on_exit():
+        # let queued exports reach the disk before the process goes away
+        export_service.close(timeout=EXIT_FLUSH_S)
+        flush_manifests()
+        root.destroy()
+    root.protocol('WM_DELETE_WINDOW', on_exit)
+    ttk.Button(front, text="Exit", command=on_exit, width=30).grid(column=0, row=4, pady=6)
 
     front.grid()
 
@@ -181,42 +329,53 @@ def run_app():
     ttk.Label(builder_frame, text="Career (name:level)").grid(column=0, row=2)
     career_input = tk.StringVar()
 
-    # Searchable combobox: suggestions supplied from data.loader.get_career_names()
+    # Searchable combobox: suggestions come from the catalog's prebuilt search index,
+    # filled in once the background load has finished
+    all_careers = []
+    search_state = {'index': None, 'pending': None}
     try:
-        from tkinter import StringVar
         from tkinter.ttk import Combobox
-        from data.loader import get_career_names
-
-        all_careers = []
-        try:
-            all_careers = get_career_names()
-        except Exception:
-            all_careers = []
 
         combo = Combobox(builder_frame, textvariable=career_input, values=all_careers, width=40)
         combo.grid(column=1, row=2)
 
-        def update_career_suggestions(event=None):
+        def update_career_suggestions():
+            search_state['pending'] = None
             q = career_input.get().strip()
-            if not q:
+            if not q or search_state['index'] is None:
                 combo['values'] = all_careers
                 return
-            qlow = q.lower()
-            # word-start matches first, then substring matches
-            word_start = [c for c in all_careers if any(part.lower().startswith(qlow) for part in c.split())]
-            substr = [c for c in all_careers if qlow in c.lower() and c not in word_start]
-            results = word_start + substr
-            # if the user included a numeric level like 'Watchman 3', keep that string in the box
-            combo['values'] = results
+            # ranked prefix, substring and typo-tolerant matches
+            # (a trailing level like 'Watchman 3' is ignored for matching and kept in the box)
+            combo['values'] = search_state['index'].search(q)
+
+        def schedule_career_suggestions(event=None):
+            # debounce: only query once typing pauses
+            if search_state['pending'] is not None:
+                root.after_cancel(search_state['pending'])
+            search_state['pending'] = root.after(SEARCH_DEBOUNCE_MS, update_career_suggestions)
 
         # update suggestions while typing
-        combo.bind('<KeyRelease>', update_career_suggestions)
+        combo.bind('<KeyRelease>', schedule_career_suggestions)
     except Exception:
-        # fallback to plain Entry if Combobox or loader not available
+        # fallback to plain Entry if Combobox is not available
+        combo = None
         ttk.Entry(builder_frame, textvariable=career_input, width=40).grid(column=1, row=2)
 
+    def data_ready(show_status=True):
+        if data_task.done() and data_task.error is None:
+            return True
+        if show_status:
+            if data_task.error is not None:
+                lbl_status.config(text=f"Error: career data could not be loaded ({data_task.error})")
+            else:
+                lbl_status.config(text="Career data is still loading, please wait...")
+        return False
+
     # Buttons: start NPC and add career
     def on_start():
+        if not data_ready():
+            return
         try:
             vm.start_new_npc(name.get(), race.get())
             refresh_summary()
@@ -224,6 +383,9 @@ def run_app():
             lbl_status.config(text=f"Error: {e}")
 
     def on_add_career():
+        # all lookups below are in memory once the background load is done
+        if not data_ready():
+            return
         try:
             added = vm.add_career_str(career_input.get())
 
@@ -231,18 +393,13 @@ def run_app():
             selections = ask_talents_multi_dialog(root, added)
             if selections is None:
                 # user cancelled the multi-level talent selection -> undo the added career levels
-                vm.undo_last_career()
+                vm.cancel_last_career()
                 lbl_status.config(text="Career addition cancelled")
             else:
-                # assign chosen talents for each career level and display
+                # assign chosen talents for each career level; the listbox
+                # rows are patched by on_history_change
                 for c, chosen in zip(added, selections):
-                    c.talents = chosen
-                    display = f"{c.career} {c.level}"
-                    if c.talents:
-                        display += f" - Talents: {', '.join(c.talents)}"
-                    else:
-                        display += " - Talents: (none)"
-                    lb_careers.insert(tk.END, display)
+                    vm.set_talents(c, chosen)
                 career_input.set("")
                 refresh_summary()
                 lbl_status.config(text=f"Added: {', '.join(f'{c.career} {c.level}' for c in added)}")
@@ -260,6 +417,26 @@ def run_app():
     lb_careers.configure(xscrollcommand=hscroll.set)
     hscroll.grid(column=0, row=6, columnspan=3, sticky='we')
 
+    def career_display(c):
+        display = f"{c.career} {c.level}"
+        if c.talents:
+            display += f" - Talents: {', '.join(c.talents)}"
+        else:
+            display += " - Talents: (none)"
+        return display
+
+    def on_history_change(change):
+        # patch only the rows the history operation touched
+        for idx in change.removed:
+            lb_careers.delete(idx)
+        for idx, c in change.inserted:
+            lb_careers.insert(idx, career_display(c))
+        for idx, c in change.updated:
+            lb_careers.delete(idx)
+            lb_careers.insert(idx, career_display(c))
+
+    vm.subscribe(on_history_change)
+
     # Status and summary labels
     lbl_status = ttk.Label(builder_frame, text="")
     # apply accent style if available
@@ -318,16 +495,35 @@ def run_app():
                 if not proceed:
                     lbl_status.config(text="Export cancelled: missing talents")
                     return
-            # simple filename sanitisation
-            filename = f"{npc.name.strip().replace(' ', '_')}.txt"
-            path = write_npc(npc, filename)
-            lbl_status.config(text=f"Saved: {path}")
+            # the write itself (possibly to a slow synced folder) runs on the export worker;
+            # the text is rendered here so later edits to the NPC cannot leak into it;
+            # queued exports coalesce per builder session, so same-name NPCs never replace each other
+            if storage_backend() == "sqlite":
+                job = export_service.submit(("sqlite", vm.session), _store_npc, npc, on_done=on_export_done)
+            else:
+                if export_target["session"] != vm.session:
+                    export_target.update(session=vm.session, target={})
+                job = export_service.submit(("txt", vm.session), _write_session_npc, npc, render_npc(npc),
+                                            output_dir(), export_target["target"], on_done=on_export_done)
+            if job is None:
+                lbl_status.config(text="Export queue is full, try again in a moment")
+            else:
+                lbl_status.config(text=f"Exporting {npc.name}... ({export_service.depth()} queued)")
         except Exception as e:
             lbl_status.config(text=f"Export error: {e}")
 
+    def on_export_done(job):
+        if job.error is not None:
+            lbl_status.config(text=f"Export error: {job.error}")
+            return
+        stats = export_service.stats()
+        saved = f"{job.result[0]} (#{job.result[1]})" if isinstance(job.result, tuple) else job.result
+        lbl_status.config(text=f"Saved: {saved} - {job.latency * 1000:.0f} ms write, "
+                               f"{stats['depth']} queued, p95 {stats['p95_ms']:.0f} ms")
+
     # legacy placement removed; buttons are in controls frame
     def on_open_output():
-        out = Path(OUTPUT_DIR)
+        out = output_dir()
         out.mkdir(parents=True, exist_ok=True)
         try:
             # macOS open command
@@ -338,43 +534,45 @@ def run_app():
     # legacy placement removed; buttons are in controls frame
 
     def on_undo():
-        removed = vm.undo_last_career()
-        if not removed:
+        if not vm.can_undo():
             lbl_status.config(text="Nothing to undo")
             return
-        # remove items from listbox equal to number removed
-        for _ in range(len(removed)):
-            if lb_careers.size() > 0:
-                lb_careers.delete(tk.END)
+        removed = vm.undo_last_career()
+        refresh_summary()
+        if removed:
+            lbl_status.config(text=f"Undid: {', '.join(f'{c.career} {c.level}' for c in removed)}")
+        else:
+            lbl_status.config(text="Undo: restored previously removed careers")
+
+    def on_redo():
+        if not vm.can_redo():
+            lbl_status.config(text="Nothing to redo")
+            return
+        vm.redo()
         refresh_summary()
-        lbl_status.config(text=f"Undid: {', '.join(f'{c.career} {c.level}' for c in removed)}")
+        lbl_status.config(text="Redone")
 
     def on_history():
-        # show history groups with Undo buttons
+        # show history groups with Undo buttons; groups are addressed by stable id
         dlg = tk.Toplevel(root)
         dlg.title("History")
         frame = ttk.Frame(dlg, padding=8)
         frame.pack(fill='both', expand=True)
-        for i, group in enumerate(list(vm._history)):
+        for i, (gid, group) in enumerate(vm.history_groups()):
             row = i
             lbl = ttk.Label(frame, text=f"Group {i+1}: " + ", ".join(f"{c.career} {c.level}" for c in group))
             lbl.grid(column=0, row=row, sticky='w', pady=2)
-            def make_undo(idx):
+            def make_undo(group_id, label, button):
                 def _undo():
-                    removed = vm.undo_history_index(idx)
-                    # refresh careers listbox to reflect current career_levels
-                    lb_careers.delete(0, tk.END)
-                    for c in vm.career_levels:
-                        display = f"{c.career} {c.level}"
-                        if c.talents:
-                            display += f" - Talents: {', '.join(c.talents)}"
-                        else:
-                            display += " - Talents: (none)"
-                        lb_careers.insert(tk.END, display)
+                    removed = vm.undo_group(group_id)
                     refresh_summary()
-                    messagebox.showinfo("Undo", f"Undid: {', '.join(f'{c.career} {c.level}' for c in removed)}")
+                    if removed:
+                        label.configure(text=label.cget('text') + " (undone)")
+                        button.state(['disabled'])
+                        messagebox.showinfo("Undo", f"Undid: {', '.join(f'{c.career} {c.level}' for c in removed)}")
                 return _undo
-            btn = ttk.Button(frame, text="Undo Group", command=make_undo(i))
+            btn = ttk.Button(frame, text="Undo Group")
+            btn.configure(command=make_undo(gid, lbl, btn))
             btn.grid(column=1, row=row, padx=6)
 
 
@@ -406,13 +604,32 @@ def run_app():
     btn_open.pack(side='left', padx=6)
     btn_undo = ttk.Button(controls, text="Undo Last", command=on_undo)
     btn_undo.pack(side='left', padx=6)
+    btn_redo = ttk.Button(controls, text="Redo", command=on_redo)
+    btn_redo.pack(side='left', padx=6)
     btn_history = ttk.Button(controls, text="History", command=on_history)
     btn_history.pack(side='left', padx=6)
     btn_details = ttk.Button(controls, text="Details", command=on_details)
     btn_details.pack(side='left', padx=6)
 
+    def on_data_loaded(task):
+        progress.stop()
+        if task.error is not None:
+            lbl_loading.config(text=f"Could not load career data: {task.error}")
+            return
+        loading_frame.grid_remove()
+        catalog = task.result
+        vm.attach_catalog(catalog)
+        all_careers[:] = catalog.names()
+        search_state['index'] = catalog.search_index()
+        if combo is not None:
+            combo['values'] = all_careers
+
+    data_task.poll(root, on_data_loaded)
+    export_service.poll(root)
+
     # Start with front page visible
     builder_frame.grid_remove()
+    refresh_npc_list()
     root.mainloop()
 
 
@@ -1,35 +1,104 @@
 """Glue layer between UI and generator.
 
 Provides an incremental API used by the Tk UI: start a new NPC, add careers one
-by one (expands from CSV), and obtain live formatted summary. Supports undoing
-last group of career additions.
+by one (expands from CSV), and obtain live formatted summary. Supports undo,
+redo and undoing any earlier group of career additions through
+CareerHistory; listeners registered with `subscribe` receive a
+HistoryChange naming the rows that changed.
+
+The NPC is kept as a running NPCAggregate: every add/undo applies or reverts
+only the affected CareerLevels. Each formatted summary section is cached
+against the aggregate's version for its field (the careers against the row
+list), so a refresh only re-joins the sections the last change touched.
 """
-from typing import List
+from typing import Callable, List, Sequence
 
-from npc.generator import build_npc
+from app.history import CareerHistory, HistoryChange
+from npc.aggregate import NPCAggregate
 from npc.models import CareerLevel, NPC
 from data.loader import get_career_levels
-from io_.render import format_characteristics, format_skills, format_talents
+from data.schema import parse_career_specs
+from io_.render import format_characteristics, join_skills, join_talents
 
 
 class ViewModel:
     def __init__(self):
+        self._listeners: List[Callable[[HistoryChange], None]] = []
+        # when set, career lookups use this in-memory catalog directly (no file checks)
+        self.catalog = None
+        # bumped by start_new_npc; tells builder sessions apart even when names repeat
+        self.session = 0
         self.reset()
 
     def reset(self):
         self.name = ""
         self.race = ""
-        self.career_levels: List[CareerLevel] = []
-        # history stores groups of CareerLevel objects added together
-        self._history: List[List[CareerLevel]] = []
+        self._clear(NPCAggregate())
 
     def start_new_npc(self, name: str, race: str):
         if not name:
             raise ValueError("Name required")
         self.name = name
         self.race = race
-        self.career_levels = []
-        self._history = []
+        self.session += 1
+        self._clear(NPCAggregate(self._resolve_race(race)))
+
+    def _clear(self, aggregate: NPCAggregate):
+        old_rows = len(self._hist) if hasattr(self, "_hist") else 0
+        # history stores groups of CareerLevel objects added together
+        self._hist = CareerHistory()
+        self._levels_cache = None
+        self._careers_cache = None
+        self._aggregate = aggregate
+        # summary section -> (field version, rendered text)
+        self._sections = {}
+        if old_rows:
+            self._notify(HistoryChange(removed=list(range(old_rows - 1, -1, -1))))
+
+    def attach_catalog(self, catalog):
+        """Use an already loaded CareerCatalog for lookups; add_career_str then does no I/O."""
+        self.catalog = catalog
+
+    def subscribe(self, listener: Callable[[HistoryChange], None]):
+        """Call `listener(change)` after every operation that changes the career rows."""
+        self._listeners.append(listener)
+
+    def _notify(self, change: HistoryChange):
+        for listener in list(self._listeners):
+            listener(change)
+
+    def _apply(self, change: HistoryChange) -> HistoryChange:
+        if change:
+            for cl in change.removed_levels:
+                self._aggregate.remove_level(cl)
+            for _, cl in change.inserted:
+                self._aggregate.add_level(cl)
+            self._levels_cache = None
+            self._careers_cache = None
+            self._notify(change)
+        return change
+
+    @property
+    def career_levels(self) -> List[CareerLevel]:
+        if self._levels_cache is None:
+            self._levels_cache = self._hist.levels()
+        return self._levels_cache
+
+    @property
+    def history(self) -> List[List[CareerLevel]]:
+        """Active history groups (oldest first), each the levels added together."""
+        return [self._hist.group_levels(g) for g in self._hist.active_groups()]
+
+    def history_groups(self):
+        """(stable group id, levels) pairs for the active groups, oldest first."""
+        return [(g, self._hist.group_levels(g)) for g in self._hist.active_groups()]
+
+    @staticmethod
+    def _resolve_race(race: str):
+        if not race or not race.strip():
+            return None
+        from data.races import get_race_table
+        return get_race_table().resolve(race)
 
     def add_career_str(self, career_input: str) -> List[CareerLevel]:
         """Add a career string like 'Engineer:2' or 'Smith' and return the added rows.
@@ -37,80 +106,88 @@ class ViewModel:
         Multiple comma-separated entries are allowed and all of them are recorded
         as a single history group for undo.
         """
-        parts = [p.strip() for p in career_input.split(",") if p.strip()]
         added: List[CareerLevel] = []
-        for p in parts:
-            # Support two formats: 'Name:3' and 'Name 3' (trailing level with a space)
-            if ":" in p:
-                career, lvl_str = [x.strip() for x in p.split(":", 1)]
-                try:
-                    lvl = int(lvl_str)
-                except ValueError:
-                    lvl = 1
+        for career, lvl in parse_career_specs(career_input):
+            if self.catalog is not None:
+                expanded = self.catalog.get_levels(career, lvl)
             else:
-                # Try to detect a trailing integer after the last space (e.g. 'Watchman 3')
-                sp = p.rsplit(' ', 1)
-                if len(sp) == 2 and sp[1].isdigit():
-                    career = sp[0].strip()
-                    lvl = int(sp[1])
-                else:
-                    career = p
-                    lvl = 1
-
-            expanded = get_career_levels(career, lvl)
+                expanded = get_career_levels(career, lvl)
             if not expanded:
-                cl = CareerLevel(career=career, level=lvl, status="")
-                self.career_levels.append(cl)
-                added.append(cl)
-            else:
-                self.career_levels.extend(expanded)
-                added.extend(expanded)
+                expanded = [CareerLevel(career=career, level=lvl, status="")]
+            added.extend(expanded)
 
-        if added:
-            self._history.append(added.copy())
+        self._apply(self._hist.add_group(added))
         return added
 
     def undo_last_career(self) -> List[CareerLevel]:
-        """Undo the last group of career-level additions and return the removed list."""
-        if not self._history:
-            return []
-        last_group = self._history.pop()
-        # remove the same number of items from the end
-        for _ in range(len(last_group)):
-            if self.career_levels:
-                self.career_levels.pop()
-        return last_group
+        """Undo the most recent operation and return the CareerLevels it removed.
+
+        Usually that is the last group of career additions; if the last
+        operation was itself an undo of a group, that group is restored and
+        the returned list is empty.
+        """
+        return self._apply(self._hist.undo()).removed_levels
+
+    def cancel_last_career(self) -> List[CareerLevel]:
+        """Like undo_last_career, but the operation cannot be redone afterwards."""
+        return self._apply(self._hist.undo(redoable=False)).removed_levels
+
+    def redo(self) -> List[CareerLevel]:
+        """Redo the last undone operation; returns the CareerLevels it removed (if any)."""
+        return self._apply(self._hist.redo()).removed_levels
+
+    def can_undo(self) -> bool:
+        return self._hist.can_undo()
+
+    def can_redo(self) -> bool:
+        return self._hist.can_redo()
+
+    def undo_group(self, group_id: int) -> List[CareerLevel]:
+        """Undo the history group with the given stable id; returns the removed levels."""
+        return self._apply(self._hist.remove_group(group_id)).removed_levels
 
     def undo_history_index(self, index: int) -> List[CareerLevel]:
-        """Undo a history group at a specific index (0-based).
+        """Undo the active history group at a specific index (0-based).
 
-        Removes those exact CareerLevel objects from the current career_levels
-        list and deletes the history entry. Returns the removed group.
+        Removes those exact CareerLevel objects from the current career rows.
+        The operation is recorded like any other and can be undone again.
+        Returns the removed group.
         """
-        if index < 0 or index >= len(self._history):
+        groups = self._hist.active_groups()
+        if index < 0 or index >= len(groups):
             return []
-        group = self._history.pop(index)
-        # remove each object by identity from career_levels
-        for cl in group:
-            try:
-                self.career_levels.remove(cl)
-            except ValueError:
-                # already removed or not present; ignore
-                pass
-        return group
+        return self.undo_group(groups[index])
+
+    def set_talents(self, career_level: CareerLevel, talents: Sequence[str]):
+        """Replace the talents chosen for an added career level."""
+        self._aggregate.set_talents(career_level, talents)
+        row = self._hist.row_of(career_level)
+        if row is not None:
+            self._notify(HistoryChange(updated=[(row, career_level)]))
 
     def get_current_npc(self) -> NPC:
-        return build_npc(self.name or "", self.race or "", self.career_levels)
+        return self._aggregate.to_npc(self.name or "", self.race or "", self.career_levels)
+
+    def _section(self, name: str, version: int, render: Callable[[], str]) -> str:
+        cached = self._sections.get(name)
+        if cached is None or cached[0] != version:
+            cached = self._sections[name] = (version, render())
+        return cached[1]
 
     def get_summary(self):
-        npc = self.get_current_npc()
+        agg = self._aggregate
+        levels = self.career_levels
+        if self._careers_cache is None:
+            self._careers_cache = tuple((c.career, c.level) for c in levels)
+        latest = levels[-1] if levels else None
         return {
-            "name": npc.name,
-            "race": npc.race,
-            "latest_career": npc.latest_career(),
-            "latest_status": npc.latest_status(),
-            "characteristics": format_characteristics(npc.characteristics),
-            "skills": format_skills(npc.skills),
-            "talents": format_talents(npc.talents),
-            "careers": [(c.career, c.level) for c in npc.careers],
+            "name": self.name or "",
+            "race": self.race or "",
+            "latest_career": latest.career if latest else "",
+            "latest_status": latest.status if latest else "",
+            "characteristics": self._section("characteristics", agg.char_version,
+                                             lambda: format_characteristics(agg.characteristics)),
+            "skills": self._section("skills", agg.skill_version, lambda: join_skills(agg.sorted_skills())),
+            "talents": self._section("talents", agg.talent_version, lambda: join_talents(agg.sorted_talents())),
+            "careers": self._careers_cache,
         }
@@ -0,0 +1,104 @@
+"""A virtualized list widget for very long lists (tens of thousands of rows).
+
+A plain Listbox holds one Tcl string per row, so filling it with 50k rows and
+re-filling it on every filter keystroke is slow. VirtualList keeps the rows
+in a Python list and only ever puts the currently visible slice into a
+fixed-height Listbox; its own scrollbar maps onto the full row count.
+"""
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Optional, Sequence
+
+
+class VirtualList(ttk.Frame):
+    def __init__(self, master, height: int = 12, width: int = 60,
+                 format_row: Callable[[object], str] = str,
+                 on_select: Optional[Callable[[object], None]] = None, **kw):
+        super().__init__(master, **kw)
+        self._rows: Sequence = ()
+        self._first = 0
+        self._format = format_row
+        self._on_select = on_select
+        self.listbox = tk.Listbox(self, height=height, width=width, activestyle='none', exportselection=False)
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self._on_scrollbar)
+        self.listbox.grid(column=0, row=0, sticky='nsew')
+        self.scrollbar.grid(column=1, row=0, sticky='ns')
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+        self.listbox.bind('<MouseWheel>', self._on_wheel)
+        self.listbox.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.listbox.bind('<Button-5>', lambda e: self.scroll(3))
+        self.listbox.bind('<Up>', lambda e: self._move(-1))
+        self.listbox.bind('<Down>', lambda e: self._move(1))
+        self.listbox.bind('<Prior>', lambda e: self.scroll(-self._visible()))
+        self.listbox.bind('<Next>', lambda e: self.scroll(self._visible()))
+        self.listbox.bind('<<ListboxSelect>>', self._selected)
+        self.listbox.bind('<Configure>', lambda e: self._render())
+
+    def _visible(self) -> int:
+        # rows that fit in the listbox right now (its requested height before first layout)
+        first, last = self.listbox.nearest(0), self.listbox.nearest(self.listbox.winfo_height())
+        shown = last - first + 1 if self.listbox.size() else 0
+        return max(int(self.listbox.cget('height')), shown)
+
+    def set_rows(self, rows: Sequence):
+        """Show `rows` (any sequence; only the visible slice is formatted)."""
+        self._rows = rows
+        self._first = 0
+        self._render()
+
+    def scroll(self, delta: int):
+        self._first = max(0, min(self._first + delta, max(len(self._rows) - self._visible(), 0)))
+        self._render()
+        return 'break'
+
+    def _move(self, step: int):
+        sel = self.listbox.curselection()
+        cur = self._first + (sel[0] if sel else -1)
+        target = max(0, min(cur + step, len(self._rows) - 1))
+        if target < self._first:
+            self._first = target
+        elif target >= self._first + self._visible():
+            self._first = target - self._visible() + 1
+        self._render()
+        self.listbox.selection_clear(0, 'end')
+        self.listbox.selection_set(target - self._first)
+        self._selected()
+        return 'break'
+
+    def _on_wheel(self, event):
+        return self.scroll(-1 * (event.delta // 120 or (1 if event.delta > 0 else -1)) * 3)
+
+    def _on_scrollbar(self, action, *args):
+        n = len(self._rows)
+        page = self._visible()
+        if action == 'moveto':
+            self._first = int(float(args[0]) * n)
+        elif action == 'scroll':
+            step = int(args[0]) * (page if args[1] == 'pages' else 1)
+            self._first += step
+        self._first = max(0, min(self._first, max(n - page, 0)))
+        self._render()
+
+    def _render(self):
+        page = self._visible()
+        window = self._rows[self._first:self._first + page]
+        self.listbox.delete(0, 'end')
+        if window:
+            self.listbox.insert('end', *[self._format(r) for r in window])
+        n = len(self._rows)
+        if n:
+            self.scrollbar.set(self._first / n, min(1.0, (self._first + page) / n))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def selected(self):
+        sel = self.listbox.curselection()
+        if not sel or self._first + sel[0] >= len(self._rows):
+            return None
+        return self._rows[self._first + sel[0]]
+
+    def _selected(self, event=None):
+        row = self.selected()
+        if row is not None and self._on_select is not None:
+            self._on_select(row)
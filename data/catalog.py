@@ -0,0 +1,145 @@
+"""In-memory career catalog built once from the careers CSV.
+
+Every row is parsed a single time, its comma lists are pre-split, and the
+result is indexed by exact base career name and level so that lookups are a
+dict access instead of a scan over the whole sheet. The catalog remembers the
+file's mtime/size and re-parses it only when either changes. The shared
+catalog reads its rows through the compiled snapshot (see data.snapshot).
+"""
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from settings import DATA_DIR, CAREERS_CSV
+from data.loader import read_rows
+from data.schema import split_list, split_career_label
+from npc.models import CareerLevel
+from npc.vocab import Vocabulary
+
+
+class CareerCatalog:
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path) if path is not None else Path(DATA_DIR) / CAREERS_CSV
+        # the default data files go through the compiled snapshot
+        self._use_snapshot = path is None
+        # base career name -> {level: CareerLevel}
+        self._levels: Dict[str, Dict[int, CareerLevel]] = {}
+        # casefolded name -> canonical name, for forgiving user input
+        self._aliases: Dict[str, str] = {}
+        self._names: List[str] = []
+        self._stamp: Optional[Tuple[int, int]] = None
+        # bumped on every (re)load so dependants can notice stale data
+        self.generation = 0
+        self._search = None
+        # shared skill/talent vocabularies; kept across reloads so ids stay stable
+        self.skill_vocab = Vocabulary()
+        self.talent_vocab = Vocabulary()
+
+    def _file_stamp(self) -> Tuple[int, int]:
+        if not self.path.exists():
+            raise FileNotFoundError(f"{self.path} not found")
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def refresh(self) -> bool:
+        """Parse the CSV if it is new or changed on disk. Returns True if (re)loaded."""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return False
+        self._index(self._read_rows())
+        self._stamp = stamp
+        self.generation += 1
+        return True
+
+    def _read_rows(self):
+        if self._use_snapshot:
+            from data.snapshot import load_tables
+            return load_tables()["careers"]
+        return read_rows(str(self.path.resolve()))
+
+    def _index(self, rows):
+        levels: Dict[str, Dict[int, CareerLevel]] = {}
+        for row in rows:
+            career, lvl = split_career_label(row.get("Career", ""))
+            if not career:
+                continue
+            status = (row.get("Status") or "").strip()
+            # catalog-owned rows hold tuples of interned names: every level that
+            # offers 'Lore (Medicine)' shares one string, and copies share the tuples
+            levels.setdefault(career, {})[lvl] = CareerLevel(
+                career=sys.intern(career), level=lvl, status=sys.intern(status),
+                characteristics=tuple(sys.intern(c) for c in split_list(row.get("Characteristics", ""))),
+                skills=tuple(map(self.skill_vocab.canonical, split_list(row.get("Skills", "")))),
+                talents=tuple(map(self.talent_vocab.canonical, split_list(row.get("Talents", "")))),
+            )
+        self._levels = levels
+        self._aliases = {name.casefold(): name for name in levels}
+        self._names = sorted(levels)
+        self._search = None
+
+    def resolve(self, career_name: str) -> Optional[str]:
+        """Return the canonical base name for `career_name` (exact, then case-insensitive)."""
+        name = career_name.strip()
+        if name in self._levels:
+            return name
+        return self._aliases.get(name.casefold())
+
+    def get_level(self, career_name: str, level: int) -> Optional[CareerLevel]:
+        name = self.resolve(career_name)
+        if name is None:
+            return None
+        return self._levels[name].get(level)
+
+    def get_levels(self, career_name: str, upto_level: int) -> List[CareerLevel]:
+        """Return fresh CareerLevel copies for levels 1..upto_level, sorted by level.
+
+        Copies are handed out because callers (the talent dialog) replace the
+        talents of the returned objects; the catalog's own rows stay untouched.
+        """
+        name = self.resolve(career_name)
+        if name is None:
+            return []
+        by_level = self._levels[name]
+        return [_copy_level(by_level[lvl]) for lvl in sorted(by_level) if lvl <= upto_level]
+
+    def max_level(self, career_name: str) -> int:
+        """Highest level listed for a career (0 if unknown)."""
+        name = self.resolve(career_name)
+        return max(self._levels[name]) if name is not None else 0
+
+    def names(self) -> List[str]:
+        return list(self._names)
+
+    def search_index(self):
+        """Return the CareerSearchIndex over the career names, built once per load."""
+        if self._search is None:
+            from data.search import CareerSearchIndex
+            self._search = CareerSearchIndex(self._names)
+        return self._search
+
+    def __contains__(self, career_name: str) -> bool:
+        return self.resolve(career_name) is not None
+
+
+def _copy_level(cl: CareerLevel) -> CareerLevel:
+    # the name tuples are immutable, so the copy can share them
+    return CareerLevel(career=cl.career, level=cl.level, status=cl.status,
+                       characteristics=cl.characteristics, skills=cl.skills, talents=cl.talents)
+
+
+_default: Optional[CareerCatalog] = None
+
+
+def loaded_generation() -> int:
+    """Generation of the shared catalog as last loaded (0 if not loaded); never touches the disk."""
+    return _default.generation if _default is not None else 0
+
+
+def get_catalog() -> CareerCatalog:
+    """Return the shared catalog, reloading it first if the CSV changed."""
+    global _default
+    if _default is None:
+        _default = CareerCatalog()
+    _default.refresh()
+    return _default
@@ -1,25 +1,77 @@
-"""Load CSV data into simple Python structures using pandas.
+"""Load CSV data into simple Python structures.
 
 This loader understands the semicolon-delimited CSV found in the project
 (`Careers-...csv`) and exposes a small helper to get CareerLevel objects
 for a career up to a requested level.
+
+Rows are read with the stdlib `csv` module by default (`settings.LOADER_BACKEND`).
+pandas is only imported when DataFrame output is asked for (`load_careers`,
+`load_races`, `load_talents`, or the "pandas" backend), which keeps it off the
+app's startup path.
 """
+import csv
 from pathlib import Path
-import pandas as pd
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List, Optional
 
+import settings
 from settings import DATA_DIR, CAREERS_CSV, RACES_CSV, TALENTS_CSV
 from npc.models import CareerLevel
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+BACKENDS = ("csv", "pandas")
 
-def _read_csv(name: str, sep=",") -> pd.DataFrame:
+
+def _data_path(name: str) -> Path:
+    # an absolute `name` wins over DATA_DIR (pathlib join semantics)
     path = Path(DATA_DIR) / name
     if not path.exists():
         raise FileNotFoundError(f"{path} not found")
-    return pd.read_csv(path, sep=sep)
+    return path
+
+
+def _read_csv(name: str, sep=",") -> "pd.DataFrame":
+    import pandas as pd
+    return pd.read_csv(_data_path(name), sep=sep)
+
+
+def _read_rows_csv(path: Path, sep: str) -> List[Dict[str, str]]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as fh:
+        reader = csv.reader(fh, delimiter=sep)
+        header = [c.strip() for c in next(reader, [])]
+        rows = []
+        for rec in reader:
+            # pad short rows; surplus cells and unnamed columns are dropped
+            rec = rec + [""] * (len(header) - len(rec))
+            rows.append({k: v for k, v in zip(header, rec) if k})
+    return rows
+
+
+def _read_rows_pandas(path: Path, sep: str) -> List[Dict[str, str]]:
+    import pandas as pd
+    df = pd.read_csv(path, sep=sep, dtype=str, keep_default_na=False, skip_blank_lines=False)
+    df.columns = [c.strip() for c in df.columns]
+    df = df.loc[:, [not c.startswith("Unnamed:") for c in df.columns]]
+    return df.to_dict("records")
+
+
+def read_rows(name: str, sep=";", backend: Optional[str] = None) -> List[Dict[str, str]]:
+    """Read a data CSV into a list of row dicts with plain (stripped-key) string cells.
+
+    Empty cells become "" rather than NaN, which is what the catalog and the
+    snapshot compiler expect. `backend` defaults to settings.LOADER_BACKEND.
+    """
+    backend = backend or settings.LOADER_BACKEND
+    path = _data_path(name)
+    if backend == "csv":
+        return _read_rows_csv(path, sep)
+    if backend == "pandas":
+        return _read_rows_pandas(path, sep)
+    raise ValueError(f"Unknown loader backend {backend!r}; expected one of {BACKENDS}")
 
 
-def load_careers() -> pd.DataFrame:
+def load_careers() -> "pd.DataFrame":
     # the careers CSV in the repo uses semicolons as separators
     df = _read_csv(CAREERS_CSV, sep=";")
     # Normalize column names (strip whitespace)
@@ -27,11 +79,11 @@ def load_careers() -> pd.DataFrame:
     return df
 
 
-def load_races() -> pd.DataFrame:
+def load_races() -> "pd.DataFrame":
     return _read_csv(RACES_CSV, sep=";")
 
 
-def load_talents() -> pd.DataFrame:
+def load_talents() -> "pd.DataFrame":
     return _read_csv(TALENTS_CSV, sep=";")
 
 
@@ -39,30 +91,11 @@ def get_career_levels(career_name: str, upto_level: int) -> List[CareerLevel]:
     """Return a list of CareerLevel objects for `career_name` for levels 1..upto_level.
 
     The CSV stores each career-level on a separate row like "Engineer 1", "Engineer 2".
-    This helper will match rows whose 'Career' starts with the given name and extract
-    Characteristics, Skills and Talents columns (splitting comma lists).
+    Rows are looked up in the shared CareerCatalog, which parses the file once and
+    indexes it by base career name and level.
     """
-    df = load_careers()
-    # career_name could be like 'Engineer' and CSV has 'Engineer 1' etc.
-    matched = df[df['Career'].str.startswith(career_name)]
-    results: List[CareerLevel] = []
-    for _, row in matched.iterrows():
-        # attempt to parse level from the career string e.g. 'Engineer 2'
-        parts = str(row['Career']).rsplit(' ', 1)
-        lvl = 1
-        if len(parts) == 2 and parts[1].isdigit():
-            lvl = int(parts[1])
-        if lvl <= upto_level:
-            # split semicolon CSV fields (they themselves use commas to separate lists)
-            chars = [c.strip() for c in str(row.get('Characteristics', '')).split(',') if c.strip()]
-            skills = [s.strip() for s in str(row.get('Skills', '')).split(',') if s.strip()]
-            talents = [t.strip() for t in str(row.get('Talents', '')).split(',') if t.strip()]
-            status = str(row.get('Status', '')).strip()
-            results.append(CareerLevel(career=career_name, level=lvl, status=status,
-                                       characteristics=chars, skills=skills, talents=talents))
-    # sort by level
-    results.sort(key=lambda c: c.level)
-    return results
+    from data.catalog import get_catalog
+    return get_catalog().get_levels(career_name, upto_level)
 
 
 def get_career_names() -> List[str]:
@@ -70,12 +103,5 @@ def get_career_names() -> List[str]:
 
     Example: if CSV contains 'Watchman 1', 'Watchman 2', this will return ['Watchman'].
     """
-    df = load_careers()
-    names = []
-    for val in df['Career'].astype(str).tolist():
-        # split off trailing level if present
-        base = val.rsplit(' ', 1)[0] if val.rsplit(' ', 1)[-1].isdigit() else val
-        names.append(base.strip())
-    # unique + sort
-    unique = sorted(set([n for n in names if n]))
-    return unique
+    from data.catalog import get_catalog
+    return get_catalog().names()
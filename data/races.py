@@ -0,0 +1,113 @@
+"""Indexed race table built once from `Races-Table 1.csv`.
+
+Each Race_and_Origin row is turned into a RaceProfile at load time: the base
+characteristic vector (table value + CHAR_RACE_BONUS, in CHAR_ORDER), the
+racial skills and the racial talents, so applying a race to an NPC is a plain
+dict merge rather than per-NPC string parsing. Talent entries that need a roll
+are compiled with npc.choices against the random-talent table.
+"""
+from typing import Dict, Iterable, List, Optional
+
+from settings import CHAR_RACE_BONUS
+from data.schema import split_list
+from npc.choices import ChoiceCompiler
+from npc.models import RaceProfile
+from npc.rules import CHAR_ORDER
+
+RANDOM_TALENTS_COL = "RANDOM TALENTS"
+
+
+def _clean(text: str) -> str:
+    # cells in the sheet wrap onto several lines; collapse all whitespace runs
+    return " ".join(str(text or "").split())
+
+
+def _key(name: str) -> str:
+    return _clean(name).replace("_", " ").casefold()
+
+
+def _species(name: str) -> str:
+    return _key(name.split("(", 1)[0])
+
+
+def random_talent_names(rows: Iterable[Dict[str, str]]) -> List[str]:
+    """Flatten the Random_Talents table (one comma list per row) into talent names."""
+    names: List[str] = []
+    for row in rows:
+        names.extend(split_list(_clean(row.get(RANDOM_TALENTS_COL, ""))))
+    return names
+
+
+def parse_race_row(row: Dict[str, str], compiler: Optional[ChoiceCompiler] = None) -> Optional[RaceProfile]:
+    """Build a RaceProfile from a CSV row; rows without characteristic values yield None."""
+    name = _clean(row.get("Race_and_Origin", ""))
+    values = [_clean(row.get(c, "")) for c in CHAR_ORDER]
+    if not name or not all(v.isdigit() for v in values):
+        return None
+    compiler = compiler or ChoiceCompiler()
+    rolls = compiler.compile(split_list(_clean(row.get("R_Talents_Traits", ""))))
+    movement = _clean(row.get("M", ""))
+    wounds = _clean(row.get("W", ""))
+    return RaceProfile(
+        name=name,
+        characteristics={c: int(v) + CHAR_RACE_BONUS for c, v in zip(CHAR_ORDER, values)},
+        skills=split_list(_clean(row.get("R_Skills", ""))),
+        talents=list(rolls.fixed),
+        talent_choices=list(rolls.sources),
+        talent_rolls=rolls if rolls.needs_roll() else None,
+        movement=int(movement) if movement.isdigit() else 0,
+        wounds=int(wounds) if wounds.isdigit() else 0,
+    )
+
+
+class RaceTable:
+    def __init__(self, rows=None, random_talents: Iterable[str] = ()):
+        self.compiler = ChoiceCompiler(random_talents)
+        # normalised Race_and_Origin -> profile
+        self._races: Dict[str, RaceProfile] = {}
+        # normalised species ('human', 'high elf') -> first profile of that species
+        self._species: Dict[str, RaceProfile] = {}
+        self._names: List[str] = []
+        if rows is not None:
+            self._index(rows)
+
+    def _index(self, rows):
+        races: Dict[str, RaceProfile] = {}
+        species: Dict[str, RaceProfile] = {}
+        for row in rows:
+            profile = parse_race_row(row, self.compiler)
+            if profile is None:
+                continue
+            races.setdefault(_key(profile.name), profile)
+            species.setdefault(_species(profile.name), profile)
+        self._races = races
+        self._species = species
+        self._names = [p.name for p in races.values()]
+
+    def resolve(self, race: str) -> Optional[RaceProfile]:
+        """Find the profile for a race string.
+
+        Exact Race_and_Origin matches win (case, spacing and underscores are
+        ignored); otherwise a bare species such as 'Human' or 'High Elf' maps to
+        the first origin listed for it in the sheet.
+        """
+        if not race or not race.strip():
+            return None
+        key = _key(race)
+        return self._races.get(key) or self._species.get(_species(race))
+
+    def names(self) -> List[str]:
+        return list(self._names)
+
+
+_default: Optional[RaceTable] = None
+
+
+def get_race_table() -> RaceTable:
+    """Return the shared race table, loaded from the compiled snapshot on first use."""
+    global _default
+    if _default is None:
+        from data.snapshot import load_tables
+        tables = load_tables()
+        _default = RaceTable(tables["races"], random_talent_names(tables["talents"]))
+    return _default
@@ -1,5 +1,6 @@
 """Schema: expected column names and light parsing helpers."""
-import pandas as pd
+import re
+
 CAREER_COLS = [
     "Career",
     "Level",
@@ -9,9 +10,52 @@ CAREER_COLS = [
     "Talents",
 ]
 
+# 'Engineer 2' -> ('Engineer', 2); also tolerates a missing space ('Cavalryman3')
+_CAREER_LABEL_RE = re.compile(r"^(.*?)\s*(\d+)$")
+
 
 def split_list(cell: str):
-    if not cell or (isinstance(cell, float) and pd.isna(cell)):
+    # NaN (pandas' empty cell) is the only value not equal to itself
+    if not cell or (isinstance(cell, float) and cell != cell):
         return []
     # Accept comma separated lists
     return [p.strip() for p in str(cell).split(",") if p.strip()]
+
+
+def split_career_label(label: str):
+    """Split a CSV career label into (base name, level); level defaults to 1."""
+    label = str(label).strip()
+    m = _CAREER_LABEL_RE.match(label)
+    if m and m.group(1):
+        return m.group(1).strip(), int(m.group(2))
+    return label, 1
+
+
+def parse_career_specs(text: str):
+    """Parse 'Engineer:2, Watchman 3, Smith' into [(career, level), ...].
+
+    Two formats are supported per entry: 'Name:3' and 'Name 3' (trailing level
+    after a space); entries without a level get level 1, and an unreadable
+    level after ':' also falls back to 1.
+    """
+    specs = []
+    for p in (p.strip() for p in text.split(",")):
+        if not p:
+            continue
+        if ":" in p:
+            career, lvl_str = [x.strip() for x in p.split(":", 1)]
+            try:
+                lvl = int(lvl_str)
+            except ValueError:
+                lvl = 1
+        else:
+            # Try to detect a trailing integer after the last space (e.g. 'Watchman 3')
+            sp = p.rsplit(' ', 1)
+            if len(sp) == 2 and sp[1].isdigit():
+                career = sp[0].strip()
+                lvl = int(sp[1])
+            else:
+                career = p
+                lvl = 1
+        specs.append((career, lvl))
+    return specs
@@ -0,0 +1,125 @@
+"""Prebuilt search index for career names (builder combobox suggestions).
+
+Built once per catalog load:
+
+* a word-prefix trie: every word of every name is inserted, and each trie node
+  keeps the ids of the names having a word with that prefix;
+* an n-gram index (1- to 3-grams of the lowercased name) used for substring
+  matches and to collect candidates for typo-tolerant matching.
+
+`search` ranks exact name > name prefix > word prefix > substring > fuzzy
+(edit distance 1, or 2 for words longer than five letters). A trailing level
+number in the query ('Watchman 3') is ignored for matching.
+"""
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_WORD_SPLIT = re.compile(r"[^0-9a-z']+")
+_TRAILING_LEVEL = re.compile(r"[\s:]*\d+$")
+_IDS = ""  # trie node key holding the id set (never a single character)
+_MAX_GRAM = 3
+# candidates checked with the edit distance, best n-gram overlap first
+_FUZZY_CANDIDATES = 200
+
+
+def _words(text: str) -> List[str]:
+    return [w for w in _WORD_SPLIT.split(text.lower()) if w]
+
+
+def _grams(text: str, n: int) -> Set[str]:
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, giving up early (returns limit + 1) past `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+class CareerSearchIndex:
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = list(names)
+        self._lower = [n.lower() for n in self.names]
+        self._words = [_words(n) for n in self.names]
+        self._trie: Dict = {}
+        self._grams: Dict[str, Set[int]] = {}
+        for i, (low, words) in enumerate(zip(self._lower, self._words)):
+            for w in words:
+                node = self._trie
+                for ch in w:
+                    node = node.setdefault(ch, {})
+                    node.setdefault(_IDS, set()).add(i)
+            for n in range(1, _MAX_GRAM + 1):
+                for g in _grams(low, n):
+                    self._grams.setdefault(g, set()).add(i)
+
+    def _prefix_ids(self, word: str) -> Set[int]:
+        node = self._trie
+        for ch in word:
+            node = node.get(ch)
+            if node is None:
+                return set()
+        return node.get(_IDS, set())
+
+    def _substring_ids(self, text: str) -> Set[int]:
+        if len(text) <= _MAX_GRAM:
+            return set(self._grams.get(text, ()))
+        parts = [self._grams.get(g, set()) for g in _grams(text, _MAX_GRAM)]
+        cands = set.intersection(*parts) if parts else set()
+        return {i for i in cands if text in self._lower[i]}
+
+    def _fuzzy(self, word: str) -> Dict[int, int]:
+        """name id -> best edit distance of `word` against a word (or word prefix) of the name."""
+        limit = 1 if len(word) <= 5 else 2
+        votes: Counter = Counter()
+        for g in _grams(word, 2):
+            votes.update(self._grams.get(g, ()))
+        out: Dict[int, int] = {}
+        for i, _ in votes.most_common(_FUZZY_CANDIDATES):
+            best = limit + 1
+            for w in self._words[i]:
+                best = min(best, _edit_distance(word, w[:len(word)], limit),
+                           _edit_distance(word, w, limit))
+            if best <= limit:
+                out[i] = best
+        return out
+
+    def search(self, query: str, limit: Optional[int] = None, fuzzy: bool = True) -> List[str]:
+        """Return names matching `query`, best first. An empty query returns every name."""
+        q = _TRAILING_LEVEL.sub("", query.strip()).lower()
+        if not q:
+            return self.names[:limit] if limit else list(self.names)
+        words = _words(q)
+        scores: Dict[int, Tuple[int, int]] = {}
+
+        def offer(i: int, tier: int, dist: int = 0):
+            if i not in scores or (tier, dist) < scores[i]:
+                scores[i] = (tier, dist)
+
+        # word-prefix matches: every query word must prefix some word of the name
+        if words:
+            sets = [self._prefix_ids(w) for w in words]
+            for i in set.intersection(*sets):
+                low = self._lower[i]
+                offer(i, 0 if low == q else 1 if low.startswith(q) else 2)
+        for i in self._substring_ids(q):
+            offer(i, 3)
+        if fuzzy and not scores and words and all(len(w) >= 3 for w in words):
+            per_word = [self._fuzzy(w) for w in words]
+            for i in set.intersection(*(set(d) for d in per_word)):
+                offer(i, 4, sum(d[i] for d in per_word))
+
+        ranked = sorted(scores, key=lambda i: (scores[i], len(self.names[i]), self.names[i]))
+        if limit:
+            ranked = ranked[:limit]
+        return [self.names[i] for i in ranked]
@@ -0,0 +1,103 @@
+"""Compiled binary snapshot of the CSV tables for fast cold start.
+
+The careers, races and random-talent CSVs are compiled into one pickle file
+(`settings.SNAPSHOT_PATH`) whose header carries a SHA-256 of the source files.
+`load_tables` only hashes the CSVs (cheap) and loads the snapshot directly;
+it falls back to parsing the CSVs, and rewrites the snapshot, when the hash
+differs. Run `python -m data.snapshot` to build it and print load timings.
+"""
+import hashlib
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from settings import DATA_DIR, CAREERS_CSV, RACES_CSV, TALENTS_CSV, SNAPSHOT_PATH
+
+MAGIC = b"WFRPSNP1"
+# table key -> CSV filename
+SOURCES = {
+    "careers": CAREERS_CSV,
+    "races": RACES_CSV,
+    "talents": TALENTS_CSV,
+}
+
+# how the most recent load_tables call was served: {'source': ..., 'seconds': ...}
+last_load: Dict[str, object] = {}
+
+
+def source_hash() -> bytes:
+    """SHA-256 digest over the raw bytes of all source CSVs, in SOURCES order."""
+    h = hashlib.sha256()
+    for key, name in SOURCES.items():
+        h.update(key.encode("utf-8"))
+        h.update((Path(DATA_DIR) / name).read_bytes())
+    return h.digest()
+
+
+def _read_sources() -> Dict[str, List[Dict[str, str]]]:
+    from data.loader import read_rows
+    return {key: read_rows(name) for key, name in SOURCES.items()}
+
+
+def compile_snapshot(path: Optional[Union[str, Path]] = None) -> Dict[str, List[Dict[str, str]]]:
+    """Parse the CSVs and write them to the snapshot file. Returns the parsed tables."""
+    path = Path(path) if path is not None else Path(SNAPSHOT_PATH)
+    digest = source_hash()
+    tables = _read_sources()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(MAGIC)
+            fh.write(digest)
+            pickle.dump(tables, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        # read-only install or similar; the parsed tables are still usable
+        pass
+    return tables
+
+
+def _read_snapshot(path: Path, digest: bytes) -> Optional[Dict[str, List[Dict[str, str]]]]:
+    try:
+        with open(path, "rb") as fh:
+            if fh.read(len(MAGIC)) != MAGIC or fh.read(len(digest)) != digest:
+                return None
+            return pickle.load(fh)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def load_tables(path: Optional[Union[str, Path]] = None) -> Dict[str, List[Dict[str, str]]]:
+    """Return all tables as row dicts, from the snapshot when it is still current."""
+    path = Path(path) if path is not None else Path(SNAPSHOT_PATH)
+    start = time.perf_counter()
+    tables = _read_snapshot(path, source_hash())
+    source = "snapshot"
+    if tables is None:
+        tables = compile_snapshot(path)
+        source = "csv"
+    last_load.clear()
+    last_load.update(source=source, seconds=time.perf_counter() - start)
+    return tables
+
+
+def measure_load_times(path: Optional[Union[str, Path]] = None) -> Dict[str, float]:
+    """Time a cold load (CSV parse + compile) and a warm load (snapshot hit), in seconds."""
+    path = Path(path) if path is not None else Path(SNAPSHOT_PATH)
+    start = time.perf_counter()
+    compile_snapshot(path)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    load_tables(path)
+    warm = time.perf_counter() - start
+    return {"cold": cold, "warm": warm}
+
+
+if __name__ == "__main__":
+    times = measure_load_times()
+    print(f"Snapshot written to {SNAPSHOT_PATH}")
+    print(f"cold load (CSV): {times['cold'] * 1000:.1f} ms")
+    print(f"warm load (snapshot): {times['warm'] * 1000:.1f} ms")
@@ -0,0 +1,291 @@
+"""Export formats: a renderer registry over one shared per-NPC document.
+
+Every renderer reads an NPCDocument, a format-neutral snapshot of an NPC with
+its skills and talents already sorted (case-insensitively, like io_.render)
+and the joined text pieces computed on first use. `npc_document` caches the
+documents of recently rendered NPCs, so writing one batch as .txt, Markdown,
+HTML and JSON sorts and formats each NPC once, not once per format. The cache
+is keyed by the NPC's content, not its identity: an NPC edited in place gets
+a fresh document, and no NPC is kept alive by the cache.
+
+Built-in formats:
+
+    txt   the templates/npc_text.txt template (io_.writer)
+    md    Markdown
+    html  a small standalone HTML page
+    json  plain JSON
+    vtt   Foundry-VTT-style actor JSON (WFRP 4e system layout)
+
+More can be added with `register_renderer`.
+"""
+import html
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from settings import RENDER_CACHE_SIZE
+from io_.render import format_characteristics, join_skills, join_talents
+
+Pairs = Tuple[Tuple[str, int], ...]
+
+
+def _sorted_pairs(d) -> Pairs:
+    return tuple(sorted(d.items(), key=lambda x: x[0].lower()))
+
+
+class NPCDocument:
+    """Format-neutral view of one NPC, shared by all renderers."""
+    __slots__ = ("name", "race", "latest_career", "latest_status", "careers",
+                 "characteristics", "skills", "talents", "_text")
+
+    def __init__(self, npc):
+        self.name: str = npc.name
+        self.race: str = npc.race
+        self.latest_career: str = npc.latest_career()
+        self.latest_status: str = npc.latest_status()
+        # (career, level, status) per level taken
+        self.careers: Tuple[Tuple[str, int, str], ...] = tuple((cl.career, cl.level, cl.status) for cl in npc.careers)
+        self.characteristics: Pairs = tuple(npc.characteristics.items())
+        self.skills: Pairs = _sorted_pairs(npc.skills)
+        self.talents: Pairs = _sorted_pairs(npc.talents)
+        self._text: Optional[Dict[str, str]] = None
+
+    def text(self) -> Dict[str, str]:
+        """The joined characteristics/skills/talents strings of the text export."""
+        if self._text is None:
+            self._text = {
+                "characteristics": format_characteristics(dict(self.characteristics)),
+                "skills": join_skills(self.skills),
+                "talents": join_talents(self.talents),
+            }
+        return self._text
+
+    def template_values(self) -> Dict[str, str]:
+        """Field values for the text template."""
+        return dict(self.text(), name=self.name, race=self.race,
+                    latest_career=self.latest_career, latest_status=self.latest_status)
+
+
+def _fingerprint(npc) -> tuple:
+    """Everything an NPCDocument is built from, as a hashable tuple."""
+    return (npc.name, npc.race, tuple((cl.career, cl.level, cl.status) for cl in npc.careers),
+            tuple(npc.characteristics.items()), tuple(npc.skills.items()), tuple(npc.talents.items()))
+
+
+class _DocumentCache:
+    """Thread-safe LRU of NPCDocuments keyed by the NPC's content (`_fingerprint`).
+
+    Taking the fingerprint is a linear copy; building a document also sorts
+    and joins, and a batch asks for the same document once per format.
+    """
+
+    def __init__(self, maxsize: int = RENDER_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[tuple, NPCDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, npc) -> NPCDocument:
+        key = _fingerprint(npc)
+        with self._lock:
+            doc = self._data.get(key)
+            if doc is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return doc
+            self.misses += 1
+        doc = NPCDocument(npc)
+        if self.maxsize > 0:
+            with self._lock:
+                self._data[key] = doc
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return doc
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+
+_documents = _DocumentCache()
+
+
+def npc_document(npc) -> NPCDocument:
+    """The (cached) document of an NPC or NPCView."""
+    if isinstance(npc, NPCDocument):
+        return npc
+    return _documents.get(npc)
+
+
+def render_cache_info() -> Dict[str, int]:
+    return _documents.info()
+
+
+def clear_render_cache():
+    _documents.clear()
+
+
+class Renderer(NamedTuple):
+    name: str
+    extension: str
+    render: Callable[[NPCDocument], str]
+
+
+_renderers: Dict[str, Renderer] = {}
+
+
+def register_renderer(name: str, extension: str):
+    """Decorator registering `fn(doc) -> str` as export format `name` (files end in `extension`)."""
+    def deco(fn: Callable[[NPCDocument], str]):
+        _renderers[name] = Renderer(name, extension, fn)
+        return fn
+    return deco
+
+
+def get_renderer(name: str) -> Renderer:
+    try:
+        return _renderers[name]
+    except KeyError:
+        raise ValueError(f"unknown export format {name!r} (known: {', '.join(_renderers)})") from None
+
+
+def available_formats() -> List[str]:
+    return list(_renderers)
+
+
+def render(npc, fmt: str = "txt") -> str:
+    """Render an NPC (or NPCDocument) in one registered format."""
+    return get_renderer(fmt).render(npc_document(npc))
+
+
+def render_all(npc, formats: Iterable[str]) -> Dict[str, str]:
+    """Render an NPC in several formats from one document."""
+    doc = npc_document(npc)
+    return {fmt: get_renderer(fmt).render(doc) for fmt in formats}
+
+
+# --- built-in renderers ---------------------------------------------------
+
+@register_renderer("txt", ".txt")
+def render_txt(doc: NPCDocument) -> str:
+    from io_.writer import load_template
+    return load_template().render(doc.template_values())
+
+
+def _career_path(doc: NPCDocument) -> str:
+    return ", ".join(f"{career} {level}" for career, level, _ in doc.careers)
+
+
+@register_renderer("md", ".md")
+def render_markdown(doc: NPCDocument) -> str:
+    text = doc.text()
+    names = [c for c, _ in doc.characteristics]
+    lines = [f"# {doc.name}", "",
+             f"**Race:** {doc.race}  ",
+             f"**Latest Career:** {doc.latest_career}  ",
+             f"**Latest Status:** {doc.latest_status}", ""]
+    if names:
+        lines += ["| " + " | ".join(names) + " |",
+                  "|" + "---:|" * len(names),
+                  "| " + " | ".join(str(v) for _, v in doc.characteristics) + " |", ""]
+    lines += [f"**Skills:** {text['skills']}", "",
+              f"**Talents:** {text['talents']}", ""]
+    if doc.careers:
+        lines += [f"**Career Path:** {_career_path(doc)}", ""]
+    return "\n".join(lines)
+
+
+@register_renderer("html", ".html")
+def render_html(doc: NPCDocument) -> str:
+    e = html.escape
+    text = doc.text()
+    head = "".join(f"<th>{e(c)}</th>" for c, _ in doc.characteristics)
+    row = "".join(f"<td>{v}</td>" for _, v in doc.characteristics)
+    parts = [
+        "<!DOCTYPE html>",
+        f'<html><head><meta charset="utf-8"><title>{e(doc.name)}</title></head><body>',
+        f"<h1>{e(doc.name)}</h1>",
+        "<dl>",
+        f"<dt>Race</dt><dd>{e(doc.race)}</dd>",
+        f"<dt>Latest Career</dt><dd>{e(doc.latest_career)}</dd>",
+        f"<dt>Latest Status</dt><dd>{e(doc.latest_status)}</dd>",
+        "</dl>",
+        f"<table><tr>{head}</tr><tr>{row}</tr></table>",
+        f"<h2>Skills</h2><p>{e(text['skills'])}</p>",
+        f"<h2>Talents</h2><p>{e(text['talents'])}</p>",
+    ]
+    if doc.careers:
+        parts.append(f"<h2>Career Path</h2><p>{e(_career_path(doc))}</p>")
+    parts.append("</body></html>")
+    return "\n".join(parts) + "\n"
+
+
+def npc_dict(npc) -> dict:
+    """The plain-JSON form of an NPC (or NPCDocument), as the 'json' format writes it."""
+    doc = npc_document(npc)
+    return {
+        "name": doc.name,
+        "race": doc.race,
+        "latest_career": doc.latest_career,
+        "latest_status": doc.latest_status,
+        "careers": [{"career": c, "level": lvl, "status": st} for c, lvl, st in doc.careers],
+        "characteristics": dict(doc.characteristics),
+        "skills": dict(doc.skills),
+        "talents": dict(doc.talents),
+    }
+
+
+def npc_from_dict(data: dict):
+    """Inverse of npc_dict; ValueError if `data` is not an NPC."""
+    from npc.models import NPC, CareerLevel
+    try:
+        careers = [CareerLevel(career=str(c["career"]), level=int(c.get("level", 0)), status=str(c.get("status", "")))
+                   for c in data.get("careers", ())]
+        return NPC(name=str(data["name"]), race=str(data.get("race", "")), careers=careers,
+                   characteristics={str(k): int(v) for k, v in dict(data.get("characteristics", {})).items()},
+                   skills={str(k): int(v) for k, v in dict(data.get("skills", {})).items()},
+                   talents={str(k): int(v) for k, v in dict(data.get("talents", {})).items()})
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        raise ValueError(f"not an NPC: {e!r}") from None
+
+
+@register_renderer("json", ".json")
+def render_json(doc: NPCDocument) -> str:
+    return json.dumps(npc_dict(doc), indent=2, ensure_ascii=False) + "\n"
+
+
+# CHAR_ORDER names -> the WFRP 4e system's characteristic keys
+VTT_CHARACTERISTICS = {"Ws": "ws", "Bs": "bs", "S": "s", "T": "t", "I": "i",
+                       "Agi": "ag", "Dex": "dex", "Int": "int", "Wp": "wp", "Fel": "fel"}
+
+
+def _vtt_item(name: str, kind: str, advances: int) -> dict:
+    return {"name": name, "type": kind, "system": {"advances": {"value": advances}}}
+
+
+@register_renderer("vtt", ".vtt.json")
+def render_vtt(doc: NPCDocument) -> str:
+    items = [_vtt_item(s, "skill", v) for s, v in doc.skills]
+    items += [_vtt_item(t, "talent", n) for t, n in doc.talents]
+    return json.dumps({
+        "name": doc.name,
+        "type": "npc",
+        "system": {
+            "characteristics": {VTT_CHARACTERISTICS.get(c, c.lower()): {"initial": v, "advances": 0}
+                                for c, v in doc.characteristics},
+            "details": {
+                "species": {"value": doc.race},
+                "career": {"value": doc.latest_career},
+                "status": {"value": doc.latest_status},
+            },
+        },
+        "items": items,
+        "flags": {"wfrp-npc-gen": {"careers": [[c, lvl, st] for c, lvl, st in doc.careers]}},
+    }, indent=2, ensure_ascii=False) + "\n"
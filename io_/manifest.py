@@ -0,0 +1,225 @@
+"""Manifest index of the NPC files in an output folder.
+
+The front page lists every exported NPC; opening and parsing each .txt for
+that does not scale to tens of thousands of files. Instead each output folder
+keeps a hidden `.npc_manifest.json` with one entry per file (name, race,
+latest career/status, mtime, size). io_.writer records every NPC it writes,
+and `reconcile` catches changes made behind its back with one os.scandir
+pass: only files whose mtime or size differ are opened, and then only for
+their header lines.
+
+Single exports do not rewrite the whole manifest each time: `save_later`
+coalesces them into one save after SAVE_DELAY_S, and `flush_manifests`
+(also run at exit) writes whatever is still pending.
+"""
+import atexit
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+MANIFEST_NAME = ".npc_manifest.json"
+MANIFEST_VERSION = 1
+# template header lines -> entry fields (see templates/npc_text.txt)
+HEADER_FIELDS = {"Name": "name", "Race": "race", "Latest Career": "latest_career",
+                 "Latest Status": "latest_status"}
+_HEADER_LINES = 8
+# quiet time after the last single-file change before the manifest is written
+SAVE_DELAY_S = 2.0
+
+
+class ManifestEntry(NamedTuple):
+    filename: str
+    name: str
+    race: str
+    latest_career: str
+    latest_status: str
+    mtime_ns: int
+    size: int
+
+
+def read_header(path: Union[str, Path]) -> Dict[str, str]:
+    """Parse the 'Key: value' header lines at the top of an exported NPC file."""
+    fields = dict.fromkeys(HEADER_FIELDS.values(), "")
+    with open(path, "r", encoding="utf-8", errors="replace") as fh:
+        for _, line in zip(range(_HEADER_LINES), fh):
+            key, sep, value = line.partition(":")
+            if sep and key.strip() in HEADER_FIELDS:
+                fields[HEADER_FIELDS[key.strip()]] = value.strip()
+    return fields
+
+
+def _is_npc_file(name: str) -> bool:
+    return name.endswith(".txt") and not name.startswith(".")
+
+
+class Manifest:
+    def __init__(self, out_dir: Union[str, Path]):
+        self.out_dir = Path(out_dir)
+        self.path = self.out_dir / MANIFEST_NAME
+        self._entries: Dict[str, ManifestEntry] = {}
+        self._lock = threading.RLock()
+        # held across snapshot, write and rename so saves land on disk in order
+        self._save_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._dirty = False
+        # bumped on every change so views can tell when to re-filter
+        self.version = 0
+        self._sorted = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return
+        for row in data.get("entries", []):
+            try:
+                entry = ManifestEntry(*row)
+            except TypeError:
+                continue
+            self._entries[entry.filename] = entry
+
+    def save(self):
+        """Write the manifest (atomically) if anything changed since the last save."""
+        with self._save_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                rows = [list(e) for e in self._entries.values()]
+                self._dirty = False
+            try:
+                self.out_dir.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_name(f"{MANIFEST_NAME}.{os.getpid()}.{threading.get_ident()}.tmp")
+                with open(tmp, "w", encoding="utf-8") as fh:
+                    json.dump({"version": MANIFEST_VERSION, "entries": rows}, fh, separators=(",", ":"))
+                os.replace(tmp, self.path)
+            except BaseException:
+                with self._lock:
+                    self._dirty = True
+                raise
+
+    def save_later(self, delay: float = SAVE_DELAY_S):
+        """Save once no further change has arrived for `delay` seconds (or at flush/exit)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self.save)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _put(self, entry: ManifestEntry):
+        self._entries[entry.filename] = entry
+        self._dirty = True
+        self.version += 1
+
+    def record(self, path: Union[str, Path], npc) -> ManifestEntry:
+        """Add or update the entry for a file the writer has just written."""
+        path = Path(path)
+        st = os.stat(path)
+        entry = ManifestEntry(path.name, npc.name, npc.race, npc.latest_career(), npc.latest_status(),
+                              st.st_mtime_ns, st.st_size)
+        with self._lock:
+            self._put(entry)
+        return entry
+
+    def reconcile(self) -> Tuple[int, int, int]:
+        """Sync with the folder; returns (added, updated, removed) and saves if changed.
+
+        Unchanged files cost one stat each; new or modified ones are opened
+        for their header only.
+        """
+        added = updated = 0
+        seen = set()
+        if self.out_dir.is_dir():
+            with os.scandir(self.out_dir) as it:
+                for de in it:
+                    if not _is_npc_file(de.name) or not de.is_file():
+                        continue
+                    seen.add(de.name)
+                    st = de.stat()
+                    with self._lock:
+                        old = self._entries.get(de.name)
+                    if old is not None and (old.mtime_ns, old.size) == (st.st_mtime_ns, st.st_size):
+                        continue
+                    try:
+                        header = read_header(de.path)
+                    except OSError:
+                        continue
+                    entry = ManifestEntry(de.name, header["name"] or Path(de.name).stem.replace("_", " "),
+                                          header["race"], header["latest_career"], header["latest_status"],
+                                          st.st_mtime_ns, st.st_size)
+                    with self._lock:
+                        self._put(entry)
+                    if old is None:
+                        added += 1
+                    else:
+                        updated += 1
+        with self._lock:
+            gone = [name for name in self._entries if name not in seen]
+            for name in gone:
+                del self._entries[name]
+            if gone:
+                self._dirty = True
+                self.version += 1
+        self.save()
+        return added, updated, len(gone)
+
+    def _sorted_view(self) -> Tuple[List[ManifestEntry], List[str]]:
+        # entries sorted by name plus their casefolded search text, rebuilt only after changes
+        with self._lock:
+            if self._sorted is None or self._sorted[0] != self.version:
+                items = sorted(self._entries.values(), key=lambda e: (e.name.casefold(), e.filename))
+                hays = [f"{e.name}\n{e.race}\n{e.latest_career}\n{e.latest_status}".casefold() for e in items]
+                self._sorted = (self.version, items, hays)
+            return self._sorted[1], self._sorted[2]
+
+    def entries(self) -> List[ManifestEntry]:
+        """All entries, sorted by NPC name (case-insensitive)."""
+        return list(self._sorted_view()[0])
+
+    def filter(self, query: str = "") -> List[ManifestEntry]:
+        """Entries whose name, race or latest career/status contain every word of `query`."""
+        words = query.casefold().split()
+        items, hays = self._sorted_view()
+        if not words:
+            return list(items)
+        return [e for e, hay in zip(items, hays) if all(w in hay for w in words)]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_manifests: Dict[Path, Manifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def flush_manifests():
+    """Save every open manifest that has unsaved changes."""
+    with _manifests_lock:
+        manifests = list(_manifests.values())
+    for m in manifests:
+        m.save()
+
+
+atexit.register(flush_manifests)
+
+
+def get_manifest(out_dir: Optional[Union[str, Path]] = None) -> Manifest:
+    """The shared Manifest of an output folder (default: settings.OUTPUT_DIR)."""
+    if out_dir is None:
+        import settings
+        out_dir = settings.OUTPUT_DIR
+    key = Path(out_dir).resolve()
+    with _manifests_lock:
+        m = _manifests.get(key)
+        if m is None:
+            m = _manifests[key] = Manifest(key)
+        return m
@@ -0,0 +1,182 @@
+"""Read exported NPC text files (templates/npc_text.txt layout) back into NPCs.
+
+The inverse of io_.writer: 'Key: value' header lines, then the
+Characteristics, Skills and Talents sections, each a comma-separated line.
+Skills come back with their values and talents with their counts ('Hardy 2'
+is two Hardy, a bare name is one). Items are split on every comma, as the
+catalog splits its cells (data.schema.split_list), so names never hold one.
+
+A text export only keeps the latest career and status. The NPC gets one
+CareerLevel for it (level 0), or, given a catalog, that career's levels up
+to the highest one with the matching status whose skills the NPC has.
+
+`iter_npc_files` streams a whole folder in name order. Large folders are
+parsed in chunks by a process pool with a bounded number of chunks in
+flight, so memory stays flat however many files there are.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from data.schema import split_list
+from npc.models import NPC, CareerLevel
+from io_.manifest import HEADER_FIELDS, _is_npc_file
+
+SECTIONS = ("Characteristics", "Skills", "Talents")
+DEFAULT_CHUNK = 500
+
+
+def parse_characteristics(line: str) -> Dict[str, int]:
+    out = {}
+    for item in split_list(line):
+        key, sep, value = item.partition(":")
+        if not sep:
+            raise ValueError(f"bad characteristic {item!r}")
+        out[key.strip()] = int(value)
+    return out
+
+
+def parse_skills(line: str) -> Dict[str, int]:
+    out = {}
+    for item in split_list(line):
+        name, _, value = item.rpartition(" ")
+        try:
+            out[name] = int(value)
+        except ValueError:
+            raise ValueError(f"bad skill {item!r}") from None
+    return out
+
+
+def parse_talents(line: str) -> Dict[str, int]:
+    """Inverse of io_.render.join_talents: 'Name N' for N > 1, else 'Name'."""
+    out = {}
+    for item in split_list(line):
+        name, _, count = item.rpartition(" ")
+        if name and count.isdigit() and int(count) > 1:
+            out[name] = int(count)
+        else:
+            out[item] = 1
+    return out
+
+
+def parse_npc_text(text: str) -> NPC:
+    """Parse the text of one exported NPC; ValueError if it is not one."""
+    header: Dict[str, str] = {}
+    sections: Dict[str, List[str]] = {}
+    current = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            current = None
+            continue
+        if current is not None:
+            sections[current].append(line)
+            continue
+        key, sep, value = line.partition(":")
+        if not sep:
+            continue
+        key, value = key.strip(), value.strip()
+        if key in SECTIONS and not value:
+            current = key
+            sections[key] = []
+        elif key in HEADER_FIELDS:
+            header[HEADER_FIELDS[key]] = value
+    if not header.get("name"):
+        raise ValueError("no 'Name:' line")
+    body = {key: ", ".join(lines) for key, lines in sections.items()}
+    careers = []
+    if header.get("latest_career"):
+        careers.append(CareerLevel(career=header["latest_career"], level=0, status=header.get("latest_status", "")))
+    return NPC(name=header["name"], race=header.get("race", ""), careers=careers,
+               characteristics=parse_characteristics(body.get("Characteristics", "")),
+               skills=parse_skills(body.get("Skills", "")),
+               talents=parse_talents(body.get("Talents", "")))
+
+
+def read_npc(path: Union[str, Path]) -> NPC:
+    with open(path, "r", encoding="utf-8") as fh:
+        return parse_npc_text(fh.read())
+
+
+def _read_chunk(paths: List[str]) -> List[Tuple[str, Optional[NPC], Optional[Exception]]]:
+    out = []
+    for path in paths:
+        try:
+            out.append((path, read_npc(path), None))
+        except (OSError, ValueError) as e:
+            out.append((path, None, e))
+    return out
+
+
+def restore_careers(npc: NPC, catalog, _memo: Optional[dict] = None) -> NPC:
+    """Replace the latest-career placeholder with the catalog's levels 1..N.
+
+    N is the highest level with the exported status whose skills all appear
+    on the NPC (several levels often share a status); the placeholder stays
+    if the career or status is unknown.
+    """
+    if len(npc.careers) != 1 or npc.careers[0].level != 0:
+        return npc
+    last = npc.careers[0]
+    key = (last.career, last.status.casefold())
+    levels = _memo.get(key) if _memo is not None else None
+    if levels is None:
+        levels = []
+        for lvl in range(1, catalog.max_level(last.career) + 1):
+            cl = catalog.get_level(last.career, lvl)
+            if cl is not None and cl.status.casefold() == key[1]:
+                levels.append((lvl, tuple(cl.skills)))
+        if _memo is not None:
+            _memo[key] = levels
+    if levels:
+        reached = [lvl for lvl, skills in levels if all(s in npc.skills for s in skills)]
+        npc.careers = catalog.get_levels(last.career, max(reached) if reached else levels[0][0])
+    return npc
+
+
+def npc_files(folder: Union[str, Path]) -> List[str]:
+    """Paths of the NPC .txt files in `folder`, sorted by name."""
+    with os.scandir(folder) as it:
+        names = sorted(de.name for de in it if _is_npc_file(de.name) and de.is_file())
+    return [os.path.join(folder, name) for name in names]
+
+
+def iter_npc_files(folder: Union[str, Path], workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK,
+                   catalog=None, on_error: Optional[Callable[[Path, Exception], None]] = None
+                   ) -> Iterator[Tuple[Path, NPC]]:
+    """Yield (path, NPC) for every exported file in `folder`, in name order.
+
+    `workers` defaults to os.cpu_count(); folders of a single chunk are read
+    in-process. Unreadable or malformed files raise ValueError, unless
+    `on_error(path, exc)` is given, in which case they are reported and skipped.
+    """
+    paths = npc_files(folder)
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    memo: dict = {}
+
+    def emit(results):
+        for path, npc, err in results:
+            if err is not None:
+                if on_error is None:
+                    raise ValueError(f"{path}: {err}") from err
+                on_error(Path(path), err)
+                continue
+            if catalog is not None:
+                restore_careers(npc, catalog, memo)
+            yield Path(path), npc
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield from emit(_read_chunk(chunk))
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_read_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from emit(pending.popleft().result())
+        while pending:
+            yield from emit(pending.popleft().result())
@@ -1,16 +1,26 @@
 """Convert NPC dataclass to string components for export."""
-from typing import List
+from typing import Iterable, List, Tuple
 
 
 def format_characteristics(chars: dict) -> str:
     return ", ".join(f"{k}: {v}" for k, v in chars.items())
 
 
+def join_skills(items: Iterable[Tuple[str, int]]) -> str:
+    """Join already-sorted (skill, value) pairs."""
+    return ", ".join(f"{k} {v}" for k, v in items)
+
+
+def join_talents(items: Iterable[Tuple[str, int]]) -> str:
+    """Join already-sorted (talent, count) pairs; counts only shown above 1."""
+    return ", ".join(f"{k} {v}" if v > 1 else k for k, v in items)
+
+
 def format_skills(skills: dict) -> str:
     items = sorted(skills.items(), key=lambda x: x[0].lower())
-    return ", ".join(f"{k} {v}" for k, v in items)
+    return join_skills(items)
 
 
 def format_talents(talents: dict) -> str:
     items = sorted(talents.items(), key=lambda x: x[0].lower())
-    return ", ".join(f"{k} {v}" if v > 1 else k for k, v in items)
+    return join_talents(items)
@@ -0,0 +1,195 @@
+"""Single-file NPC store (stdlib sqlite3) as an alternative to one .txt per NPC.
+
+NPCs are appended to one SQLite database with indexes on name, race and every
+career in their path, so a campaign's thousands of NPCs can be listed and
+searched without touching a file per NPC. Stored NPCs can be exported on
+demand through the usual text template (io_.writer).
+
+The backend is chosen in app_config.json:
+
+    "storage": "sqlite",              # default "txt"
+    "store_path": "/path/npcs.sqlite" # default <output_dir>/npcs.sqlite
+"""
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Union
+
+import settings
+from npc.models import NPC, CareerLevel
+
+STORAGE_BACKENDS = ("txt", "sqlite")
+STORE_FILENAME = "npcs.sqlite"
+DEFAULT_BATCH = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS npcs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    race TEXT NOT NULL,
+    latest_career TEXT NOT NULL,
+    latest_status TEXT NOT NULL,
+    created REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS npc_careers (
+    npc_id INTEGER NOT NULL REFERENCES npcs(id) ON DELETE CASCADE,
+    career TEXT NOT NULL,
+    level INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS npcs_name ON npcs(name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS npcs_race ON npcs(race COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS npc_careers_career ON npc_careers(career COLLATE NOCASE, npc_id);
+"""
+
+
+class StoredNPC(NamedTuple):
+    """One index row: enough to list or filter NPCs without decoding their stats."""
+    id: int
+    name: str
+    race: str
+    latest_career: str
+    latest_status: str
+
+
+def _encode(npc) -> str:
+    return json.dumps({
+        "characteristics": dict(npc.characteristics.items()),
+        "skills": dict(npc.skills.items()),
+        "talents": dict(npc.talents.items()),
+        "careers": [[cl.career, cl.level, cl.status, list(cl.characteristics), list(cl.skills), list(cl.talents)]
+                    for cl in npc.careers],
+    }, separators=(",", ":"))
+
+
+def _decode(name: str, race: str, data: str) -> NPC:
+    d = json.loads(data)
+    careers = [CareerLevel(career=c, level=lvl, status=st, characteristics=tuple(ch), skills=tuple(sk),
+                           talents=list(tl)) for c, lvl, st, ch, sk, tl in d["careers"]]
+    return NPC(name=name, race=race, careers=careers, characteristics=d["characteristics"],
+               skills=d["skills"], talents=d["talents"])
+
+
+class NPCStore:
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # check_same_thread=False: the UI hands exports to worker threads; writes are serialised by sqlite
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _insert(self, cur, npc) -> int:
+        cur.execute("INSERT INTO npcs (name, race, latest_career, latest_status, created, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (npc.name, npc.race, npc.latest_career(), npc.latest_status(), time.time(), _encode(npc)))
+        npc_id = cur.lastrowid
+        # one row per distinct career, at the highest level reached in it
+        reached = {}
+        for cl in npc.careers:
+            reached[cl.career] = max(cl.level, reached.get(cl.career, 0))
+        cur.executemany("INSERT INTO npc_careers (npc_id, career, level) VALUES (?, ?, ?)",
+                        [(npc_id, c, lvl) for c, lvl in reached.items()])
+        return npc_id
+
+    def add(self, npc) -> int:
+        """Store one NPC; returns its id."""
+        with self._conn:
+            return self._insert(self._conn.cursor(), npc)
+
+    def add_many(self, npcs: Iterable, batch_size: int = DEFAULT_BATCH) -> Iterator[int]:
+        """Store a stream of NPCs, committing once per `batch_size`; yields ids as batches commit."""
+        batch = []
+        for npc in npcs:
+            batch.append(npc)
+            if len(batch) >= batch_size:
+                yield from self._add_batch(batch)
+                batch = []
+        if batch:
+            yield from self._add_batch(batch)
+
+    def _add_batch(self, npcs: List) -> List[int]:
+        with self._conn:
+            cur = self._conn.cursor()
+            return [self._insert(cur, npc) for npc in npcs]
+
+    def get(self, npc_id: int) -> Optional[NPC]:
+        row = self._conn.execute("SELECT name, race, data FROM npcs WHERE id = ?", (npc_id,)).fetchone()
+        return _decode(*row) if row else None
+
+    def find(self, name: Optional[str] = None, race: Optional[str] = None, career: Optional[str] = None,
+             limit: Optional[int] = None) -> List[StoredNPC]:
+        """Index rows matching all given filters (case-insensitive, exact), oldest first.
+
+        `career` matches any career in the NPC's path, not just the latest one.
+        """
+        sql = "SELECT id, name, race, latest_career, latest_status FROM npcs"
+        where, args = [], []
+        if name is not None:
+            where.append("name = ? COLLATE NOCASE")
+            args.append(name.strip())
+        if race is not None:
+            where.append("race = ? COLLATE NOCASE")
+            args.append(race.strip())
+        if career is not None:
+            where.append("id IN (SELECT npc_id FROM npc_careers WHERE career = ? COLLATE NOCASE)")
+            args.append(career.strip())
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+        return [StoredNPC(*row) for row in self._conn.execute(sql, args)]
+
+    def load(self, rows: Iterable[Union[int, StoredNPC]]) -> Iterator[NPC]:
+        """Decode the NPCs for ids (or find() rows), lazily."""
+        for row in rows:
+            npc = self.get(row.id if isinstance(row, StoredNPC) else row)
+            if npc is not None:
+                yield npc
+
+    def delete(self, npc_id: int) -> bool:
+        with self._conn:
+            return self._conn.execute("DELETE FROM npcs WHERE id = ?", (npc_id,)).rowcount > 0
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM npcs").fetchone()[0]
+
+    def export_txt(self, rows: Optional[Iterable[Union[int, StoredNPC]]] = None,
+                   out_dir: Optional[Union[str, Path]] = None, **write_options) -> Iterator[Path]:
+        """Write stored NPCs (all by default) as .txt files, or the io_.formats given as `formats=`."""
+        from io_.writer import write_npcs
+        if rows is None:
+            rows = self.find()
+        return write_npcs(self.load(rows), out_dir, **write_options)
+
+
+def storage_backend(config: Optional[dict] = None) -> str:
+    """The configured backend, 'txt' (default) or 'sqlite'."""
+    cfg = settings.load_app_config() if config is None else config
+    backend = str(cfg.get("storage") or "txt").lower()
+    return backend if backend in STORAGE_BACKENDS else "txt"
+
+
+def store_path(config: Optional[dict] = None) -> Path:
+    cfg = settings.load_app_config() if config is None else config
+    if cfg.get("store_path"):
+        return Path(cfg["store_path"])
+    return Path(cfg.get("output_dir") or settings.OUTPUT_DIR) / STORE_FILENAME
+
+
+def open_store(path: Optional[Union[str, Path]] = None) -> NPCStore:
+    """Open the store at `path`, or at the configured store_path."""
+    return NPCStore(path if path is not None else store_path())
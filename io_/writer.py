@@ -1,31 +1,362 @@
-"""Write NPC to a text file using the simple template in templates/npc_text.txt."""
+"""Write NPC to a text file using the simple template in templates/npc_text.txt.
+
+The template is compiled once into literal/field pieces and cached until the
+file's mtime or size changes. Every file is written to a temporary sibling and
+renamed into place, so readers never see a half-written NPC. `write_npcs`
+streams a whole batch: it renders in order, gives NPCs with the same name
+distinct files (Greta.txt, Greta_2.txt, ...) and can hand the file syscalls
+to a thread pool. It can also write each NPC in several io_.formats formats
+at once (Greta.txt, Greta.md, ...). Written .txt files are recorded in the
+folder's manifest.
+
+`write_archive` is the same batch writer with a .zip or .tar.gz as its sink:
+rendered NPCs go straight into the archive, followed by a manifest.json of
+its contents, and no intermediate files are written.
+"""
+import gzip
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Union
-from settings import OUTPUT_DIR
-from io_.render import format_characteristics, format_skills, format_talents
+from string import Formatter
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+import settings
+from io_.formats import get_renderer, npc_document
+from io_.manifest import get_manifest
 
 
 TEMPLATE_PATH = Path(__file__).parent.parent / "templates" / "npc_text.txt"
 
 
-def write_npc(npc, filename: str, out_dir: Optional[Union[str, Path]] = None):
-    out_dir = Path(out_dir) if out_dir is not None else Path(OUTPUT_DIR)
-    out_dir.mkdir(parents=True, exist_ok=True)
-    path = out_dir / filename
-    with open(TEMPLATE_PATH, "r") as t:
-        tpl = t.read()
-
-    body = tpl.format(
-        name=npc.name,
-        race=npc.race,
-        latest_career=npc.latest_career(),
-        latest_status=npc.latest_status(),
-        characteristics=format_characteristics(npc.characteristics),
-        skills=format_skills(npc.skills),
-        talents=format_talents(npc.talents),
-    )
-
-    with open(path, "w") as f:
-        f.write(body)
+class CompiledTemplate:
+    """A str.format template split once into (literal, field name) pieces."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pieces: List[Tuple[str, Optional[str]]] = []
+        self._plain = True
+        for literal, field, spec, conversion in Formatter().parse(text):
+            if spec or conversion or (field is not None and not field.isidentifier()):
+                self._plain = False
+            self.pieces.append((literal, field))
+
+    def render(self, values: dict) -> str:
+        if not self._plain:
+            return self.text.format(**values)
+        return "".join(literal + (str(values[field]) if field is not None else "")
+                       for literal, field in self.pieces)
+
+
+_templates = {}
+
+
+def load_template(path: Optional[Union[str, Path]] = None) -> CompiledTemplate:
+    """Return the compiled template, re-reading it only if its mtime/size changed."""
+    path = Path(path) if path is not None else TEMPLATE_PATH
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _templates.get(path)
+    if cached is None or cached[0] != stamp:
+        with open(path, "r", encoding="utf-8") as t:
+            cached = _templates[path] = (stamp, CompiledTemplate(t.read()))
+    return cached[1]
+
+
+def render_npc(npc, template: Optional[CompiledTemplate] = None) -> str:
+    tpl = template or load_template()
+    return tpl.render(npc_document(npc).template_values())
+
+
+def output_dir() -> Path:
+    """The current output folder; read at call time, the UI changes it from app_config.json."""
+    return Path(settings.OUTPUT_DIR)
+
 
+def npc_filename(name: str) -> str:
+    # simple filename sanitisation, as used by the export button
+    return f"{name.strip().replace(' ', '_')}.txt"
+
+
+def _atomic_write(path: Path, body: str) -> Path:
+    # a hidden sibling unique to this process/thread (plain open() keeps the umask permissions)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(body)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def write_npc(npc, filename: str, out_dir: Optional[Union[str, Path]] = None, manifest: bool = True,
+              body: Optional[str] = None, overwrite: bool = False) -> Path:
+    """Render and atomically write one NPC; returns the path written.
+
+    If `filename` is taken in `out_dir`, the NPC goes to the first free
+    'stem_2.txt', 'stem_3.txt', ... like write_npcs does, unless `overwrite`
+    is set. `body` is the already rendered text, if the caller rendered it
+    elsewhere. The folder's manifest (io_.manifest) is updated unless
+    `manifest` is False; it reaches the disk shortly after, see Manifest.save_later.
+    """
+    out_dir = Path(out_dir) if out_dir is not None else output_dir()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if not overwrite:
+        filename = _free_filename(out_dir, filename)
+    path = _atomic_write(out_dir / filename, render_npc(npc) if body is None else body)
+    if manifest:
+        # one file changed: coalesce the O(entries) manifest rewrite with the next exports
+        index = get_manifest(out_dir)
+        index.record(path, npc)
+        index.save_later()
     return path
+
+
+def _free_filename(out_dir: Path, filename: str) -> str:
+    """`filename`, or the first 'stem_2.ext', 'stem_3.ext', ... not in `out_dir`, probing name by name."""
+    stem, ext = os.path.splitext(filename)
+    candidate, n = filename, 2
+    while (out_dir / candidate).exists():
+        candidate = f"{stem}_{n}{ext}"
+        n += 1
+    return candidate
+
+
+def unique_filename(filename: str, taken: Set[str], extensions: Sequence[str] = ()) -> str:
+    """`filename`, or the first free 'stem_2.ext', 'stem_3.ext', ... not in `taken` (casefolded).
+
+    With `extensions`, the stem must be free with every one of them.
+    """
+    stem, ext = os.path.splitext(filename)
+    exts = extensions or (ext,)
+
+    def free(s):
+        return all(f"{s}{e}".casefold() not in taken for e in exts)
+
+    if free(stem):
+        return filename
+    n = 2
+    while not free(f"{stem}_{n}"):
+        n += 1
+    return f"{stem}_{n}{ext}"
+
+
+def _render_batch(npcs: Iterable, filename: Optional[Callable[[object], str]], formats: Sequence[str],
+                  taken: Set[str], template: CompiledTemplate) -> Iterator[Tuple[object, List[Tuple[str, str]]]]:
+    """Yield (npc, [(file name, body), ...]) with one file per format and a stem unique within `taken`."""
+    filename = filename or (lambda npc: npc_filename(npc.name))
+    renderers = [get_renderer(f) for f in formats]
+    extensions = [r.extension for r in renderers]
+    for npc in npcs:
+        stem = os.path.splitext(unique_filename(filename(npc), taken, extensions))[0]
+        doc = npc_document(npc)
+        files = []
+        for r in renderers:
+            name = stem + r.extension
+            taken.add(name.casefold())
+            files.append((name, template.render(doc.template_values()) if r.name == "txt" else r.render(doc)))
+        yield npc, files
+
+
+def write_npcs(npcs: Iterable, out_dir: Optional[Union[str, Path]] = None,
+               filename: Callable[[object], str] = None, overwrite: bool = False,
+               workers: int = 0, manifest: bool = True, formats: Sequence[str] = ("txt",)) -> Iterator[Path]:
+    """Write a stream of NPCs, yielding each path (in input order) once it is on disk.
+
+    NPCs in one batch never overwrite each other: repeated names get '_2',
+    '_3', ... suffixes. With overwrite=False, files already in `out_dir`
+    (listed once at the start) are avoided the same way. `workers` > 0 moves
+    the file writes to a thread pool, with a bounded number in flight.
+    `formats` names io_.formats renderers; each NPC gets one file per format,
+    all with the same stem, rendered from one shared document. The folder's
+    manifest gets every written .txt file and is saved once at the end.
+    """
+    out_dir = Path(out_dir) if out_dir is not None else output_dir()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    taken: Set[str] = set()
+    if not overwrite:
+        with os.scandir(out_dir) as it:
+            taken.update(entry.name.casefold() for entry in it)
+    template = load_template()
+    index = get_manifest(out_dir) if manifest else None
+
+    def jobs():
+        for npc, files in _render_batch(npcs, filename, formats, taken, template):
+            for name, body in files:
+                yield npc, out_dir / name, body
+
+    def done(npc, path):
+        if index is not None and path.suffix == ".txt":
+            index.record(path, npc)
+        return path
+
+    try:
+        if workers <= 0:
+            for npc, path, body in jobs():
+                yield done(npc, _atomic_write(path, body))
+            return
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="npc-writer") as pool:
+            pending = deque()
+            for npc, path, body in jobs():
+                pending.append((npc, pool.submit(_atomic_write, path, body)))
+                if len(pending) >= workers * 4:
+                    npc, fut = pending.popleft()
+                    yield done(npc, fut.result())
+            while pending:
+                npc, fut = pending.popleft()
+                yield done(npc, fut.result())
+    finally:
+        if index is not None:
+            index.save()
+
+
+ARCHIVE_SUFFIXES = {".zip": "zip", ".tar.gz": "tar", ".tgz": "tar"}
+ARCHIVE_MANIFEST = "manifest.json"
+# the archive manifest stays in memory up to this size, then spills to a temp file
+_SPOOL_MAX = 1 << 20
+
+
+def archive_kind(path: Union[str, Path]) -> Tuple[str, str]:
+    """('zip' or 'tar', folder name inside the archive) for an archive path."""
+    name = Path(path).name
+    for suffix, kind in ARCHIVE_SUFFIXES.items():
+        if name.lower().endswith(suffix) and len(name) > len(suffix):
+            return kind, name[:-len(suffix)]
+    raise ValueError(f"unsupported archive type: {name} (use {', '.join(ARCHIVE_SUFFIXES)})")
+
+
+class ArchiveSink:
+    """Append-only .zip / .tar.gz writer; members are written as they are added.
+
+    Only the zip central directory grows with the member count; the tar
+    member list is dropped after each file.
+    """
+
+    def __init__(self, path: Union[str, Path], name: Optional[str] = None):
+        # `name`: the archive's final name, when `path` is a temporary file
+        self.kind, self.folder = archive_kind(name or path)
+        self._mtime = time.time()
+        if self.kind == "zip":
+            self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        else:
+            # GzipFile given the final name, not the temp file's, for its header
+            self._fh = open(path, "wb")
+            self._gz = gzip.GzipFile(f"{self.folder}.tar", "wb", fileobj=self._fh, mtime=int(self._mtime))
+            self._tar = tarfile.open(fileobj=self._gz, mode="w")
+
+    def add(self, name: str, data: bytes):
+        self.add_file(name, io.BytesIO(data), len(data))
+
+    def add_file(self, name: str, fh, size: int):
+        """Copy `size` bytes from the open binary file `fh` into member `name`."""
+        arcname = f"{self.folder}/{name}"
+        if self.kind == "zip":
+            info = zipfile.ZipInfo(arcname, time.localtime(self._mtime)[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            with self._zip.open(info, "w") as out:
+                shutil.copyfileobj(fh, out)
+        else:
+            info = tarfile.TarInfo(arcname)
+            info.size, info.mtime, info.mode = size, int(self._mtime), 0o644
+            self._tar.addfile(info, fh)
+            self._tar.members.clear()
+
+    def close(self):
+        if self.kind == "zip":
+            self._zip.close()
+        else:
+            self._tar.close()
+            self._gz.close()
+            self._fh.close()
+
+
+@contextmanager
+def _open_archive(archive: Path) -> Iterator[ArchiveSink]:
+    """An ArchiveSink on a temporary sibling of `archive`, renamed into place only if the block completes."""
+    archive_kind(archive)
+    archive.parent.mkdir(parents=True, exist_ok=True)
+    tmp = archive.with_name(f".{archive.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        sink = ArchiveSink(tmp, archive.name)
+        try:
+            yield sink
+        finally:
+            sink.close()
+        os.replace(tmp, archive)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_archive(npcs: Iterable, archive: Union[str, Path], filename: Callable[[object], str] = None,
+                  formats: Sequence[str] = ("txt",)) -> Iterator[str]:
+    """Stream NPCs into a .zip or .tar.gz, yielding each member name once it is written.
+
+    Files are named as write_npcs would name them in an empty folder and sit
+    in a folder named after the archive. A manifest.json listing every NPC
+    and its files is added last; it is built in a spooled temp file, so memory
+    does not grow with the batch. The archive is written to a temporary
+    sibling and renamed into place only when complete.
+    """
+    taken: Set[str] = set()
+    template = load_template()
+    count = 0
+    with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX) as spool, _open_archive(Path(archive)) as sink:
+        # the header object without its closing brace; the npcs array is streamed after it
+        header = json.dumps({"version": 1, "formats": list(formats), "created": time.strftime("%Y-%m-%dT%H:%M:%S")})
+        spool.write(header[:-1].encode() + b',"npcs":[')
+        for npc, files in _render_batch(npcs, filename, formats, taken, template):
+            for name, body in files:
+                sink.add(name, body.encode("utf-8"))
+                yield f"{sink.folder}/{name}"
+            entry = {"name": npc.name, "race": npc.race, "latest_career": npc.latest_career(),
+                     "latest_status": npc.latest_status(), "files": [name for name, _ in files]}
+            spool.write((b"," if count else b"") + json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+            count += 1
+        spool.write(f'],"count":{count}}}\n'.encode())
+        size = spool.tell()
+        spool.seek(0)
+        sink.add_file(ARCHIVE_MANIFEST, spool, size)
+        yield f"{sink.folder}/{ARCHIVE_MANIFEST}"
+
+
+def archive_folder(folder: Union[str, Path], archive: Union[str, Path],
+                   on_error: Optional[Callable[[Path, Exception], None]] = None) -> Iterator[str]:
+    """Stream the files of an export folder into a .zip or .tar.gz byte for byte, yielding each member name.
+
+    Every format and any hand edits are kept as they are. Hidden files (the
+    folder's manifest cache, temporary files) and subfolders are left out.
+    A file that cannot be read raises, unless `on_error(path, exc)` is given,
+    in which case it is reported and skipped.
+    """
+    archive = Path(archive)
+    with _open_archive(archive) as sink, os.scandir(folder) as it:
+        for entry in it:
+            if entry.name.startswith(".") or not entry.is_file() or Path(entry.path) == archive:
+                continue
+            try:
+                with open(entry.path, "rb") as fh:
+                    sink.add_file(entry.name, fh, os.fstat(fh.fileno()).st_size)
+            except OSError as e:
+                if on_error is None:
+                    raise
+                on_error(Path(entry.path), e)
+                continue
+            yield f"{sink.folder}/{entry.name}"
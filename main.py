@@ -1,5 +1,13 @@
-"""Entrypoint for the WFRP NPC Generator Tkinter app."""
-from app.ui_tk import run_app
+"""Entrypoint for the WFRP NPC Generator.
+
+Without arguments the Tkinter app is launched; with arguments the headless
+CLI (app.cli) runs instead and tkinter is never imported.
+"""
+import sys
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        from app.cli import main
+        sys.exit(main(sys.argv[1:]))
+    from app.ui_tk import run_app
     run_app()
@@ -0,0 +1,189 @@
+"""Running NPC aggregate that applies and reverts single CareerLevels.
+
+Used by the ViewModel so that adding or undoing a career only touches that
+career's characteristics, skills and talents instead of rebuilding the whole
+NPC. Skill and talent names are also kept in render order (case-insensitive,
+as io_.render sorts them), so producing the summary needs no sort. Each of
+characteristics, skills and talents has its own version counter, so a
+renderer can redo only the sections a change touched.
+"""
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Tuple
+
+from settings import CHAR_BASE, CHAR_PER_LEVEL
+from .models import NPC
+from .rules import CHAR_ORDER
+
+
+class _SortedNames:
+    """Names ordered by (lowercase, name), kept in blocks of at most 2 * BLOCK keys.
+
+    Adding or removing a name bisects the block maxima, then shifts one short
+    block, instead of shifting every key after it in one flat list.
+    """
+    BLOCK = 64
+
+    def __init__(self):
+        self._blocks: List[List[Tuple[str, str]]] = []
+        self._maxes: List[Tuple[str, str]] = []
+        self._len = 0
+
+    def add(self, name: str):
+        key = (name.lower(), name)
+        if not self._blocks:
+            self._blocks.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            return
+        b = min(bisect_right(self._maxes, key), len(self._blocks) - 1)
+        block = self._blocks[b]
+        insort(block, key)
+        self._maxes[b] = block[-1]
+        self._len += 1
+        if len(block) > 2 * self.BLOCK:
+            self._blocks[b:b + 1] = [block[:self.BLOCK], block[self.BLOCK:]]
+            self._maxes[b:b + 1] = [block[self.BLOCK - 1], block[-1]]
+
+    def discard(self, name: str):
+        key = (name.lower(), name)
+        b = bisect_left(self._maxes, key)
+        if b == len(self._blocks):
+            return
+        block = self._blocks[b]
+        i = bisect_left(block, key)
+        if i < len(block) and block[i] == key:
+            del block[i]
+            self._len -= 1
+            if block:
+                self._maxes[b] = block[-1]
+            else:
+                del self._blocks[b], self._maxes[b]
+
+    def __iter__(self):
+        return (name for block in self._blocks for _, name in block)
+
+    def __len__(self):
+        return self._len
+
+
+class NPCAggregate:
+    def __init__(self, race=None):
+        """Start from a RaceProfile (or None for the flat CHAR_BASE vector)."""
+        self.characteristics: Dict[str, int] = {c: CHAR_BASE for c in CHAR_ORDER}
+        self.skills: Dict[str, int] = {}
+        self.talents: Dict[str, int] = {}
+        # how many sources contribute each key, so reverting knows when to drop it
+        self._char_refs: Dict[str, int] = {}
+        self._skill_refs: Dict[str, int] = {}
+        self._skill_order = _SortedNames()
+        self._talent_order = _SortedNames()
+        # id(CareerLevel) -> talents that were applied for it
+        self._applied: Dict[int, Tuple[str, ...]] = {}
+        # bumped on every change (and per field below); lets callers cache rendered output
+        self.version = 0
+        self.char_version = 0
+        self.skill_version = 0
+        self.talent_version = 0
+        if race is not None:
+            self.characteristics.update(race.characteristics)
+            for s in race.skills:
+                self._add_skill(s, 0)
+            for t in race.talents:
+                self._add_talent(t, 1)
+
+    def _add_skill(self, s: str, value: int):
+        refs = self._skill_refs.get(s, 0)
+        if refs == 0:
+            self._skill_order.add(s)
+        self._skill_refs[s] = refs + 1
+        self.skills[s] = self.skills.get(s, 0) + value
+
+    def _remove_skill(self, s: str, value: int):
+        refs = self._skill_refs.get(s, 0) - 1
+        if refs <= 0:
+            self._skill_refs.pop(s, None)
+            self.skills.pop(s, None)
+            self._skill_order.discard(s)
+        else:
+            self._skill_refs[s] = refs
+            self.skills[s] -= value
+
+    def _add_talent(self, t: str, count: int):
+        if t not in self.talents:
+            self._talent_order.add(t)
+            self.talents[t] = 0
+        self.talents[t] += count
+
+    def _remove_talent(self, t: str, count: int):
+        left = self.talents.get(t, 0) - count
+        if left <= 0:
+            self.talents.pop(t, None)
+            self._talent_order.discard(t)
+        else:
+            self.talents[t] = left
+
+    def add_level(self, cl):
+        """Apply one CareerLevel exactly as apply_career_levels would."""
+        inc = CHAR_PER_LEVEL * cl.level
+        for c in cl.characteristics:
+            if c not in CHAR_ORDER:
+                self._char_refs[c] = self._char_refs.get(c, 0) + 1
+            self.characteristics[c] = self.characteristics.get(c, CHAR_BASE) + inc
+        for s in cl.skills:
+            self._add_skill(s, inc)
+        talents = tuple(cl.talents)
+        for t in talents:
+            self._add_talent(t, 1)
+        self._applied[id(cl)] = talents
+        self._bump(cl.characteristics, cl.skills, talents)
+
+    def remove_level(self, cl):
+        """Revert a CareerLevel previously passed to add_level."""
+        inc = CHAR_PER_LEVEL * cl.level
+        for c in cl.characteristics:
+            self.characteristics[c] -= inc
+            if c not in CHAR_ORDER:
+                refs = self._char_refs[c] - 1
+                if refs == 0:
+                    del self._char_refs[c]
+                    del self.characteristics[c]
+                else:
+                    self._char_refs[c] = refs
+        for s in cl.skills:
+            self._remove_skill(s, inc)
+        talents = self._applied.pop(id(cl), tuple(cl.talents))
+        for t in talents:
+            self._remove_talent(t, 1)
+        self._bump(cl.characteristics, cl.skills, talents)
+
+    def set_talents(self, cl, talents):
+        """Replace the talents of an applied CareerLevel (e.g. after the talent dialog)."""
+        for t in self._applied.get(id(cl), ()):
+            self._remove_talent(t, 1)
+        cl.talents = list(talents)
+        applied = tuple(cl.talents)
+        for t in applied:
+            self._add_talent(t, 1)
+        self._applied[id(cl)] = applied
+        self.version += 1
+        self.talent_version += 1
+
+    def _bump(self, characteristics, skills, talents):
+        self.version += 1
+        if characteristics:
+            self.char_version += 1
+        if skills:
+            self.skill_version += 1
+        if talents:
+            self.talent_version += 1
+
+    def sorted_skills(self) -> List[Tuple[str, int]]:
+        return [(s, self.skills[s]) for s in self._skill_order]
+
+    def sorted_talents(self) -> List[Tuple[str, int]]:
+        return [(t, self.talents[t]) for t in self._talent_order]
+
+    def to_npc(self, name: str, race: str, careers: Optional[list] = None) -> NPC:
+        return NPC(name=name, race=race, careers=list(careers or []),
+                   characteristics=dict(self.characteristics),
+                   skills=dict(self.skills), talents=dict(self.talents))
@@ -0,0 +1,200 @@
+"""Batched rules engine: apply career paths to many NPCs at once.
+
+`apply_career_levels` (npc.rules) updates one NPC's dicts key by key and stays
+the reference implementation. Here every CareerLevel of every NPC is first
+flattened into id-indexed delta rows (npc index, vocabulary id, amount), then
+the totals are formed with NumPy scatter-adds: `np.add.at` into the
+characteristic matrix, and a sort + `np.bincount` over (npc, id) keys for the
+sparse skills and talents, which directly yields an NPCPopulation's CSR rows.
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from settings import CHAR_BASE, CHAR_PER_LEVEL
+from .population import NPCPopulation, _frozen
+from .rules import CHAR_ORDER, race_talents
+from .vocab import Vocabulary
+
+
+def _sum_sparse(n: int, rows: np.ndarray, ids: np.ndarray, values: np.ndarray, width: int):
+    """Combine (npc, id, value) rows into CSR (indptr, ids, values), ids sorted per NPC."""
+    if not len(ids):
+        return np.zeros(n + 1, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+    width = max(width, 1)
+    keys = rows.astype(np.int64) * width + ids
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    totals = np.bincount(inverse.ravel(), weights=values, minlength=len(uniq))
+    indptr = np.searchsorted(uniq // width, np.arange(n + 1), side="left").astype(np.int64)
+    return indptr, (uniq % width).astype(np.int32), totals.astype(np.int32)
+
+
+class _Rows:
+    """Interned id lists (one per distinct level or race) expanded with np.repeat.
+
+    Each distinct entry is compiled once per batch; an NPC then only records
+    (npc index, entry id) and `expand` produces the (npc, id, value) rows.
+    """
+
+    def __init__(self):
+        self.items: List[List[int]] = []
+        self.values: List[int] = []
+
+    def add(self, ids: List[int], value: int) -> int:
+        self.items.append(ids)
+        self.values.append(value)
+        return len(self.items) - 1
+
+    def expand(self, owners: List[int], entries: List[int]):
+        entries = np.asarray(entries, dtype=np.int64)
+        lens = np.fromiter((len(x) for x in self.items), dtype=np.int64, count=len(self.items))
+        flat = np.fromiter((i for x in self.items for i in x), dtype=np.int64, count=int(lens.sum()))
+        offs = np.concatenate(([0], np.cumsum(lens)[:-1]))
+        counts = lens[entries] if len(entries) else np.zeros(0, dtype=np.int64)
+        total = int(counts.sum())
+        rows = np.repeat(np.asarray(owners, dtype=np.int64), counts)
+        # positions in `flat`: each entry's start, then 0..len-1 within it
+        run_starts = np.cumsum(counts) - counts
+        pos = np.repeat(offs[entries] - run_starts, counts) + np.arange(total)
+        values = np.repeat(np.asarray(self.values, dtype=np.int64)[entries], counts)
+        return rows, flat[pos], values
+
+
+def apply_career_levels_batch(career_paths: Sequence[Sequence], race_profiles: Optional[Sequence] = None,
+                              extra_talents: Optional[Sequence[Sequence[str]]] = None,
+                              names: Optional[Sequence[str]] = None, races: Optional[Sequence[str]] = None,
+                              skill_vocab: Optional[Vocabulary] = None,
+                              talent_vocab: Optional[Vocabulary] = None,
+                              base_characteristics: Optional[np.ndarray] = None) -> NPCPopulation:
+    """Compute stats for len(career_paths) NPCs; the result equals per-NPC
+    apply_race + apply_career_levels.
+
+    `race_profiles[i]` is NPC i's RaceProfile (or None) and `extra_talents[i]`
+    its rolled racial talents, if any; `names`/`races` are stored as-is.
+    `base_characteristics`, an (n x 10) CHAR_ORDER matrix such as
+    npc.dice.roll_characteristics returns, replaces the race table's values.
+    """
+    n = len(career_paths)
+    if skill_vocab is None or talent_vocab is None:
+        from data.catalog import get_catalog
+        catalog = get_catalog()
+        skill_vocab = catalog.skill_vocab if skill_vocab is None else skill_vocab
+        talent_vocab = catalog.talent_vocab if talent_vocab is None else talent_vocab
+    profiles = race_profiles if race_profiles is not None else [None] * n
+    s_intern, t_intern = skill_vocab.intern, talent_vocab.intern
+
+    # characteristic columns: CHAR_ORDER, then any off-order names met on the way
+    columns: Dict[str, int] = {c: j for j, c in enumerate(CHAR_ORDER)}
+    col = columns.setdefault
+
+    # distinct career levels: (level, characteristics, skills, talents) -> entry
+    seen_levels: Dict[tuple, int] = {}
+    seen_ids: Dict[tuple, int] = {}
+    lvl_chars, lvl_skills, lvl_talents = _Rows(), _Rows(), _Rows()
+    lvl_owner, lvl_entry = [], []
+    # distinct races, by identity (profiles are shared table objects)
+    seen_races: Dict[int, tuple] = {}
+    race_chars: List[tuple] = []
+    race_skills, race_talents_rows = _Rows(), _Rows()
+    race_owner, race_entry = [], []
+    t_rows, t_ids = [], []
+
+    for i in range(n):
+        race = profiles[i]
+        if race is not None:
+            entry = seen_races.get(id(race))
+            if entry is None:
+                race_chars.append(([col(c, len(columns)) for c in race.characteristics],
+                                   list(race.characteristics.values())))
+                race_skills.add([s_intern(s) for s in race.skills], 0)
+                entry = race_talents_rows.add([t_intern(t) for t in race.talents], 1)
+                seen_races[id(race)] = entry
+            race_owner.append(i)
+            race_entry.append(entry)
+            if extra_talents is not None and extra_talents[i]:
+                t_rows.extend([i] * len(extra_talents[i]))
+                t_ids.extend([t_intern(t) for t in extra_talents[i]])
+        for cl in career_paths[i]:
+            # copies of one catalog row share its tuples, so identity usually hits;
+            # the objects stay alive for the whole call, so their ids are stable
+            fast_key = (cl.level, id(cl.characteristics), id(cl.skills), id(cl.talents))
+            entry = seen_ids.get(fast_key)
+            if entry is None:
+                key = (cl.level, _frozen(cl.characteristics), _frozen(cl.skills), _frozen(cl.talents))
+                entry = seen_levels.get(key)
+                if entry is None:
+                    inc = CHAR_PER_LEVEL * cl.level
+                    entry = lvl_chars.add([col(c, len(columns)) for c in cl.characteristics], inc)
+                    lvl_skills.add([s_intern(s) for s in cl.skills], inc)
+                    lvl_talents.add([t_intern(t) for t in cl.talents], 1)
+                    seen_levels[key] = entry
+                seen_ids[fast_key] = entry
+            lvl_owner.append(i)
+            lvl_entry.append(entry)
+
+    width = len(columns)
+    chars = np.zeros((n, width), dtype=np.int64)
+    chars[:, :len(CHAR_ORDER)] = CHAR_BASE
+    # a characteristic counts as 'present' once the race sets it (CHAR_ORDER always is)
+    present = np.zeros((n, width), dtype=bool)
+    present[:, :len(CHAR_ORDER)] = True
+    if race_owner:
+        cols_rows = _Rows()
+        vals_rows = _Rows()
+        for cols_, vals_ in race_chars:
+            cols_rows.add(cols_, 0)
+            vals_rows.add(vals_, 0)
+        rows, cols, _ = cols_rows.expand(race_owner, race_entry)
+        _, vals, _ = vals_rows.expand(race_owner, race_entry)
+        chars[rows, cols] = vals
+        present[rows, cols] = True
+    if base_characteristics is not None:
+        chars[:, :len(CHAR_ORDER)] = base_characteristics
+    if lvl_owner:
+        rows, cols, incs = lvl_chars.expand(lvl_owner, lvl_entry)
+        np.add.at(chars, (rows, cols), incs)
+        touched = np.zeros((n, width), dtype=bool)
+        touched[rows, cols] = True
+        # off-order names start from CHAR_BASE on first use, like chars.get(c, CHAR_BASE)
+        chars += np.where(touched & ~present, CHAR_BASE, 0)
+        present |= touched
+
+    extra_chars = {}
+    if width > len(CHAR_ORDER):
+        extra_names = list(columns)[len(CHAR_ORDER):]
+        for i, j in zip(*np.nonzero(present[:, len(CHAR_ORDER):])):
+            extra_chars.setdefault(int(i), {})[extra_names[j]] = int(chars[i, len(CHAR_ORDER) + j])
+
+    skill_parts = [lvl_skills.expand(lvl_owner, lvl_entry), race_skills.expand(race_owner, race_entry)]
+    talent_parts = [lvl_talents.expand(lvl_owner, lvl_entry), race_talents_rows.expand(race_owner, race_entry),
+                    (np.asarray(t_rows, dtype=np.int64), np.asarray(t_ids, dtype=np.int64),
+                     np.ones(len(t_ids), dtype=np.int64))]
+    skills = _sum_sparse(n, *(np.concatenate(p) for p in zip(*skill_parts)), len(skill_vocab))
+    talents = _sum_sparse(n, *(np.concatenate(p) for p in zip(*talent_parts)), len(talent_vocab))
+    return NPCPopulation.from_arrays(
+        names=list(names) if names is not None else [""] * n,
+        races=list(races) if races is not None else [""] * n,
+        careers=career_paths,
+        characteristics=chars[:, :len(CHAR_ORDER)],
+        skills=skills, talents=talents,
+        skill_vocab=skill_vocab, talent_vocab=talent_vocab,
+        extra_chars=extra_chars,
+    )
+
+
+def build_npcs_batch(names: Sequence[str], races: Sequence[str], career_paths: Sequence[Sequence],
+                     race_table=None, rngs: Optional[Sequence] = None, **vocabs) -> NPCPopulation:
+    """Batched npc.generator.build_npc: NPC i is (names[i], races[i], career_paths[i]).
+
+    `rngs[i]`, when given, rolls NPC i's racial talent choices exactly as
+    build_npc(..., rng=rngs[i]) would.
+    """
+    if race_table is None:
+        from data.races import get_race_table
+        race_table = get_race_table()
+    resolved = {}
+    profiles = [resolved[r] if r in resolved else resolved.setdefault(r, race_table.resolve(r)) for r in races]
+    extra = None
+    if rngs is not None:
+        extra = [race_talents(p, rng)[len(p.talents):] if p is not None else [] for p, rng in zip(profiles, rngs)]
+    return apply_career_levels_batch(career_paths, profiles, extra, names=names, races=races, **vocabs)
@@ -0,0 +1,162 @@
+"""Compiled choice grammar for talent entries like 'Savvy or Suave, 3 Random Talents'.
+
+The race sheet and the random-talent table use a tiny expression language:
+
+    entry       := alternative ('or' alternative)*
+    alternative := 'N Random Talent(s)' | 'Additional Random Talent' | talent
+    talent      := name | name '(any)' | name '(any one)' | name '(choose one)'
+
+`ChoiceCompiler` parses such entries once into a `CompiledChoices` made of
+plain tuples. Resolving it for an NPC is then only indexed random picks:
+an atom is either a talent name (str) or the index of a pool (int) to draw
+one atom from. No string parsing happens at resolve time.
+"""
+import random
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+Atom = Union[str, int]
+
+# Specialisations offered when an entry says '(any)'; unknown names stay literal.
+SPECIALISATIONS: Dict[str, Tuple[str, ...]] = {
+    "Acute Sense": ("Hearing", "Sight", "Smell", "Taste", "Touch"),
+    "Craftsman": ("Apothecary", "Blacksmith", "Brewer", "Carpenter", "Cartographer",
+                  "Cook", "Engineer", "Herbalist", "Tanner", "Tailor"),
+    "Etiquette": ("Criminals", "Cultists", "Guilders", "Nobles", "Scholars",
+                  "Servants", "Soldiers"),
+    "Resistance": ("Chaos", "Disease", "Magic", "Mutation", "Poison"),
+    "Prejudice": ("Beastmen", "Dwarfs", "Elves", "Foreigners", "Nobles", "Peasants"),
+}
+
+_RANDOM_RE = re.compile(r"^(?:(\d+)|additional)\s+random\s+talents?$", re.IGNORECASE)
+_PLACEHOLDER_RE = re.compile(r"^(.*?)\s*\((?:any|any one|choose one)\)$", re.IGNORECASE)
+# re-roll budget when a pick duplicates a talent already chosen in the same resolve
+_MAX_REROLLS = 8
+
+
+@dataclass
+class CompiledChoices:
+    """Result of compiling a list of talent entries.
+
+    `fixed` needs no roll. Each slot is a tuple of alternatives and each
+    alternative a tuple of atoms; `pools` holds the arrays that int atoms index.
+    """
+    fixed: Tuple[str, ...] = ()
+    slots: Tuple[Tuple[Tuple[Atom, ...], ...], ...] = ()
+    pools: Tuple[Tuple[Atom, ...], ...] = ()
+    sources: Tuple[str, ...] = field(default=(), compare=False)
+
+    def needs_roll(self) -> bool:
+        return bool(self.slots)
+
+
+def _split_alternatives(entry: str) -> List[str]:
+    """Split on ' or ' outside parentheses ('Language (Battle or Thieves' Tongue)' stays whole)."""
+    parts, depth, start = [], 0, 0
+    low = entry.lower()
+    i = 0
+    while i < len(entry):
+        ch = entry[i]
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth = max(0, depth - 1)
+        elif depth == 0 and low.startswith(" or ", i):
+            parts.append(entry[start:i])
+            start = i + 4
+            i += 4
+            continue
+        i += 1
+    parts.append(entry[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+class ChoiceCompiler:
+    """Compile entries against a shared random-talent pool.
+
+    Pools are interned per compiler, so every race compiled by the same
+    compiler shares the random-talent array and the specialisation arrays.
+    """
+
+    def __init__(self, random_talents: Iterable[str] = (), specialisations=None):
+        self.specialisations = SPECIALISATIONS if specialisations is None else specialisations
+        self._pools: List[Tuple[Atom, ...]] = []
+        self._pool_ids: Dict[Tuple[Atom, ...], int] = {}
+        self.random_pool: Optional[int] = None
+        atoms = tuple(self._compile_talent(t) for t in random_talents if t.strip())
+        if atoms:
+            self.random_pool = self._pool(atoms)
+
+    def _pool(self, atoms: Tuple[Atom, ...]) -> int:
+        if atoms not in self._pool_ids:
+            self._pool_ids[atoms] = len(self._pools)
+            self._pools.append(atoms)
+        return self._pool_ids[atoms]
+
+    def _compile_talent(self, name: str) -> Atom:
+        name = name.strip()
+        m = _PLACEHOLDER_RE.match(name)
+        if m:
+            base = m.group(1).strip()
+            specs = self.specialisations.get(base)
+            if specs:
+                return self._pool(tuple(f"{base} ({s})" for s in specs))
+        return name
+
+    def _compile_alternative(self, text: str) -> Tuple[Atom, ...]:
+        m = _RANDOM_RE.match(text)
+        if m and self.random_pool is not None:
+            return (self.random_pool,) * int(m.group(1) or 1)
+        return (self._compile_talent(text),)
+
+    def compile(self, entries: Iterable[str]) -> CompiledChoices:
+        fixed: List[str] = []
+        slots: List[Tuple[Tuple[Atom, ...], ...]] = []
+        sources: List[str] = []
+        for entry in entries:
+            alts = tuple(self._compile_alternative(a) for a in _split_alternatives(entry))
+            if not alts:
+                continue
+            if len(alts) == 1 and all(isinstance(a, str) for a in alts[0]):
+                fixed.extend(alts[0])
+                continue
+            slots.append(alts)
+            sources.append(entry)
+        return CompiledChoices(fixed=tuple(fixed), slots=tuple(slots),
+                               pools=tuple(self._pools), sources=tuple(sources))
+
+
+def _draw(atom: Atom, pools: Sequence[Tuple[Atom, ...]], rng: random.Random) -> str:
+    while not isinstance(atom, str):
+        pool = pools[atom]
+        atom = pool[rng.randrange(len(pool))]
+    return atom
+
+
+def resolve_choices(compiled: CompiledChoices, rng: Optional[random.Random] = None,
+                    seed=None, include_fixed: bool = True) -> List[str]:
+    """Roll one set of talents. Pass an `rng` or a `seed` for reproducible picks."""
+    if rng is None:
+        rng = random.Random(seed)
+    out = list(compiled.fixed) if include_fixed else []
+    taken = set(out)
+    pools = compiled.pools
+    for alts in compiled.slots:
+        for atom in alts[rng.randrange(len(alts))] if len(alts) > 1 else alts[0]:
+            pick = _draw(atom, pools, rng)
+            # random-talent rolls re-roll duplicates, as at the table
+            tries = 0
+            while pick in taken and not isinstance(atom, str) and tries < _MAX_REROLLS:
+                pick = _draw(atom, pools, rng)
+                tries += 1
+            taken.add(pick)
+            out.append(pick)
+    return out
+
+
+def resolve_choices_batch(compiled: CompiledChoices, count: int, seed=None,
+                          include_fixed: bool = True) -> List[List[str]]:
+    """Roll `count` independent talent sets from one seeded stream (crowds, encounters)."""
+    rng = random.Random(seed)
+    return [resolve_choices(compiled, rng, include_fixed=include_fixed) for _ in range(count)]
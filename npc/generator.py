@@ -1,10 +1,141 @@
-"""Orchestrate building an NPC from career selections."""
+"""Orchestrate building an NPC from career selections.
+
+Crowds repeat the same race + career path over and over (every 'Watchman 2'
+guard), so build_npc keeps a bounded LRU of computed stat blocks keyed by the
+resolved race and the normalised path. A hit hands out fresh shallow copies of
+the cached dicts instead of re-running the rules; the cache is emptied when
+the shared career catalog reloads.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from settings import BUILD_CACHE_SIZE
 from .models import NPC, CareerLevel
-from .rules import apply_career_levels
+from .rules import apply_career_levels, apply_race, race_talents
+
+
+def _names_key(names) -> tuple:
+    return names if type(names) is tuple else tuple(names)
+
+
+def path_key(race_profile, career_levels) -> tuple:
+    """Normalised cache key: race identity plus (career, level, chars, skills, talents) per level."""
+    return (id(race_profile),) + tuple(
+        (cl.career, cl.level, _names_key(cl.characteristics), _names_key(cl.skills), _names_key(cl.talents))
+        for cl in career_levels)
+
+
+class BuildCache:
+    """Thread-safe LRU of stat blocks: key -> (race profile, characteristics, skills, talents).
+
+    The cached dicts are never handed out; `get` returns copies. The race
+    profile is kept in the entry so its id (part of the key) is not reused.
+    """
+
+    def __init__(self, maxsize: int = BUILD_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def check_generation(self, generation: int):
+        """Drop every entry if the catalog generation moved since the last call."""
+        if generation != self._generation:
+            with self._lock:
+                if generation != self._generation:
+                    self._data.clear()
+                    self._generation = generation
+
+    def get(self, key) -> Optional[Tuple[Dict[str, int], Dict[str, int], Dict[str, int]]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+        _, chars, skills, talents = entry
+        return dict(chars), dict(skills), dict(talents)
+
+    def put(self, key, race_profile, npc: NPC):
+        if self.maxsize <= 0:
+            return
+        entry = (race_profile, dict(npc.characteristics), dict(npc.skills), dict(npc.talents))
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def resize(self, maxsize: int):
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._data) > max(maxsize, 0):
+                self._data.popitem(last=False)
+                self.evictions += 1
 
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
 
-def build_npc(name: str, race: str, career_levels: list[CareerLevel]) -> NPC:
+    def info(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self._data), "maxsize": self.maxsize}
+
+
+_cache = BuildCache()
+
+
+def build_cache_info() -> Dict[str, int]:
+    """Hit/miss/eviction counters and current/maximum size of build_npc's cache."""
+    return _cache.info()
+
+
+def configure_build_cache(maxsize: int):
+    """Change the cache size (0 disables caching); extra entries are evicted."""
+    _cache.resize(maxsize)
+
+
+def clear_build_cache():
+    _cache.clear()
+
+
+def build_npc(name: str, race: str, career_levels: list[CareerLevel], races=None, rng=None) -> NPC:
+    """Build an NPC; `race` is resolved against the race table (`races`, default shared).
+
+    Unknown races keep the flat CHAR_BASE characteristics. Pass a
+    random.Random as `rng` to also roll the racial talent choices.
+    """
+    if races is None:
+        from data.races import get_race_table
+        races = get_race_table()
+    from data.catalog import loaded_generation
+    profile = races.resolve(race)
     npc = NPC(name=name, race=race)
     npc.careers = career_levels
-    apply_career_levels(npc, career_levels)
+
+    if _cache.maxsize > 0:
+        _cache.check_generation(loaded_generation())
+        key = path_key(profile, career_levels)
+        block = _cache.get(key)
+        if block is not None:
+            npc.characteristics, npc.skills, npc.talents = block
+        else:
+            apply_race(npc, profile)
+            apply_career_levels(npc, career_levels)
+            _cache.put(key, profile, npc)
+    else:
+        apply_race(npc, profile)
+        apply_career_levels(npc, career_levels)
+
+    # rolled racial talents differ per NPC, so they are added after the cached block
+    if rng is not None and profile is not None:
+        for t in race_talents(profile, rng)[len(profile.talents):]:
+            npc.talents[t] = npc.talents.get(t, 0) + 1
     return npc
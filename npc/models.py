@@ -1,19 +1,45 @@
-"""Dataclasses for NPC model."""
+"""Dataclasses for NPC model.
+
+CareerLevel and NPC are slotted: thousands of them are alive in
+bulk generation, and a slotted instance has no per-object __dict__.
+"""
 from dataclasses import dataclass, field
-from typing import List, Dict
+from typing import Any, List, Dict, Optional, Sequence
 
 
-@dataclass
+@dataclass(slots=True)
 class CareerLevel:
+    """One career level. Rows from the catalog hold tuples of shared, interned
+    names; replace a field (e.g. `cl.talents = [...]`) rather than mutating it.
+    """
     career: str
     level: int
     status: str
-    characteristics: List[str] = field(default_factory=list)
+    characteristics: Sequence[str] = ()
+    skills: Sequence[str] = ()
+    talents: Sequence[str] = ()
+
+
+@dataclass
+class RaceProfile:
+    """Precomputed racial starting values for one Race_and_Origin row.
+
+    `characteristics` is the full base vector in CHAR_ORDER; `talents` holds the
+    fixed racial talents, `talent_choices` the entries that still need a roll
+    (e.g. 'Savvy or Suave', '3 Random Talents') and `talent_rolls` their
+    compiled npc.choices.CompiledChoices (None when nothing needs a roll).
+    """
+    name: str
+    characteristics: Dict[str, int] = field(default_factory=dict)
     skills: List[str] = field(default_factory=list)
     talents: List[str] = field(default_factory=list)
+    talent_choices: List[str] = field(default_factory=list)
+    talent_rolls: Optional[Any] = None
+    movement: int = 0
+    wounds: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class NPC:
     name: str
     race: str
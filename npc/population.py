@@ -0,0 +1,323 @@
+"""Struct-of-arrays container for large NPC populations.
+
+Instead of one NPC object with three dicts per NPC, an NPCPopulation keeps:
+
+* characteristics in one contiguous (N x 10) int32 array in CHAR_ORDER;
+* skills and talents as sparse CSR rows (row offsets + int32 ids + int32
+  values), where the ids come from shared Vocabulary objects (by default the
+  catalog's), so every skill name is stored once for the whole population;
+* career paths as lists of CareerLevel rows interned per population: every
+  NPC that took 'Watchman 2' with the same talent picks points at one row.
+
+`pop[i]` returns an NPCView: a zero-copy view over those arrays with the same
+attributes and methods as npc.models.NPC, so io_.render and io_.writer work
+on it unchanged. `memory_report` measures the bytes used per NPC.
+"""
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .models import NPC, CareerLevel
+from .rules import CHAR_ORDER
+from .vocab import Vocabulary
+
+_CHAR_INDEX = {c: i for i, c in enumerate(CHAR_ORDER)}
+
+
+class _Growable:
+    """1-D numpy buffer with amortised O(1) appends; `view()` is zero-copy."""
+
+    def __init__(self, dtype, capacity: int = 16):
+        self._buf = np.zeros(max(capacity, 1), dtype=dtype)
+        self._n = 0
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._buf.dtype)
+        need = self._n + len(values)
+        if need > len(self._buf):
+            grown = np.zeros(max(need, 2 * len(self._buf)), dtype=self._buf.dtype)
+            grown[:self._n] = self._buf[:self._n]
+            self._buf = grown
+        self._buf[self._n:need] = values
+        self._n = need
+
+    def view(self) -> np.ndarray:
+        return self._buf[:self._n]
+
+    @property
+    def nbytes(self) -> int:
+        return self._buf.nbytes
+
+
+class _CharacteristicsView(Mapping):
+    """Read-only mapping over one row of the characteristic matrix."""
+    __slots__ = ("_row", "_extra")
+
+    def __init__(self, row: np.ndarray, extra: Optional[Dict[str, int]]):
+        self._row = row
+        self._extra = extra
+
+    def __getitem__(self, key):
+        i = _CHAR_INDEX.get(key)
+        if i is not None:
+            return int(self._row[i])
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from CHAR_ORDER
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return len(CHAR_ORDER) + (len(self._extra) if self._extra else 0)
+
+    def items(self):
+        pairs = list(zip(CHAR_ORDER, self._row.tolist()))
+        if self._extra:
+            pairs.extend(self._extra.items())
+        return pairs
+
+
+class _SparseView(Mapping):
+    """Read-only mapping over one CSR row: vocabulary ids -> values."""
+    __slots__ = ("_ids", "_values", "_vocab", "_index")
+
+    def __init__(self, ids: np.ndarray, values: np.ndarray, vocab: Vocabulary):
+        self._ids = ids
+        self._values = values
+        self._vocab = vocab
+        self._index = None
+
+    def __getitem__(self, key):
+        if self._index is None:
+            self._index = {self._vocab.name(i): pos for pos, i in enumerate(self._ids.tolist())}
+        return int(self._values[self._index[key]])
+
+    def __iter__(self):
+        name = self._vocab.name
+        return (name(i) for i in self._ids.tolist())
+
+    def __len__(self):
+        return len(self._ids)
+
+    def items(self):
+        name = self._vocab.name
+        return [(name(i), v) for i, v in zip(self._ids.tolist(), self._values.tolist())]
+
+
+class NPCView:
+    """Zero-copy, read-only stand-in for an NPC stored in an NPCPopulation."""
+    __slots__ = ("_pop", "_i")
+
+    def __init__(self, pop: "NPCPopulation", i: int):
+        self._pop = pop
+        self._i = i
+
+    @property
+    def name(self) -> str:
+        return self._pop.names[self._i]
+
+    @property
+    def race(self) -> str:
+        return self._pop.races[self._i]
+
+    @property
+    def careers(self) -> list:
+        return self._pop.careers[self._i]
+
+    @property
+    def characteristics(self) -> Mapping:
+        return _CharacteristicsView(self._pop.characteristics[self._i], self._pop._extra_chars.get(self._i))
+
+    @property
+    def skills(self) -> Mapping:
+        return self._pop._row(self._pop._skills, self._i, self._pop.skill_vocab)
+
+    @property
+    def talents(self) -> Mapping:
+        return self._pop._row(self._pop._talents, self._i, self._pop.talent_vocab)
+
+    def latest_career(self):
+        careers = self.careers
+        return careers[-1].career if careers else ""
+
+    def latest_status(self):
+        careers = self.careers
+        return careers[-1].status if careers else ""
+
+    def to_npc(self) -> NPC:
+        """Materialise a regular (mutable) NPC."""
+        return NPC(name=self.name, race=self.race, careers=list(self.careers),
+                   characteristics=dict(self.characteristics.items()),
+                   skills=dict(self.skills.items()), talents=dict(self.talents.items()))
+
+
+class _CSR:
+    def __init__(self):
+        self.ptr = _Growable(np.int64)
+        self.ptr.extend([0])
+        self.ids = _Growable(np.int32)
+        self.values = _Growable(np.int32)
+
+    @property
+    def nbytes(self) -> int:
+        return self.ptr.nbytes + self.ids.nbytes + self.values.nbytes
+
+
+class NPCPopulation:
+    def __init__(self, skill_vocab: Optional[Vocabulary] = None, talent_vocab: Optional[Vocabulary] = None):
+        """Create an empty population; vocabularies default to the shared catalog's."""
+        if skill_vocab is None or talent_vocab is None:
+            from data.catalog import get_catalog
+            catalog = get_catalog()
+            skill_vocab = catalog.skill_vocab if skill_vocab is None else skill_vocab
+            talent_vocab = catalog.talent_vocab if talent_vocab is None else talent_vocab
+        self.skill_vocab = skill_vocab
+        self.talent_vocab = talent_vocab
+        self.names: List[str] = []
+        self.races: List[str] = []
+        self.careers: List[list] = []
+        # (career, level, status, characteristics, skills, talents) -> the shared row
+        self._row_pool: Dict[tuple, CareerLevel] = {}
+        self._chars = np.zeros((16, len(CHAR_ORDER)), dtype=np.int32)
+        # characteristics outside CHAR_ORDER (sheet typos such as 'Ag'), by row
+        self._extra_chars: Dict[int, Dict[str, int]] = {}
+        self._skills = _CSR()
+        self._talents = _CSR()
+
+    @classmethod
+    def from_npcs(cls, npcs: Iterable, skill_vocab=None, talent_vocab=None) -> "NPCPopulation":
+        pop = cls(skill_vocab, talent_vocab)
+        for npc in npcs:
+            pop.append(npc)
+        return pop
+
+    @classmethod
+    def from_arrays(cls, names: List[str], races: List[str], careers: List[list], characteristics: np.ndarray,
+                    skills: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                    talents: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                    skill_vocab: Vocabulary, talent_vocab: Vocabulary,
+                    extra_chars: Optional[Dict[int, Dict[str, int]]] = None) -> "NPCPopulation":
+        """Wrap precomputed arrays; `skills`/`talents` are CSR (indptr, ids, values) triples."""
+        pop = cls(skill_vocab, talent_vocab)
+        pop.names, pop.races = list(names), list(races)
+        pop.careers = [pop._shared_path(path) for path in careers]
+        pop._chars = np.ascontiguousarray(characteristics, dtype=np.int32).reshape(len(names), len(CHAR_ORDER))
+        pop._extra_chars = dict(extra_chars or {})
+        for csr, (ptr, ids, values) in ((pop._skills, skills), (pop._talents, talents)):
+            csr.ptr = _Growable(np.int64, 1)
+            csr.ptr.extend(ptr)
+            csr.ids = _Growable(np.int32, len(ids))
+            csr.ids.extend(ids)
+            csr.values = _Growable(np.int32, len(values))
+            csr.values.extend(values)
+        return pop
+
+    def _shared_path(self, path) -> list:
+        """`path` with every row replaced by the population's shared equal row.
+
+        Rows are read-only here (NPCView); the first row seen for a key is
+        kept as is, so its talents stay a list or a tuple as given.
+        """
+        pool, out = self._row_pool, []
+        for cl in path:
+            key = (cl.career, cl.level, cl.status, _frozen(cl.characteristics), _frozen(cl.skills),
+                   _frozen(cl.talents))
+            row = pool.get(key)
+            if row is None:
+                row = pool[key] = cl
+            out.append(row)
+        return out
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def characteristics(self) -> np.ndarray:
+        """(N x 10) int32 view in CHAR_ORDER order."""
+        return self._chars[:len(self.names)]
+
+    def _ensure_rows(self, n: int):
+        if n > len(self._chars):
+            grown = np.zeros((max(n, 2 * len(self._chars)), len(CHAR_ORDER)), dtype=np.int32)
+            grown[:len(self.names)] = self._chars[:len(self.names)]
+            self._chars = grown
+
+    @staticmethod
+    def _append_row(csr: _CSR, ids, values):
+        csr.ids.extend(ids)
+        csr.values.extend(values)
+        csr.ptr.extend([csr.ids.view().shape[0]])
+
+    def append(self, npc) -> int:
+        """Add an NPC (or NPCView); returns its row index."""
+        i = len(self.names)
+        self._ensure_rows(i + 1)
+        extra = {}
+        for c, v in npc.characteristics.items():
+            j = _CHAR_INDEX.get(c)
+            if j is None:
+                extra[c] = v
+            else:
+                self._chars[i, j] = v
+        if extra:
+            self._extra_chars[i] = extra
+        sk = npc.skills.items()
+        self._append_row(self._skills, [self.skill_vocab.intern(k) for k, _ in sk], [v for _, v in sk])
+        tl = npc.talents.items()
+        self._append_row(self._talents, [self.talent_vocab.intern(k) for k, _ in tl], [v for _, v in tl])
+        self.names.append(npc.name)
+        self.races.append(npc.race)
+        self.careers.append(self._shared_path(npc.careers))
+        return i
+
+    def _row(self, csr: _CSR, i: int, vocab: Vocabulary) -> _SparseView:
+        ptr = csr.ptr.view()
+        lo, hi = ptr[i], ptr[i + 1]
+        return _SparseView(csr.ids.view()[lo:hi], csr.values.view()[lo:hi], vocab)
+
+    def __getitem__(self, i: int) -> NPCView:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return NPCView(self, i)
+
+    def __iter__(self) -> Iterator[NPCView]:
+        return (NPCView(self, i) for i in range(len(self)))
+
+    def memory_report(self) -> Dict[str, float]:
+        """Bytes held by the population's own arrays, lists and objects, total and per NPC.
+
+        Counts the names, each NPC's career list, and every interned career
+        row once with its talent container and pool key. Name tuples of catalog
+        rows and the vocabularies are shared; the vocabularies are reported
+        separately.
+        """
+        n = max(len(self), 1)
+        arrays = self._chars.nbytes + self._skills.nbytes + self._talents.nbytes
+        lists = sum(sys.getsizeof(x) for x in (self.names, self.races, self.careers, self._row_pool))
+        lists += sum(sys.getsizeof(c) for c in self.careers)
+        lists += sum(sys.getsizeof(s) for s in self.names)
+        rows = sum(sys.getsizeof(key) + sys.getsizeof(row) + sys.getsizeof(row.talents)
+                   for key, row in self._row_pool.items())
+        total = arrays + lists + rows + sum(sys.getsizeof(d) for d in self._extra_chars.values())
+        vocab = sum(sys.getsizeof(s) for s in self.skill_vocab.names + self.talent_vocab.names)
+        return {"npcs": len(self), "bytes": total, "bytes_per_npc": total / n, "vocabulary_bytes": vocab}
+
+
+def _frozen(names) -> tuple:
+    # catalog rows already hold tuples; user-picked talents may be lists
+    return names if type(names) is tuple else tuple(names)
+
+
+def npc_object_bytes(npc) -> int:
+    """Approximate bytes of a dict-based NPC's own stat containers (for comparison)."""
+    size = sys.getsizeof(npc) + sys.getsizeof(npc.careers)
+    for d in (npc.characteristics, npc.skills, npc.talents):
+        size += sys.getsizeof(d) + sum(sys.getsizeof(v) for v in d.values())
+    return size
@@ -0,0 +1,177 @@
+"""Quick NPC generation: random race, career path, level and talent picks.
+
+Every NPC gets its own RNG stream seeded from (seed, index), so the output for
+a given seed is identical whether it is produced in-process or spread over any
+number of worker processes. `generate_quick_npcs` chunks the index range over
+a ProcessPoolExecutor and yields NPCs in index order. For bulk output,
+`iter_quick_populations` / `quick_population` return the same NPCs as
+NPCPopulations, with the stats computed by the batched rules engine.
+
+Characteristics are the race table's values with the flat CHAR_RACE_BONUS,
+as build_npc gives them. With `roll=True` the population functions roll
+them instead ('table value + 2d10', npc.dice), a whole chunk at a time from
+a stream seeded by (seed, chunk start): the same seed and chunk_size give
+the same rolls for any number of workers, but per-NPC quick_npc cannot
+reproduce them, so this stays opt-in.
+"""
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from .batch import apply_career_levels_batch
+from .dice import race_formulas, roll_characteristics
+from .generator import build_npc
+from .models import NPC
+from .population import NPCPopulation
+from .rules import CHAR_ORDER, race_talents
+
+DEFAULT_CHUNK = 500
+
+# per-process catalog handles, filled by _init_worker (or lazily in-process)
+_tables = {}
+
+
+def _init_worker():
+    from data.catalog import get_catalog
+    from data.races import get_race_table
+    _tables["catalog"] = get_catalog()
+    _tables["races"] = get_race_table()
+    _tables["race_names"] = _tables["races"].names()
+    _tables["career_names"] = _tables["catalog"].names()
+
+
+def _ensure_tables():
+    if not _tables:
+        _init_worker()
+    return _tables
+
+
+def npc_rng(seed: int, index: int) -> random.Random:
+    """The RNG stream of NPC `index` (string seeds are hashed deterministically)."""
+    return random.Random(f"{seed}/{index}")
+
+
+def _quick_spec(index: int, seed: int, name_prefix: str):
+    """Roll NPC `index`'s name, race and career path; returns them with its RNG.
+
+    The RNG is returned half-used: the racial talent rolls come next.
+    """
+    t = _ensure_tables()
+    catalog = t["catalog"]
+    rng = npc_rng(seed, index)
+    race = rng.choice(t["race_names"]) if t["race_names"] else ""
+    career = rng.choice(t["career_names"])
+    levels = catalog.get_levels(career, rng.randint(1, max(1, catalog.max_level(career))))
+    for cl in levels:
+        # one talent from each level's pool, as a GM would pick in the builder
+        cl.talents = [rng.choice(cl.talents)] if cl.talents else []
+    return f"{name_prefix} {index + 1}", race, levels, rng
+
+
+def quick_npc(index: int, seed: int = 0, name_prefix: str = "NPC") -> NPC:
+    """Roll a single random NPC; depends only on (seed, index) and the data files."""
+    name, race, levels, rng = _quick_spec(index, seed, name_prefix)
+    return build_npc(name, race, levels, races=_tables["races"], rng=rng)
+
+
+def _quick_chunk(start: int, stop: int, seed: int, name_prefix: str) -> List[NPC]:
+    return [quick_npc(i, seed, name_prefix) for i in range(start, stop)]
+
+
+def _quick_spec_chunk(start: int, stop: int, seed: int, name_prefix: str) -> List[tuple]:
+    """(name, race, levels, rolled racial talents) per index, without computing stats."""
+    specs = []
+    for i in range(start, stop):
+        name, race, levels, rng = _quick_spec(i, seed, name_prefix)
+        profile = _tables["races"].resolve(race)
+        rolled = race_talents(profile, rng)[len(profile.talents):] if profile is not None else []
+        specs.append((name, race, levels, rolled))
+    return specs
+
+
+def _chunks(count: int, chunk_size: int):
+    return [(s, min(s + chunk_size, count)) for s in range(0, count, chunk_size)]
+
+
+def _run_chunks(fn, count: int, seed: int, workers: Optional[int], chunk_size: int, name_prefix: str):
+    """Yield fn(start, stop, seed, name_prefix) per chunk, in order, in-process or over a pool."""
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(count, chunk_size)
+    if workers <= 1 or len(chunks) <= 1:
+        _ensure_tables()
+        for start, stop in chunks:
+            yield fn(start, stop, seed, name_prefix)
+        return
+    # at most workers * 2 chunks in flight, so a slow consumer keeps memory flat
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_worker) as pool:
+        pending = deque()
+        for start, stop in chunks:
+            pending.append(pool.submit(fn, start, stop, seed, name_prefix))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _roll_chunk(specs: List[tuple], seed, start: int) -> np.ndarray:
+    """Rolled CHAR_ORDER characteristics for one chunk of specs, one roll per race."""
+    races = _ensure_tables()["races"]
+    rng = np.random.default_rng(list(f"{seed}/{start}".encode()))
+    by_race = {}
+    for i, spec in enumerate(specs):
+        by_race.setdefault(spec[1], []).append(i)
+    out = np.empty((len(specs), len(CHAR_ORDER)), dtype=np.int64)
+    for race, rows in by_race.items():
+        out[rows] = roll_characteristics(len(rows), race_formulas(races.resolve(race)), rng=rng)
+    return out
+
+
+def _build_population(specs: List[tuple], base_characteristics: Optional[np.ndarray] = None) -> NPCPopulation:
+    t = _ensure_tables()
+    names, races, paths, rolled = zip(*specs) if specs else ((), (), (), ())
+    resolved = {r: t["races"].resolve(r) for r in set(races)}
+    profiles = [resolved[r] for r in races]
+    return apply_career_levels_batch(list(paths), profiles, rolled, names=names, races=races,
+                                     base_characteristics=base_characteristics)
+
+
+def generate_quick_npcs(count: int, seed: int = 0, workers: Optional[int] = None,
+                        chunk_size: int = DEFAULT_CHUNK, name_prefix: str = "NPC") -> Iterator[NPC]:
+    """Yield `count` random NPCs in index order.
+
+    `workers` defaults to os.cpu_count(); with 1 worker (or a single chunk)
+    everything runs in-process. The result never depends on `workers`.
+    """
+    for npcs in _run_chunks(_quick_chunk, count, seed, workers, chunk_size, name_prefix):
+        yield from npcs
+
+
+def iter_quick_populations(count: int, seed: int = 0, workers: Optional[int] = None,
+                           chunk_size: int = DEFAULT_CHUNK, name_prefix: str = "NPC",
+                           roll: bool = False) -> Iterator[NPCPopulation]:
+    """Fast path of generate_quick_npcs: one NPCPopulation per chunk, in index order.
+
+    Workers only roll the choices; stats are computed in this process with
+    the batched rules engine, and NPCs are never materialised as dicts.
+    `roll` rolls the characteristics (see the module docstring).
+    """
+    starts = (start for start, _ in _chunks(count, chunk_size))
+    for start, specs in zip(starts, _run_chunks(_quick_spec_chunk, count, seed, workers, chunk_size, name_prefix)):
+        yield _build_population(specs, _roll_chunk(specs, seed, start) if roll else None)
+
+
+def quick_population(count: int, seed: int = 0, workers: Optional[int] = None,
+                     chunk_size: int = DEFAULT_CHUNK, name_prefix: str = "NPC",
+                     roll: bool = False) -> NPCPopulation:
+    """All `count` Quick NPCs as one NPCPopulation (same NPCs as generate_quick_npcs unless `roll`)."""
+    specs, rolls = [], []
+    starts = (start for start, _ in _chunks(count, chunk_size))
+    for start, chunk in zip(starts, _run_chunks(_quick_spec_chunk, count, seed, workers, chunk_size, name_prefix)):
+        specs.extend(chunk)
+        if roll:
+            rolls.append(_roll_chunk(chunk, seed, start))
+    return _build_population(specs, np.concatenate(rolls) if rolls else None)
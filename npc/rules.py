@@ -2,11 +2,41 @@
 from typing import Iterable
 from collections import Counter
 from settings import CHAR_BASE, CHAR_PER_LEVEL
+from .choices import resolve_choices
 
 CHAR_ORDER = ["Ws", "Bs", "S", "T", "I", "Agi", "Dex", "Int", "Wp", "Fel"]
 
 
+def apply_race(npc, race, rng=None):
+    """Apply a RaceProfile: base characteristics, racial skills and fixed talents.
+
+    Must run before the career rules, which only fill in CHAR_BASE for
+    characteristics that are still missing. `race` may be None (unknown race).
+    With an `rng` the racial talent choices ('Savvy or Suave', ...) are rolled
+    too; without one they are left out so the result stays deterministic.
+    """
+    if race is None:
+        return npc
+    npc.characteristics.update(race.characteristics)
+    for s in race.skills:
+        npc.skills.setdefault(s, 0)
+    for t in race_talents(race, rng):
+        npc.talents[t] = npc.talents.get(t, 0) + 1
+    return npc
+
+
+def race_talents(race, rng=None) -> list:
+    """The racial talents an NPC gets: the fixed ones, plus the rolled choices with an `rng`."""
+    if race is None:
+        return []
+    talents = list(race.talents)
+    if rng is not None and race.talent_rolls is not None:
+        talents.extend(resolve_choices(race.talent_rolls, rng, include_fixed=False))
+    return talents
+
+
 def apply_career_levels(npc, career_levels: Iterable):
+    """Reference implementation for one NPC; npc.batch does the same for many at once."""
     # ensure base characteristics
     for c in CHAR_ORDER:
         npc.characteristics.setdefault(c, CHAR_BASE)
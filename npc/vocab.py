@@ -0,0 +1,45 @@
+"""Append-only string vocabulary: name <-> small integer id.
+
+Ids are stable for the lifetime of the vocabulary (names are never removed),
+so arrays of ids stay valid when new names are added later on.
+"""
+import sys
+from typing import Dict, Iterable, List, Optional
+
+
+class Vocabulary:
+    def __init__(self, names: Iterable[str] = ()):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        for n in names:
+            self.intern(n)
+
+    def intern(self, name: str) -> int:
+        """Return the id of `name`, adding it (as an interned string) if new."""
+        i = self._ids.get(name)
+        if i is None:
+            i = len(self._names)
+            name = sys.intern(name)
+            self._ids[name] = i
+            self._names.append(name)
+        return i
+
+    def canonical(self, name: str) -> str:
+        """The vocabulary's shared copy of `name` (added if new)."""
+        return self._names[self.intern(name)]
+
+    def id_of(self, name: str) -> Optional[int]:
+        return self._ids.get(name)
+
+    def name(self, i: int) -> str:
+        return self._names[i]
+
+    @property
+    def names(self) -> List[str]:
+        return self._names
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def __len__(self):
+        return len(self._names)
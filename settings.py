@@ -1,23 +1,67 @@
 """
 Simple settings for paths and defaults.
 """
+import json
+import os
 from pathlib import Path
 
 ROOT = Path(__file__).parent
 DATA_DIR = ROOT / "NPC Gen" / "WFRP_NPC_GEN_DF_final"
 OUTPUT_DIR = ROOT / "WFRP_NPC_output"
+# Compiled binary snapshot of the CSV tables (rebuilt when the CSVs change)
+CACHE_DIR = ROOT / ".cache"
+SNAPSHOT_PATH = CACHE_DIR / "catalog.snapshot"
 
 # Base characteristic value and increment per level
 CHAR_BASE = 30
 CHAR_PER_LEVEL = 5
+# Added to the race table's characteristic values (Human = 20) as a flat
+# stand-in for the 2d10 roll; keeps Humans at CHAR_BASE
+CHAR_RACE_BONUS = 10
+
+# Entries kept by npc.generator's LRU cache of built stat blocks (0 disables it)
+BUILD_CACHE_SIZE = 1024
+
+# NPCs whose sorted export document io_.formats keeps for reuse across formats
+RENDER_CACHE_SIZE = 4096
 
 # Expected CSV filenames (best-effort)
 CAREERS_CSV = "Careers-WFRP_NPC_GEN_DF_Careers.csv"
 RACES_CSV = "Races-Table 1.csv"
 TALENTS_CSV = "Random_Talents-Table 1.csv"
 
+# Row reader used by data.loader: "csv" (stdlib, default) or "pandas"
+LOADER_BACKEND = "csv"
+
 # UI theming defaults (can be changed at runtime via the Config dialog)
 # Theme names can be listed at runtime via ttk.Style().theme_names()
 DEFAULT_THEME = "clam"
 # Accent color used for enhanced styling (hex string)
 ACCENT_COLOR = "#4f94d4"
+
+# Persisted user configuration written by the Config dialog
+APP_CONFIG_PATH = ROOT / "app_config.json"
+
+
+def load_app_config() -> dict:
+    """Return the persisted app config, or {} if it is missing or unreadable."""
+    try:
+        with open(APP_CONFIG_PATH, "r", encoding="utf-8") as fh:
+            cfg = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return cfg if isinstance(cfg, dict) else {}
+
+
+def save_app_config(updates: dict) -> dict:
+    """Merge `updates` into the persisted app config and write it back; returns the merged config.
+
+    Keys the caller does not know about (e.g. "storage", "store_path") are kept.
+    """
+    cfg = load_app_config()
+    cfg.update(updates)
+    tmp = APP_CONFIG_PATH.with_name(APP_CONFIG_PATH.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(cfg, fh, indent=2)
+    os.replace(tmp, APP_CONFIG_PATH)
+    return cfg
@@ -0,0 +1,53 @@
+import json
+import tarfile
+import zipfile
+
+import pytest
+
+from app.cli import main
+from io_.writer import render_npc, write_archive, write_npcs
+from npc.models import NPC, CareerLevel
+
+
+def _npc(name, race, *careers):
+    levels = [CareerLevel(career=c, level=lvl, status=f"Brass {lvl}", skills=("Dodge",), talents=["Hardy"])
+              for c, top in careers for lvl in range(1, top + 1)]
+    return NPC(name=name, race=race, careers=levels, characteristics={"Ws": 35}, skills={"Dodge": 5},
+               talents={"Hardy": len(levels)})
+
+
+def test_archive_export_streams_files_and_manifest(tmp_path, capsys):
+    npcs = [_npc("Bob", "Human", ("Watchman", 2)), _npc("Bob", "Dwarf", ("Slayer", 1)), _npc("Ann", "Elf")]
+    members = list(write_archive(npcs, tmp_path / "session.zip", formats=["txt", "json"]))
+    assert members[:3] == ["session/Bob.txt", "session/Bob.json", "session/Bob_2.txt"]
+    assert members[-1] == "session/manifest.json"
+    with zipfile.ZipFile(tmp_path / "session.zip") as zf:
+        assert zf.namelist() == members
+        assert zf.read("session/Bob_2.txt").decode("utf-8") == render_npc(npcs[1])
+        manifest = json.loads(zf.read("session/manifest.json"))
+    assert manifest["count"] == 3 and manifest["formats"] == ["txt", "json"]
+    assert manifest["npcs"][1] == {"name": "Bob", "race": "Dwarf", "latest_career": "Slayer",
+                                   "latest_status": "Brass 1", "files": ["Bob_2.txt", "Bob_2.json"]}
+
+    assert main(["quick", "4", "--workers", "1", "--archive", str(tmp_path / "quick.tar.gz")]) == 0
+    assert len(capsys.readouterr().out.splitlines()) == 5
+    with tarfile.open(tmp_path / "quick.tar.gz") as tf:
+        assert json.load(tf.extractfile("quick/manifest.json"))["count"] == 4
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["quick.tar.gz", "session.zip"]
+    with pytest.raises(ValueError):
+        list(write_archive(npcs, tmp_path / "session.rar"))
+
+
+def test_export_all_archives_the_given_folder(tmp_path, monkeypatch):
+    ui = pytest.importorskip("app.ui_tk")
+
+    monkeypatch.setattr(ui, "storage_backend", lambda: "txt")
+    out = tmp_path / "configured"
+    list(write_npcs([_npc("Bob", "Human"), _npc("Ann", "Elf")], out, formats=["txt", "md"]))
+    (out / "Bob.txt").write_text("Name: Bob\nhand edited\n", encoding="utf-8")
+    (out / "notes.txt").write_text("not an NPC\n", encoding="utf-8")
+    archive, written, skipped = ui._export_all(str(out / "all.zip"), out)
+    assert (written, skipped) == (5, 0)
+    with zipfile.ZipFile(archive) as zf:
+        assert sorted(zf.namelist()) == ["all/Ann.md", "all/Ann.txt", "all/Bob.md", "all/Bob.txt", "all/notes.txt"]
+        assert zf.read("all/Bob.txt") == (out / "Bob.txt").read_bytes()
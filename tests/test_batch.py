@@ -0,0 +1,37 @@
+import random
+
+from npc.batch import apply_career_levels_batch
+from npc.models import NPC, CareerLevel, RaceProfile
+from npc.rules import apply_career_levels, apply_race
+from npc.vocab import Vocabulary
+
+
+def test_batch_rules_match_reference():
+    rng = random.Random(4)
+    pool_chars = ["Ws", "Bs", "T", "Ag", "Int"]  # 'Ag' is off-order, as in the sheet
+    pool_skills = ["Climb", "Dodge", "Lore (Medicine)", "Perception"]
+    pool_talents = ["A", "B", "C"]
+    elf = RaceProfile(name="Elf", characteristics={"Ws": 60, "Ag": 45}, skills=["Perception", "Sing"],
+                      talents=["Night Vision"])
+    paths, profiles, rolled = [], [], []
+    for i in range(200):
+        path = []
+        for lvl in range(1, rng.randint(0, 5) + 1):
+            path.append(CareerLevel(career=rng.choice("XYZ"), level=lvl, status="",
+                                    characteristics=rng.sample(pool_chars, 2),
+                                    skills=rng.sample(pool_skills, rng.randint(0, 3)),
+                                    talents=rng.sample(pool_talents, rng.randint(0, 2))))
+        paths.append(path)
+        profiles.append(elf if i % 3 == 0 else None)
+        rolled.append(["Luck"] if i % 6 == 0 else [])
+
+    pop = apply_career_levels_batch(paths, profiles, rolled, names=[str(i) for i in range(200)],
+                                    skill_vocab=Vocabulary(), talent_vocab=Vocabulary())
+    for i, view in enumerate(pop):
+        ref = NPC(name=str(i), race="")
+        ref.careers = paths[i]
+        apply_race(ref, profiles[i])
+        for t in rolled[i]:
+            ref.talents[t] = ref.talents.get(t, 0) + 1
+        apply_career_levels(ref, paths[i])
+        assert view.to_npc() == ref, i
@@ -0,0 +1,23 @@
+from npc.choices import ChoiceCompiler, resolve_choices, resolve_choices_batch
+
+
+def test_compiled_talent_choices_resolve_reproducibly():
+    compiler = ChoiceCompiler(["Luck", "Hardy", "Acute Sense (any)"])
+    compiled = compiler.compile(["Doomed", "Savvy or Suave", "2 Random Talents",
+                                 "Language (Battle or Thieves' Tongue)"])
+    # parenthesised 'or' is part of the name, not an alternative
+    assert compiled.fixed == ("Doomed", "Language (Battle or Thieves' Tongue)")
+    assert compiled.sources == ("Savvy or Suave", "2 Random Talents")
+
+    picks = resolve_choices(compiled, seed=7)
+    assert picks == resolve_choices(compiled, seed=7)
+    assert picks[:2] == ["Doomed", "Language (Battle or Thieves' Tongue)"]
+    assert picks[2] in ("Savvy", "Suave")
+    randoms = picks[3:]
+    assert len(randoms) == 2 and len(set(randoms)) == 2
+    pool = {"Luck", "Hardy"} | {f"Acute Sense ({s})" for s in ("Hearing", "Sight", "Smell", "Taste", "Touch")}
+    assert set(randoms) <= pool
+
+    batch = resolve_choices_batch(compiled, 50, seed=3)
+    assert batch == resolve_choices_batch(compiled, 50, seed=3)
+    assert len(batch) == 50
@@ -0,0 +1,60 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from app.cli import main, parse_spec_line
+
+ROOT = Path(__file__).parent.parent
+
+
+def test_parse_spec_line():
+    assert parse_spec_line("Greta; Dwarf; Engineer:2, Soldier 1") == ("Greta", "Dwarf", "Engineer:2, Soldier 1")
+    assert parse_spec_line("Bob") == ("Bob", "", "")
+    assert parse_spec_line("  # comment") is None
+
+
+def test_build_writes_one_file_per_spec(tmp_path, capsys):
+    specs = tmp_path / "specs.txt"
+    specs.write_text("Greta; Dwarf; Engineer:2\n\nBob; Human; Watchman 1\n", encoding="utf-8")
+    out = tmp_path / "out"
+
+    assert main(["build", str(specs), "--out", str(out), "--talents", "first"]) == 0
+    printed = capsys.readouterr().out.split()
+    assert printed == [str(out / "Greta.txt"), str(out / "Bob.txt")]
+    text = (out / "Greta.txt").read_text()
+    assert "Latest Career: Engineer" in text
+
+
+def test_build_never_imports_tkinter(tmp_path):
+    specs = tmp_path / "specs.txt"
+    specs.write_text("Greta; Dwarf; Engineer:1\n", encoding="utf-8")
+    code = ("import sys, runpy; sys.argv = ['main.py', 'build', sys.argv[1], '--out', sys.argv[2]]\n"
+            "try:\n    runpy.run_path('main.py', run_name='__main__')\n"
+            "except SystemExit:\n    pass\n"
+            "print('tkinter' in sys.modules, file=sys.stderr)")
+    res = subprocess.run([sys.executable, "-c", code, str(specs), str(tmp_path / "out")],
+                         capture_output=True, text=True, cwd=ROOT, check=True)
+    assert res.stderr.strip().splitlines()[-1] == "False"
+
+
+def test_build_keeps_npcs_with_the_same_name(tmp_path, capsys):
+    specs = tmp_path / "specs.txt"
+    specs.write_text("Bob; Human; Watchman 1\nBob; Dwarf; Engineer 1\n", encoding="utf-8")
+    out = tmp_path / "out"
+
+    assert main(["build", str(specs), "--out", str(out), "--io-threads", "2"]) == 0
+    assert capsys.readouterr().out.split() == [str(out / "Bob.txt"), str(out / "Bob_2.txt")]
+    assert "Race: Dwarf" in (out / "Bob_2.txt").read_text(encoding="utf-8")
+    assert not [p for p in out.iterdir() if p.name.endswith(".tmp")]
+
+
+def test_commands_report_io_errors_instead_of_crashing(tmp_path, capsys):
+    assert main(["build", str(tmp_path / "missing.txt"), "--out", str(tmp_path / "out")]) == 1
+    assert capsys.readouterr().err.startswith("error: ")
+    # a file in the way of the output folder, then a folder given as the store
+    blocker = tmp_path / "blocker"
+    blocker.write_text("", encoding="utf-8")
+    assert main(["quick", "2", "--out", str(blocker / "out"), "--storage", "txt"]) == 1
+    assert capsys.readouterr().err.startswith("error: ")
+    assert main(["export", "--store", str(tmp_path)]) == 1
+    assert capsys.readouterr().err.startswith("error: ")
@@ -0,0 +1,33 @@
+import numpy as np
+
+from npc.dice import compile_formula, race_formulas, roll_characteristics
+from npc.models import RaceProfile
+from npc.rules import CHAR_ORDER
+from settings import CHAR_RACE_BONUS
+
+
+def test_dice_formulas_roll_populations():
+    f = compile_formula("20 + 2d10")
+    rolls = f.roll(5000, np.random.default_rng(0))
+    assert f.minimum == 22
+    assert rolls.min() >= 22 and rolls.max() <= 40
+
+    kh = compile_formula("4d6kh3 - 1").roll(5000, np.random.default_rng(0))
+    assert kh.min() >= 2 and kh.max() <= 17
+
+    m = roll_characteristics(1000, seed=3)
+    assert m.shape == (1000, len(CHAR_ORDER))
+    assert (m == roll_characteristics(1000, seed=3)).all()
+
+    race = RaceProfile(name="Test", characteristics={c: 20 + CHAR_RACE_BONUS for c in CHAR_ORDER})
+    race.characteristics["Wp"] = 40 + CHAR_RACE_BONUS
+    m = roll_characteristics(1000, race_formulas(race), seed=3)
+    wp = m[:, CHAR_ORDER.index("Wp")]
+    assert wp.min() >= 42 and wp.max() <= 60
+
+    for bad in ("", "2d", "3d6kh4", "2d6 3"):
+        try:
+            compile_formula(bad)
+        except ValueError:
+            continue
+        raise AssertionError(bad)
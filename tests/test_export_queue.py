@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+
+from app.export_queue import ExportService
+from app.viewmodel import ViewModel
+from io_.writer import npc_filename, render_npc, write_npc
+from npc.models import NPC
+
+
+def test_export_service_coalesces_bounds_and_reports():
+    svc = ExportService(maxsize=2)
+    started, gate = threading.Event(), threading.Event()
+    written, done = [], []
+    svc.submit("blocker", lambda: (started.set(), gate.wait()), on_done=done.append)
+    assert started.wait(5)  # the worker is busy, so later jobs stay queued
+    first = svc.submit("Greta.txt", written.append, "v1", on_done=done.append)
+    again = svc.submit("Greta.txt", written.append, "v2", on_done=done.append)
+    assert again is first and first.coalesced == 1
+    failing = svc.submit("Bob.txt", lambda: 1 / 0, on_done=done.append)
+    assert svc.submit("Hans.txt", written.append, "x") is None  # queue full
+    assert svc.depth() == 3
+
+    gate.set()
+    assert svc.wait_idle(5)
+    assert written == ["v2"]
+    assert svc.dispatch() == 3
+    assert [j.key for j in done] == ["blocker", "Greta.txt", "Greta.txt", "Bob.txt"]
+    assert isinstance(failing.error, ZeroDivisionError)
+    stats = svc.stats()
+    assert (stats["depth"], stats["completed"], stats["failed"], stats["coalesced"]) == (0, 2, 1, 1)
+    assert stats["max_ms"] >= stats["p95_ms"] >= 0
+    assert svc.close(5)
+
+
+def test_export_service_keeps_same_name_npcs_from_different_sessions(tmp_path):
+    svc = ExportService()
+    started, gate = threading.Event(), threading.Event()
+    svc.submit("blocker", lambda: (started.set(), gate.wait()))
+    assert started.wait(5)
+    vm = ViewModel()
+
+    def export():
+        npc = vm.get_current_npc()
+        svc.submit(("txt", vm.session), write_npc, npc, npc_filename(npc.name), tmp_path, body=render_npc(npc))
+
+    vm.start_new_npc("Guard", "Dwarf")
+    export()
+    vm.start_new_npc("Guard", "Elf")
+    export()
+    export()  # a second click on the same NPC coalesces
+    assert svc.depth() == 3  # the blocker plus one job per session
+    gate.set()
+    assert svc.wait_idle(5) and svc.close(5)
+    assert sorted(p.name for p in tmp_path.glob("Guard*.txt")) == ["Guard.txt", "Guard_2.txt"]
+    assert "Race: Dwarf" in (tmp_path / "Guard.txt").read_text(encoding="utf-8")
+    assert "Race: Elf" in (tmp_path / "Guard_2.txt").read_text(encoding="utf-8")
+
+
+def test_reexports_of_a_session_replace_its_own_file(tmp_path):
+    ui = pytest.importorskip("app.ui_tk")
+
+    greta, other = {}, {}
+    first = ui._write_session_npc(NPC(name="Greta", race="Dwarf"), "v1\n", tmp_path, greta)
+    second = ui._write_session_npc(NPC(name="Greta", race="Dwarf"), "v2\n", tmp_path, greta)
+    third = ui._write_session_npc(NPC(name="Greta", race="Elf"), "elf\n", tmp_path, other)
+    assert first == second == tmp_path / "Greta.txt" and third == tmp_path / "Greta_2.txt"
+    assert first.read_text(encoding="utf-8") == "v2\n"
@@ -0,0 +1,46 @@
+import json
+
+import io_.formats as formats
+from io_.render import format_skills, format_talents
+from io_.writer import render_npc, write_npcs
+from npc.models import NPC, CareerLevel
+
+
+def test_formats_share_one_document_per_npc(tmp_path):
+    npc = NPC(name="Greta & Co", race="Dwarf",
+              careers=[CareerLevel("Smith", 1, "Brass 2"), CareerLevel("Smith", 2, "Brass 4")],
+              characteristics={"Ws": 40, "S": 45}, skills={"trade (Smith)": 10, "Endurance": 5},
+              talents={"Strong Back": 2, "artistic": 1})
+    formats.clear_render_cache()
+    out = formats.render_all(npc, formats.available_formats())
+    assert formats.render_cache_info()["misses"] == 1
+    assert set(out) >= {"txt", "md", "html", "json", "vtt"}
+    assert out["txt"] == render_npc(npc)
+    assert formats.render_cache_info() == {"hits": 1, "misses": 1, "size": 1, "maxsize": formats.RENDER_CACHE_SIZE}
+    assert format_skills(npc.skills) in out["txt"] and format_talents(npc.talents) in out["md"]
+    assert "Greta &amp; Co" in out["html"]
+    data = json.loads(out["json"])
+    assert list(data["skills"]) == ["Endurance", "trade (Smith)"] and data["careers"][-1]["status"] == "Brass 4"
+    actor = json.loads(out["vtt"])
+    assert actor["type"] == "npc" and actor["system"]["characteristics"]["s"]["initial"] == 45
+    assert [(i["name"], i["type"]) for i in actor["items"]][-1] == ("Strong Back", "talent")
+
+    (tmp_path / "Greta_&_Co.md").write_text("old", encoding="utf-8")
+    paths = list(write_npcs([npc], tmp_path, formats=["txt", "md", "vtt"]))
+    assert [p.name for p in paths] == ["Greta_&_Co_2.txt", "Greta_&_Co_2.md", "Greta_&_Co_2.vtt.json"]
+    assert paths[0].read_text(encoding="utf-8") == out["txt"]
+    assert formats.render_cache_info()["misses"] == 1
+
+
+def test_render_cache_follows_in_place_edits():
+    npc = NPC(name="Hans", race="Human", skills={"Climb": 5}, talents={"Hardy": 1})
+    formats.clear_render_cache()
+    assert "Climb 5" in formats.render(npc, "md")
+    npc.skills["Climb"] = 10
+    npc.talents["Hardy"] = 2
+    md = formats.render(npc, "md")
+    assert "Climb 10" in md and "Hardy 2" in md
+    # an equal NPC shares the cached document
+    twin = NPC(name="Hans", race="Human", skills={"Climb": 10}, talents={"Hardy": 2})
+    assert formats.npc_document(twin) is formats.npc_document(npc)
+    assert formats.render_cache_info()["misses"] == 2
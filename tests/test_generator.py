@@ -0,0 +1,58 @@
+import random
+
+import npc.generator as gen
+from data.races import RaceTable, get_race_table
+from npc.generator import build_cache_info, build_npc, clear_build_cache, configure_build_cache
+from npc.models import CareerLevel
+from settings import CHAR_BASE, CHAR_PER_LEVEL, CHAR_RACE_BONUS
+
+
+def test_build_npc_applies_race_profile():
+    races = get_race_table()
+    dwarf = races.resolve("Dwarf")
+    assert dwarf is not None and dwarf.name == "Dwarf"
+    assert races.resolve("high elf").name == "High_elf"
+    assert races.resolve("Human").name == "Human (Reikland)"
+    assert "Savvy or Suave" in races.resolve("Human").talent_choices
+
+    cl = CareerLevel(career="Smith", level=1, status="", characteristics=["Ws"], skills=["Cool"])
+    npc = build_npc("Gimli", "Dwarf", [cl])
+    assert npc.characteristics["Ws"] == 30 + CHAR_RACE_BONUS + CHAR_PER_LEVEL
+    assert npc.characteristics["Wp"] == 40 + CHAR_RACE_BONUS
+    assert npc.skills["Cool"] == CHAR_PER_LEVEL
+    assert npc.skills["Endurance"] == 0
+    assert npc.talents["Night Vision"] == 1
+
+    # unknown races keep the flat base
+    assert build_npc("X", "Gnome", []).characteristics["Ws"] == CHAR_BASE
+
+
+def test_build_npc_cache_hits_copies_and_invalidation(monkeypatch):
+    races = RaceTable([])
+    path = [CareerLevel(career="Watchman", level=1, status="", characteristics=("Ws",), skills=("Dodge",),
+                        talents=("Tenacious",))]
+    clear_build_cache()
+    first = build_npc("Guard 1", "Human", path, races=races)
+    second = build_npc("Guard 2", "Human", list(path), races=races)
+    assert build_cache_info()["hits"] == 1 and build_cache_info()["misses"] == 1
+    assert (second.characteristics, second.skills, second.talents) == \
+        (first.characteristics, first.skills, first.talents)
+    # hits get their own dicts
+    second.skills["Dodge"] = 99
+    assert build_npc("Guard 3", "Human", path, races=races).skills["Dodge"] == CHAR_PER_LEVEL
+    # rolled extras are applied on top of the cached block, never stored in it
+    assert build_npc("Guard 4", "Human", path, races=races, rng=random.Random(1)) == first.__class__(
+        name="Guard 4", race="Human", careers=path, characteristics=first.characteristics,
+        skills=first.skills, talents=first.talents)
+
+    # a catalog reload empties the cache
+    monkeypatch.setattr("data.catalog.loaded_generation", lambda: -1)
+    build_npc("Guard 5", "Human", path, races=races)
+    assert build_cache_info()["size"] == 1 and build_cache_info()["misses"] == 2
+
+    configure_build_cache(2)
+    for lvl in (2, 3, 4):
+        build_npc("X", "Human", [CareerLevel(career="Watchman", level=lvl, status="")], races=races)
+    assert build_cache_info()["size"] == 2 and build_cache_info()["evictions"] == 2
+    configure_build_cache(gen.BUILD_CACHE_SIZE)
+    clear_build_cache()
@@ -1,2 +1,94 @@
-def test_placeholder_loader():
-    assert True
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from data import snapshot
+from data.catalog import CareerCatalog
+from data.loader import read_rows
+from data.search import CareerSearchIndex
+from data.snapshot import SOURCES
+
+
+def _write_careers(path, rows):
+    lines = ["Career;Characteristics;Skills;Talents;Status"] + rows
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_catalog_indexes_by_name_and_level(tmp_path):
+    csv_path = tmp_path / "careers.csv"
+    _write_careers(csv_path, [
+        "Smith 1;S, T;Endurance, Trade (Smith);Strong Back, Very Strong;Brass 2",
+        "Smith 2;Dex;Evaluate;Artistic;Brass 4",
+        "Smithy Worker 1;S;Climb;Hardy;Brass 1",
+    ])
+    cat = CareerCatalog(csv_path)
+    cat.refresh()
+
+    levels = cat.get_levels("Smith", 2)
+    assert [(c.career, c.level) for c in levels] == [("Smith", 1), ("Smith", 2)]
+    assert levels[0].skills == ("Endurance", "Trade (Smith)")
+    # exact base-name match: 'Smith' must not pick up 'Smithy Worker'
+    assert cat.get_levels("Smith", 1)[0].talents == ("Strong Back", "Very Strong")
+    # copies share the catalog's immutable, interned name tuples
+    assert cat.get_levels("Smith", 1)[0].skills is levels[0].skills
+    assert levels[0].skills[0] is cat.skill_vocab.canonical("Endurance")
+    assert cat.get_levels("smith", 1)[0].career == "Smith"
+    assert cat.names() == ["Smith", "Smithy Worker"]
+
+    # handed-out rows are copies; replacing talents must not leak back
+    levels[0].talents = ["Custom"]
+    assert cat.get_level("Smith", 1).talents == ("Strong Back", "Very Strong")
+
+
+def test_catalog_reloads_when_file_changes(tmp_path):
+    csv_path = tmp_path / "careers.csv"
+    _write_careers(csv_path, ["Smith 1;S;Endurance;Hardy;Brass 2"])
+    cat = CareerCatalog(csv_path)
+    assert cat.refresh() is True
+    assert cat.refresh() is False
+
+    _write_careers(csv_path, ["Smith 1;S;Endurance;Hardy;Brass 2", "Miner 1;S;Climb;Tunnel Rat;Brass 2"])
+    st = os.stat(csv_path)
+    os.utime(csv_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert cat.refresh() is True
+    assert "Miner" in cat
+
+
+def test_snapshot_compiles_once_then_loads_directly(tmp_path):
+    snap = tmp_path / "catalog.snapshot"
+    first = snapshot.load_tables(snap)
+    assert snapshot.last_load["source"] == "csv"
+    assert snap.exists()
+
+    second = snapshot.load_tables(snap)
+    assert snapshot.last_load["source"] == "snapshot"
+    assert second == first
+    assert any(r["Career"] == "Engineer 1" for r in second["careers"])
+
+
+def test_csv_and_pandas_backends_agree():
+    for name in SOURCES.values():
+        assert read_rows(name, backend="csv") == read_rows(name, backend="pandas")
+
+
+def test_default_loading_path_does_not_import_pandas():
+    code = ("import sys, app.viewmodel; from data.loader import get_career_names; "
+            "get_career_names(); print('pandas' in sys.modules)")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         cwd=Path(__file__).parent.parent, check=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_career_search_index_ranking():
+    idx = CareerSearchIndex(["Watchman", "Pit Fighter", "Engineer", "Seaman", "Man-at-Arms", "Bawd"])
+    assert idx.search("watch")[0] == "Watchman"
+    assert idx.search("Watchman 3") == ["Watchman"]
+    # word prefix beats substring
+    assert idx.search("man")[:2] == ["Man-at-Arms", "Seaman"]
+    assert "Watchman" in idx.search("man")
+    assert idx.search("pit fi") == ["Pit Fighter"]
+    # typo tolerance
+    assert idx.search("enginer") == ["Engineer"]
+    assert idx.search("fihgter") == ["Pit Fighter"]
+    assert idx.search("") == idx.names
@@ -0,0 +1,66 @@
+import os
+import threading
+
+import settings
+from io_.manifest import Manifest, flush_manifests, get_manifest
+from io_.writer import write_npc, write_npcs
+from npc.models import NPC, CareerLevel
+
+
+def _npc(name, race, *careers):
+    levels = [CareerLevel(career=c, level=lvl, status=f"Brass {lvl}", skills=("Dodge",), talents=["Hardy"])
+              for c, top in careers for lvl in range(1, top + 1)]
+    return NPC(name=name, race=race, careers=levels, characteristics={"Ws": 35}, skills={"Dodge": 5},
+               talents={"Hardy": len(levels)})
+
+
+def test_manifest_tracks_writer_and_reconciles(tmp_path):
+    out = tmp_path / "out"
+    write_npc(_npc("Bob", "Human", ("Watchman", 2)), "Bob.txt", out)
+    list(write_npcs([_npc("Greta", "Dwarf", ("Soldier", 1)), _npc("Greta", "Dwarf", ("Engineer", 1))], out))
+    manifest = get_manifest(out)
+    assert [(e.filename, e.latest_career) for e in manifest.entries()] == \
+        [("Bob.txt", "Watchman"), ("Greta.txt", "Soldier"), ("Greta_2.txt", "Engineer")]
+    assert [e.filename for e in manifest.filter("dwarf engineer")] == ["Greta_2.txt"]
+
+    # a fresh instance reads the saved manifest; nothing changed on disk
+    fresh = Manifest(out)
+    assert len(fresh) == 3 and fresh.reconcile() == (0, 0, 0)
+
+    # changes made behind the writer's back: one edited, one removed, one added by hand
+    (out / "Bob.txt").write_text("Name: Robert\nRace: Halfling\n", encoding="utf-8")
+    os.utime(out / "Bob.txt", ns=(1, 1))
+    (out / "Greta_2.txt").unlink()
+    (out / "Hans_Muller.txt").write_text("just notes", encoding="utf-8")
+    assert fresh.reconcile() == (1, 1, 1)
+    assert [(e.name, e.race) for e in fresh.entries()] == \
+        [("Greta", "Dwarf"), ("Hans Muller", ""), ("Robert", "Halfling")]
+    assert Manifest(out).entries() == fresh.entries()
+
+
+def test_writer_and_manifest_follow_the_configured_output_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "OUTPUT_DIR", str(tmp_path / "configured"))
+    path = write_npc(_npc("Bob", "Human"), "Bob.txt")
+    assert path == tmp_path / "configured" / "Bob.txt"
+    assert [e.filename for e in get_manifest().entries()] == ["Bob.txt"]
+
+
+def test_single_exports_coalesce_manifest_saves(tmp_path):
+    out = tmp_path / "out"
+    for i in range(3):
+        write_npc(_npc(f"N{i}", "Human"), f"N{i}.txt", out)
+    manifest = get_manifest(out)
+    assert len(manifest) == 3 and not manifest.path.exists()  # save still pending
+    flush_manifests()
+    assert len(Manifest(out)) == 3
+
+    # concurrent saves never leave an older snapshot on disk
+    def add(i):
+        manifest.record(write_npc(_npc(f"T{i}", "Elf"), f"T{i}.txt", out, manifest=False), _npc(f"T{i}", "Elf"))
+        manifest.save()
+    threads = [threading.Thread(target=add, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(Manifest(out)) == 11
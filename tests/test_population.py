@@ -0,0 +1,39 @@
+import tracemalloc
+
+from io_.render import format_characteristics, format_skills, format_talents
+from io_.writer import write_npc
+from npc.population import NPCPopulation
+from npc.quick import _ensure_tables, generate_quick_npcs, quick_population
+from npc.vocab import Vocabulary
+
+
+def test_population_views_match_npcs(tmp_path):
+    npcs = list(generate_quick_npcs(30, seed=5, workers=1))
+    npcs[0].characteristics["Ag"] = 1  # off-order key from a sheet typo
+    pop = NPCPopulation.from_npcs(npcs, Vocabulary(), Vocabulary())
+    assert len(pop) == 30 and pop.characteristics.shape == (30, 10)
+    for view, npc in zip(pop, npcs):
+        assert view.to_npc() == npc
+        assert format_characteristics(view.characteristics) == format_characteristics(npc.characteristics)
+        assert format_skills(view.skills) == format_skills(npc.skills)
+        assert format_talents(view.talents) == format_talents(npc.talents)
+        assert view.latest_status() == npc.latest_status()
+
+    a = write_npc(pop[-1], "view.txt", tmp_path).read_text(encoding="utf-8")
+    b = write_npc(npcs[-1], "npc.txt", tmp_path).read_text(encoding="utf-8")
+    assert a == b
+    assert pop.memory_report()["npcs"] == 30
+
+
+def test_population_shares_equal_career_rows():
+    _ensure_tables()
+    tracemalloc.start()
+    try:
+        pop = quick_population(3000, seed=2, workers=1)
+        traced = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    rows = [cl for path in pop.careers for cl in path]
+    assert len({id(cl) for cl in rows}) < len(rows) // 4
+    # the report accounts for what the population really holds
+    assert 0.8 < pop.memory_report()["bytes"] / traced < 1.2
@@ -0,0 +1,63 @@
+from concurrent.futures import Future
+
+import numpy as np
+
+import npc.quick as quick
+from npc.quick import generate_quick_npcs, iter_quick_populations, quick_population
+from settings import CHAR_RACE_BONUS
+
+
+def test_quick_npcs_identical_for_any_worker_count():
+    serial = list(generate_quick_npcs(40, seed=11, workers=1, chunk_size=7))
+    parallel = list(generate_quick_npcs(40, seed=11, workers=3, chunk_size=7))
+    assert serial == parallel
+    assert [n.name for n in serial[:2]] == ["NPC 1", "NPC 2"]
+    assert serial != list(generate_quick_npcs(40, seed=12, workers=1))
+    assert all(n.careers and all(len(cl.talents) <= 1 for cl in n.careers) for n in serial)
+
+
+def test_quick_chunks_in_flight_are_bounded(monkeypatch):
+    submitted = []
+
+    class FakePool:
+        def __init__(self, max_workers, initializer):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def submit(self, fn, *args):
+            fut = Future()
+            fut.set_result(args[0])
+            submitted.append(args[0])
+            return fut
+
+    monkeypatch.setattr(quick, "ProcessPoolExecutor", FakePool)
+    ahead = []
+    for i, start in enumerate(quick._run_chunks(lambda *a: None, 1000, 0, 3, 10, "NPC")):
+        assert start == i * 10
+        ahead.append(len(submitted) - i)
+    assert len(submitted) == 100 and max(ahead) <= 3 * 2
+
+
+def test_quick_population_matches_quick_npcs():
+    npcs = list(generate_quick_npcs(60, seed=3, workers=1))
+    pop = quick_population(60, seed=3, workers=1, chunk_size=25)
+    assert [view.to_npc() for view in pop] == npcs
+
+
+def test_quick_population_can_roll_characteristics():
+    flat = quick_population(60, seed=3, workers=1, chunk_size=25)
+    rolled = quick_population(60, seed=3, workers=1, chunk_size=25, roll=True)
+    assert (rolled.characteristics == quick_population(60, seed=3, workers=2, chunk_size=25,
+                                                       roll=True).characteristics).all()
+    streamed = np.concatenate([p.characteristics for p in iter_quick_populations(60, seed=3, workers=1,
+                                                                                  chunk_size=25, roll=True)])
+    assert (streamed == rolled.characteristics).all()
+    # 2d10 in place of the flat bonus; careers, skills and talents are untouched
+    diff = rolled.characteristics - flat.characteristics
+    assert diff.min() >= 2 - CHAR_RACE_BONUS and diff.max() <= 20 - CHAR_RACE_BONUS and diff.std() > 0
+    assert [(v.skills, v.talents) for v in rolled] == [(v.skills, v.talents) for v in flat]
@@ -0,0 +1,30 @@
+from app.cli import main
+from io_.reader import iter_npc_files, parse_talents
+from io_.store import NPCStore
+from io_.writer import write_npcs
+from npc.quick import generate_quick_npcs
+
+
+def test_reader_round_trips_exports_and_imports_them(tmp_path, capsys):
+    assert parse_talents("Hardy 2, Read/Write, Sixth Sense") == {"Hardy": 2, "Read/Write": 1, "Sixth Sense": 1}
+    npcs = list(generate_quick_npcs(12, seed=3, workers=1))
+    out = tmp_path / "out"
+    list(write_npcs(npcs, out))
+    (out / "broken.txt").write_text("not an NPC\n", encoding="utf-8")
+
+    errors = []
+    read = list(iter_npc_files(out, workers=2, chunk_size=5, on_error=lambda p, e: errors.append(p.name)))
+    assert errors == ["broken.txt"]
+    by_name = {npc.name: npc for _, npc in read}
+    for npc in npcs:
+        back = by_name[npc.name]
+        assert (back.characteristics, back.skills, back.talents) == (npc.characteristics, npc.skills, npc.talents)
+        assert (back.race, back.latest_career(), back.latest_status()) == (npc.race, npc.latest_career(),
+                                                                           npc.latest_status())
+
+    (out / "broken.txt").unlink()
+    store = tmp_path / "back.sqlite"
+    assert main(["import", str(out), "--store", str(store), "--workers", "1"]) == 0
+    assert len(capsys.readouterr().out.splitlines()) == 12
+    with NPCStore(store) as s:
+        assert sorted(r.name for r in s.find()) == sorted(by_name)
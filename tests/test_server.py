@@ -0,0 +1,64 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from app.server import BATCH_INLINE, NPCServer
+
+
+@pytest.fixture
+def server():
+    srv = NPCServer(("127.0.0.1", 0), workers=1, quiet=True)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _call(srv, path, body=None):
+    url = f"http://127.0.0.1:{srv.server_address[1]}{path}"
+    data = json.dumps(body).encode() if body is not None else None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=30) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_server_builds_rolls_and_renders(server):
+    status, health = _call(server, "/health")
+    assert status == 200 and health["careers"] > 0
+
+    status, built = _call(server, "/build", {"name": "Greta", "race": "Dwarf", "careers": "Watchman 2",
+                                             "formats": ["md"]})
+    assert status == 200 and built["npc"]["latest_career"] == "Watchman"
+    assert built["rendered"]["md"].startswith("# Greta")
+
+    status, rendered = _call(server, "/render", {"npc": built["npc"], "formats": ["txt", "vtt"]})
+    assert status == 200 and rendered["npc"] == built["npc"]
+    assert "Name: Greta" in rendered["rendered"]["txt"]
+
+    # above BATCH_INLINE the batch runs in the worker pool; results match the inline path
+    count = BATCH_INLINE + 5
+    _, pooled = _call(server, "/quick", {"count": count, "seed": 7})
+    _, inline = _call(server, "/quick", {"count": 3, "seed": 7})
+    assert len(pooled["npcs"]) == count and pooled["npcs"][:3] == inline["npcs"]
+
+    _, batch = _call(server, "/build", {"specs": ["Bob; Human; Watchman 1", {"race": "Elf"}]})
+    assert batch["npcs"][0]["npc"]["name"] == "Bob" and "error" in batch["npcs"][1]
+    # a bad seed is the client's error: a 400, or an error slot inside a batch
+    assert _call(server, "/build", {"name": "X", "seed": {"x": 1}})[0] == 400
+    status, batch = _call(server, "/build", {"specs": [{"name": "Y", "seed": [1]}, {"name": "Z", "seed": "z"}]})
+    assert status == 200 and "seed" in batch["npcs"][0]["error"] and batch["npcs"][1]["npc"]["name"] == "Z"
+
+    assert _call(server, "/quick", {"count": 0})[0] == 400
+    assert _call(server, "/render", {"npc": {"race": "Elf"}})[0] == 400
+    assert _call(server, "/build", {"name": "X", "formats": ["pdf"]})[0] == 400
+    assert _call(server, "/request")[0] == 404
+
+    _, stats = _call(server, "/stats")
+    assert stats["latency"]["POST /quick"]["count"] == 3
+    assert stats["latency"]["POST /build"]["p99_ms"] >= stats["latency"]["POST /build"]["p50_ms"]
@@ -0,0 +1,57 @@
+import json
+
+import settings
+from app.cli import main
+from io_.store import NPCStore, storage_backend, store_path
+from npc.models import NPC, CareerLevel
+
+
+def _npc(name, race, *careers):
+    levels = [CareerLevel(career=c, level=lvl, status=f"Brass {lvl}", skills=("Dodge",), talents=["Hardy"])
+              for c, top in careers for lvl in range(1, top + 1)]
+    return NPC(name=name, race=race, careers=levels, characteristics={"Ws": 35}, skills={"Dodge": 5},
+               talents={"Hardy": len(levels)})
+
+
+def test_store_bulk_insert_lookup_and_export(tmp_path):
+    with NPCStore(tmp_path / "npcs.sqlite") as store:
+        ids = list(store.add_many([_npc("Bob", "Human", ("Watchman", 2)),
+                                   _npc("Greta", "Dwarf", ("Soldier", 1), ("Watchman", 1)),
+                                   _npc("bob", "Dwarf", ("Engineer", 3))], batch_size=2))
+        assert len(ids) == 3 and len(store) == 3
+
+        assert [r.name for r in store.find(name="BOB")] == ["Bob", "bob"]
+        assert [r.name for r in store.find(race="dwarf")] == ["Greta", "bob"]
+        assert [r.name for r in store.find(career="Watchman")] == ["Bob", "Greta"]
+        assert [r.latest_career for r in store.find(race="Dwarf", career="watchman")] == ["Watchman"]
+
+        greta = store.get(ids[1])
+        assert greta == _npc("Greta", "Dwarf", ("Soldier", 1), ("Watchman", 1))
+
+        paths = list(store.export_txt(store.find(name="bob"), tmp_path / "out"))
+        assert [p.name for p in paths] == ["Bob.txt", "bob_2.txt"]
+        assert "Latest Career: Engineer" in paths[1].read_text(encoding="utf-8")
+
+
+def test_storage_is_selected_from_config(tmp_path, capsys):
+    assert storage_backend({}) == "txt"
+    assert storage_backend({"storage": "SQLite"}) == "sqlite"
+    assert store_path({"output_dir": str(tmp_path)}) == tmp_path / "npcs.sqlite"
+
+    specs = tmp_path / "specs.txt"
+    specs.write_text("Bob; Human; Watchman 1\n", encoding="utf-8")
+    assert main(["build", str(specs), "--out", str(tmp_path), "--storage", "sqlite"]) == 0
+    assert capsys.readouterr().out.strip() == f"{tmp_path / 'npcs.sqlite'}#1"
+    assert main(["export", "--store", str(tmp_path / "npcs.sqlite"), "--out", str(tmp_path / "txt")]) == 0
+    assert (tmp_path / "txt" / "Bob.txt").exists()
+
+
+def test_saving_config_keeps_storage_keys(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "APP_CONFIG_PATH", tmp_path / "app_config.json")
+    settings.save_app_config({"storage": "sqlite", "store_path": "campaign.sqlite"})
+    # what the Config dialog's Save writes
+    settings.save_app_config({"output_dir": str(tmp_path), "theme": "clam", "accent": "#fff"})
+    cfg = json.loads((tmp_path / "app_config.json").read_text(encoding="utf-8"))
+    assert cfg == {"storage": "sqlite", "store_path": "campaign.sqlite", "output_dir": str(tmp_path),
+                   "theme": "clam", "accent": "#fff"}
+    assert storage_backend() == "sqlite"
@@ -1,6 +1,13 @@
+import random
+
 import pytest
 
+import app.viewmodel as viewmodel
+from app.history import CareerHistory
 from app.viewmodel import ViewModel
+from io_.render import format_skills, format_talents
+from npc.aggregate import _SortedNames
+from npc.generator import build_npc
 from npc.models import CareerLevel
 
 
@@ -24,10 +31,134 @@ def test_add_career_str_and_undo(monkeypatch):
     assert len(added) == 2
     assert len(vm.career_levels) == 2
     # History should have one group containing the two CareerLevel objects
-    assert len(vm._history) == 1
-    assert vm._history[0] == added
+    assert len(vm.history) == 1
+    assert vm.history[0] == added
 
     removed = vm.undo_last_career()
     assert removed == added
     assert len(vm.career_levels) == 0
-    assert vm._history == []
+    assert vm.history == []
+
+
+def test_incremental_aggregate_matches_full_rebuild():
+    """Adds, talent picks and undos must leave the same NPC as build_npc from scratch."""
+    vm = ViewModel()
+    vm.start_new_npc("Greta", "Dwarf")
+
+    def check():
+        ref = build_npc(vm.name, vm.race, vm.career_levels)
+        cur = vm.get_current_npc()
+        assert cur.characteristics == ref.characteristics
+        assert cur.skills == ref.skills
+        assert cur.talents == ref.talents
+        s = vm.get_summary()
+        assert s["skills"] == format_skills(ref.skills)
+        assert s["talents"] == format_talents(ref.talents)
+
+    added = vm.add_career_str("Engineer:3, Soldier 2")
+    check()
+    vm.set_talents(added[0], ["Tinker", "Tinker"])
+    check()
+    vm.add_career_str("Apothecary 4")
+    check()
+    vm.undo_history_index(0)
+    check()
+    vm.undo_last_career()  # restores the group undone above
+    check()
+    vm.redo()
+    check()
+    vm.undo_history_index(0)
+    check()
+    assert vm.career_levels == []
+    assert vm.get_current_npc().skills == build_npc("Greta", "Dwarf", []).skills
+
+
+def test_history_undo_redo_reports_changed_rows(monkeypatch):
+    """Listeners get row-level changes; undo/redo/undo-by-group touch only their group."""
+    def fake_get_career_levels(name, upto):
+        return [CareerLevel(career=name, level=i, status="") for i in range(1, upto + 1)]
+
+    monkeypatch.setattr("app.viewmodel.get_career_levels", fake_get_career_levels)
+    vm = ViewModel()
+    rows = []
+
+    def on_change(change):
+        for i in change.removed:
+            del rows[i]
+        for i, cl in change.inserted:
+            rows.insert(i, (cl.career, cl.level))
+
+    vm.subscribe(on_change)
+    vm.add_career_str("A:2")
+    vm.add_career_str("B:1")
+    vm.add_career_str("C:2")
+    assert rows == [("A", 1), ("A", 2), ("B", 1), ("C", 1), ("C", 2)]
+
+    first_gid = vm.history_groups()[0][0]
+    vm.undo_group(first_gid)
+    assert rows == [("B", 1), ("C", 1), ("C", 2)]
+    vm.undo_last_career()          # undo the group removal
+    assert rows[:2] == [("A", 1), ("A", 2)]
+    vm.undo_last_career()          # undo adding C
+    assert rows == [("A", 1), ("A", 2), ("B", 1)]
+    vm.redo()
+    assert rows == [(c.career, c.level) for c in vm.career_levels]
+    assert len(rows) == 5
+    assert vm.can_redo()  # the undone group removal can still be redone
+
+
+def test_history_row_changes_match_a_full_rebuild():
+    rng = random.Random(3)
+    hist = CareerHistory()
+    rows = []
+    for i in range(400):
+        op = rng.random()
+        if op < 0.5:
+            change = hist.add_group([CareerLevel(career=f"{i}", level=n, status="") for n in range(rng.randint(1, 3))])
+        elif op < 0.7:
+            change = hist.undo()
+        elif op < 0.85:
+            change = hist.redo()
+        else:
+            groups = hist.active_groups()
+            change = hist.remove_group(rng.choice(groups)) if groups else hist.undo()
+        for row in change.removed:
+            del rows[row]
+        for row, cl in change.inserted:
+            rows.insert(row, cl)
+        assert rows == hist.levels() and len(hist) == len(rows)
+    assert all(hist.row_of(cl) == i for i, cl in enumerate(rows))
+    assert hist.row_of(CareerLevel(career="x", level=1, status="")) is None
+
+
+def test_summary_rerenders_only_changed_sections(monkeypatch):
+    calls = []
+    for fn in ("format_characteristics", "join_skills", "join_talents"):
+        real = getattr(viewmodel, fn)
+        monkeypatch.setattr(viewmodel, fn, lambda x, _f=fn, _real=real: calls.append(_f) or _real(x))
+    vm = ViewModel()
+    vm.start_new_npc("Greta", "")
+    lvl = CareerLevel(career="Smith", level=1, status="", characteristics=("S",), skills=("Endurance",),
+                      talents=("Hardy",))
+    monkeypatch.setattr("app.viewmodel.get_career_levels", lambda name, upto: [lvl])
+    vm.add_career_str("Smith")
+    first = vm.get_summary()
+    assert sorted(calls) == ["format_characteristics", "join_skills", "join_talents"]
+    calls.clear()
+    assert vm.get_summary() == first and calls == []
+    vm.set_talents(lvl, ["Hardy", "Strong Back"])
+    assert "Strong Back" in vm.get_summary()["talents"] and calls == ["join_talents"]
+
+
+def test_sorted_names_match_a_plain_sort():
+    rng = random.Random(5)
+    names, ref = _SortedNames(), set()
+    for _ in range(3000):
+        name = rng.choice("abcdefgh").upper() * rng.randint(1, 2) + str(rng.randint(0, 400))
+        if name in ref and rng.random() < 0.5:
+            names.discard(name)
+            ref.discard(name)
+        elif name not in ref:
+            names.add(name)
+            ref.add(name)
+    assert list(names) == sorted(ref, key=lambda n: (n.lower(), n)) and len(names) == len(ref)
@@ -0,0 +1,30 @@
+import io_.writer as writer
+from npc.models import NPC
+
+
+def test_writer_caches_template_and_avoids_collisions(tmp_path, monkeypatch):
+    tpl = tmp_path / "tpl.txt"
+    tpl.write_text("{name}|{race}", encoding="utf-8")
+    monkeypatch.setattr(writer, "TEMPLATE_PATH", tpl)
+    assert writer.load_template() is writer.load_template()
+    tpl.write_text("{name}/{race}/{talents}", encoding="utf-8")
+    assert writer.load_template().text == "{name}/{race}/{talents}"
+
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "Ann.txt").write_text("old", encoding="utf-8")
+    npcs = [NPC(name="Ann", race="Elf"), NPC(name="Ann", race="Dwarf"), NPC(name="Bo", race="")]
+    paths = list(writer.write_npcs(npcs, out, workers=2))
+    assert [p.name for p in paths] == ["Ann_2.txt", "Ann_3.txt", "Bo.txt"]
+    assert (out / "Ann.txt").read_text(encoding="utf-8") == "old"
+    assert (out / "Ann_3.txt").read_text(encoding="utf-8") == "Ann/Dwarf/"
+
+
+def test_write_npc_never_replaces_a_file_unless_asked(tmp_path):
+    first = writer.write_npc(NPC(name="Greta", race="Dwarf"), "Greta.txt", tmp_path)
+    second = writer.write_npc(NPC(name="Greta", race="Elf"), "Greta.txt", tmp_path)
+    third = writer.write_npc(NPC(name="Greta", race="Human"), "Greta.txt", tmp_path)
+    assert (first.name, second.name, third.name) == ("Greta.txt", "Greta_2.txt", "Greta_3.txt")
+    assert "Race: Dwarf" in first.read_text(encoding="utf-8")
+    again = writer.write_npc(NPC(name="Greta", race="Human"), "Greta.txt", tmp_path, overwrite=True)
+    assert again == first and "Race: Human" in first.read_text(encoding="utf-8")